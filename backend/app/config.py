@@ -3,6 +3,7 @@ Configuration management for the monitoring backend.
 Handles environment variables and default settings.
 """
 import os
+from pathlib import Path
 from typing import Optional
 
 class Settings:
@@ -14,9 +15,55 @@ class Settings:
     
     # Polling interval in seconds (how often to fetch from host API)
     POLL_INTERVAL_SECONDS: int = int(os.getenv("POLL_INTERVAL_SECONDS", "5"))
+    # Adaptive polling: while nobody has requested current metrics for
+    # VIEWER_TIMEOUT_SECONDS, poll when the host API says the next collector
+    # group is due, but at most every POLL_INTERVAL_MAX_SECONDS apart
+    POLL_INTERVAL_MAX_SECONDS: int = int(os.getenv("POLL_INTERVAL_MAX_SECONDS", "60"))
+    VIEWER_TIMEOUT_SECONDS: int = int(os.getenv("VIEWER_TIMEOUT_SECONDS", "30"))
     
-    # Note: Data directories are not needed here since metrics come from host API
-    # The host API handles all script execution and data storage
+    # Note: Script directories are not needed here since metrics come from host API
+    # The host API handles all script execution; the backend only keeps history
+    DATA_DIR: Path = Path(os.getenv("BACKEND_DATA_DIR", "."))
+    HISTORY_FILE: Path = Path(os.getenv("HISTORY_FILE", str(DATA_DIR / "history.jsonl")))
+
+    # History group commit: records wait in memory at most this long (or
+    # until this many bytes are pending) before one write + fsync
+    HISTORY_COMMIT_INTERVAL_SECONDS: float = float(os.getenv("HISTORY_COMMIT_INTERVAL_SECONDS", "5"))
+    HISTORY_COMMIT_BYTES: int = int(os.getenv("HISTORY_COMMIT_BYTES", str(64 * 1024)))
+    # Segment rotation (by size and on every new hour) and retention of
+    # sealed, gzipped segments
+    HISTORY_ROTATE_BYTES: int = int(os.getenv("HISTORY_ROTATE_BYTES", str(16 * 1024 * 1024)))
+    HISTORY_ROTATE_HOURLY: bool = os.getenv("HISTORY_ROTATE_HOURLY", "true").lower() == "true"
+    HISTORY_RETENTION_BYTES: int = int(os.getenv("HISTORY_RETENTION_BYTES", str(512 * 1024 * 1024)))
+    HISTORY_RETENTION_HOURS: float = float(os.getenv("HISTORY_RETENTION_HOURS", "168"))
+
+    # Warm-start checkpoint (latest snapshot and rollups)
+    STATE_FILE: Path = Path(os.getenv("BACKEND_STATE_FILE", str(DATA_DIR / "backend_state.json")))
+    CHECKPOINT_INTERVAL_SECONDS: int = int(os.getenv("CHECKPOINT_INTERVAL_SECONDS", "30"))
+    STATE_MAX_AGE_SECONDS: int = int(os.getenv("STATE_MAX_AGE_SECONDS", "3600"))
+
+    # Trend forecasts: time constant of the exponentially weighted fit and
+    # the history needed before a time-until-full is published
+    FORECAST_WINDOW_SECONDS: float = float(os.getenv("FORECAST_WINDOW_SECONDS", str(6 * 3600)))
+    FORECAST_MIN_SPAN_SECONDS: float = float(os.getenv("FORECAST_MIN_SPAN_SECONDS", "600"))
+
+    # Process leaderboard: commands kept per time bucket and metric (fixed
+    # memory), and entries per window published with each snapshot
+    LEADERBOARD_CAPACITY: int = int(os.getenv("LEADERBOARD_CAPACITY", "64"))
+    LEADERBOARD_SIZE: int = int(os.getenv("LEADERBOARD_SIZE", "20"))
+
+    # Cursor catch-up (/api/metrics/since): snapshots kept per worker, the
+    # longest long-poll allowed, and how often non-collector workers check
+    # the shared segment for new snapshots
+    SINCE_BUFFER_SIZE: int = int(os.getenv("SINCE_BUFFER_SIZE", "720"))
+    SINCE_MAX_WAIT_MS: int = int(os.getenv("SINCE_MAX_WAIT_MS", "30000"))
+    SINCE_FOLLOW_INTERVAL_MS: int = int(os.getenv("SINCE_FOLLOW_INTERVAL_MS", "50"))
+
+    # Multi-worker serving (uvicorn --workers N): one worker holding the lock
+    # polls the host API and publishes into a shared-memory segment
+    COLLECTOR_LOCK_FILE: Path = Path(os.getenv("COLLECTOR_LOCK_FILE", str(DATA_DIR / "collector.lock")))
+    SHM_NAME: str = os.getenv("SHM_NAME", "sysmon_snapshot")
+    SHM_SIZE_BYTES: int = int(os.getenv("SHM_SIZE_BYTES", str(4 * 1024 * 1024)))
 
 settings = Settings()
 
@@ -0,0 +1,231 @@
+"""
+Incremental trend forecasts: growth rate and time until full.
+
+Alerts fire at "disk > 90%", usually too late to act. The collector fits a
+least-squares line to every tracked series (memory %, swap used, used bytes
+of each partition) and publishes its slope and the time until the fitted
+line reaches the series' capacity, both in the snapshot ("forecast") and at
+/api/forecast.
+
+The fit is exponentially weighted (time constant FORECAST_WINDOW_SECONDS)
+and kept as five running sums per series (weight, Σx, Σy, Σxx, Σxy), so a
+sample costs O(1) per series and nothing is refitted or re-read from
+history. All series are sampled at the same instant, so the decay factor
+and the shift of the time origin to "now" are computed once per tick and
+applied to every series' sums, which live in parallel arrays. Keeping the
+origin at the latest sample keeps Σxx small and the fit numerically stable;
+the intercept is then the fitted current value.
+"""
+import math
+import threading
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import settings
+from .schema_v2 import size_bytes
+
+# Estimates need this many samples and this much history before time until
+# full is published
+MIN_SAMPLES = 10
+
+
+class TrendBank:
+    """
+    Exponentially weighted least-squares trends of many series.
+
+    Args:
+        window_seconds: Time constant of the exponential weighting
+        min_span_seconds: History needed before a series gets a time-until-full
+    """
+
+    def __init__(self, window_seconds: float = 6 * 3600, min_span_seconds: float = 600):
+        self.window_seconds = window_seconds
+        self.min_span_seconds = min_span_seconds
+        self._lock = threading.Lock()
+        self._slots: Dict[str, int] = {}
+        self._w = array("d")
+        self._sx = array("d")
+        self._sy = array("d")
+        self._sxx = array("d")
+        self._sxy = array("d")
+        self._count = array("q")
+        self._first = array("d")
+        self._last_time: Optional[float] = None
+
+    def _slot(self, key: str, now: float) -> int:
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = len(self._w)
+            for column in (self._w, self._sx, self._sy, self._sxx, self._sxy):
+                column.append(0.0)
+            self._count.append(0)
+            self._first.append(now)
+        return slot
+
+    def update(self, now: float, values: Dict[str, float]) -> None:
+        """
+        Add one sample of every series at time `now` (seconds).
+
+        Series missing from `values` keep their sums; they decay with time
+        like every other series.
+        """
+        with self._lock:
+            if self._last_time is not None and now <= self._last_time:
+                return
+            w, sx, sy, sxx, sxy = self._w, self._sx, self._sy, self._sxx, self._sxy
+            if self._last_time is not None:
+                # Shared by all series: decay since the previous tick and the
+                # shift of the origin to now (old x values become x - d)
+                d = now - self._last_time
+                k = math.exp(-d / self.window_seconds)
+                for i in range(len(w)):
+                    w0, sx0 = w[i], sx[i]
+                    w[i] = k * w0
+                    sx[i] = k * (sx0 - d * w0)
+                    sxx[i] = k * (sxx[i] - 2 * d * sx0 + d * d * w0)
+                    sxy[i] = k * (sxy[i] - d * sy[i])
+                    sy[i] = k * sy[i]
+            self._last_time = now
+            for key, y in values.items():
+                i = self._slot(key, now)
+                # The new point sits at x = 0: only weight and Σy change
+                w[i] += 1.0
+                sy[i] += y
+                self._count[i] += 1
+
+    def fit(self, key: str) -> Optional[Tuple[float, float, int, float]]:
+        """
+        (level, slope per second, samples, span seconds) of a series, or
+        None if it has fewer than two samples. level is the fitted value now.
+        """
+        with self._lock:
+            i = self._slots.get(key)
+            if i is None or self._count[i] < 2:
+                return None
+            w, sx, sy, sxx, sxy = self._w[i], self._sx[i], self._sy[i], self._sxx[i], self._sxy[i]
+            span = (self._last_time or 0.0) - self._first[i]
+            count = self._count[i]
+        denominator = w * sxx - sx * sx
+        if w <= 0 or denominator <= 1e-9:
+            return None
+        slope = (w * sxy - sx * sy) / denominator
+        level = (sy - slope * sx) / w
+        return level, slope, count, span
+
+    def estimate(self, key: str, capacity: Optional[float]) -> Optional[Dict[str, Any]]:
+        """
+        Growth and time until the fitted line reaches `capacity`.
+
+        Returns:
+            {"level", "growth_per_hour", "time_to_full_s", "samples",
+            "span_s"}; time_to_full_s is None while the series is flat or
+            shrinking, has too little history, or has no capacity
+        """
+        fit = self.fit(key)
+        if fit is None:
+            return None
+        level, slope, count, span = fit
+        time_to_full = None
+        if (
+            capacity is not None and slope > 0 and count >= MIN_SAMPLES
+            and span >= self.min_span_seconds
+        ):
+            time_to_full = max(capacity - level, 0.0) / slope
+        return {
+            "level": round(level, 3),
+            "growth_per_hour": round(slope * 3600, 3) + 0.0,  # no -0.0
+            "time_to_full_s": None if time_to_full is None else round(time_to_full),
+            "samples": count,
+            "span_s": round(span),
+        }
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return list(self._slots)
+
+    def export_state(self) -> Dict[str, Any]:
+        """Running sums for the warm-start checkpoint."""
+        with self._lock:
+            return {
+                "last_time": self._last_time,
+                "series": {
+                    key: [self._w[i], self._sx[i], self._sy[i], self._sxx[i], self._sxy[i], self._count[i], self._first[i]]
+                    for key, i in self._slots.items()
+                },
+            }
+
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        """Restore running sums; they decay across the downtime on the next update."""
+        with self._lock:
+            self._last_time = state.get("last_time")
+            for key, values in (state.get("series") or {}).items():
+                i = self._slot(key, values[6])
+                self._w[i], self._sx[i], self._sy[i], self._sxx[i], self._sxy[i] = values[:5]
+                self._count[i] = int(values[5])
+
+
+class Forecaster:
+    """
+    Extracts the tracked series from snapshots and publishes their forecasts.
+
+    Series (used values and the capacity they fill):
+        memory          memory.percent, capacity 100
+        swap            used swap bytes, capacity SwapTotal
+        partition:<p>   used bytes of a df partition, capacity used + avail
+                        (exact byte counts; the rounded -h strings only
+                        for collectors that do not report them)
+    """
+
+    def __init__(self, window_seconds: float, min_span_seconds: float):
+        self.trends = TrendBank(window_seconds, min_span_seconds)
+        self._capacity: Dict[str, float] = {}
+        self._latest: Optional[Dict[str, Any]] = None
+
+    def _series(self, data: Dict[str, Any]) -> Dict[str, float]:
+        values: Dict[str, float] = {}
+        memory = data.get("memory") or {}
+        if memory.get("percent") is not None:
+            values["memory"] = float(memory["percent"])
+            self._capacity["memory"] = 100.0
+        detail = memory.get("detail") or {}
+        if detail.get("swap_total"):
+            values["swap"] = float(detail["swap_total"] - (detail.get("swap_free") or 0))
+            self._capacity["swap"] = float(detail["swap_total"])
+        for part in (data.get("disk") or {}).get("partitions") or []:
+            used, avail = part.get("used_bytes"), part.get("avail_bytes")
+            if used is None or avail is None:
+                used, avail = size_bytes(part.get("used")), size_bytes(part.get("avail"))
+            if not part.get("path") or used is None or avail is None:
+                continue
+            key = f"partition:{part['path']}"
+            values[key] = float(used)
+            self._capacity[key] = float(used + avail)
+        return values
+
+    def update(self, now: float, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Add a snapshot taken at `now` (Unix seconds) and return the forecast
+        section: {"memory", "swap", "partitions": {path: ...}, "window_s"}.
+        """
+        values = self._series(data)
+        self.trends.update(now, values)
+        forecast: Dict[str, Any] = {
+            "window_s": self.trends.window_seconds,
+            "memory": None,
+            "swap": None,
+            "partitions": {},
+        }
+        for key in values:
+            estimate = self.trends.estimate(key, self._capacity.get(key))
+            if key.startswith("partition:"):
+                forecast["partitions"][key[len("partition:"):]] = estimate
+            else:
+                forecast[key] = estimate
+        self._latest = forecast
+        return forecast
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        return self._latest
+
+
+FORECASTS = Forecaster(settings.FORECAST_WINDOW_SECONDS, settings.FORECAST_MIN_SPAN_SECONDS)
@@ -0,0 +1,403 @@
+"""
+Durable, rotating history log.
+
+Snapshots are appended to an in-memory batch and group-committed to the
+active segment (history.jsonl) by a background thread, either every
+commit_interval seconds or as soon as commit_bytes are pending. One commit
+is one write() plus one fsync(), so the durability interval is explicit and
+the polling thread never waits for the disk.
+
+The active segment is sealed when it reaches rotate_bytes or the hour
+changes. Sealed segments are renamed to history-<opened>.jsonl and gzipped
+in the background; the oldest sealed segments are deleted to keep total
+size under retention_bytes and age under retention_hours.
+
+On start, a torn final line left by a crash is truncated away instead of
+discarding the file, leftover temporary files are removed and sealed
+segments that were not compressed yet are queued again.
+"""
+import gzip
+import json
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SEALED_PREFIX = "history-"
+SEALED_SUFFIX = ".jsonl"
+COMPRESSED_SUFFIX = ".jsonl.gz"
+
+
+def _hour_key(ts: float) -> str:
+    return time.strftime("%Y%m%d%H", time.localtime(ts))
+
+
+def recover_torn_tail(path: Path) -> int:
+    """
+    Truncate a partially written last line.
+
+    Returns:
+        Number of bytes removed
+    """
+    try:
+        size = path.stat().st_size
+    except FileNotFoundError:
+        return 0
+    if size == 0:
+        return 0
+
+    with open(path, "rb+") as f:
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return 0
+        # Scan backwards in blocks for the last complete line
+        block = 64 * 1024
+        pos = size
+        while pos > 0:
+            start = max(0, pos - block)
+            f.seek(start)
+            chunk = f.read(pos - start)
+            idx = chunk.rfind(b"\n")
+            if idx != -1:
+                keep = start + idx + 1
+                break
+            pos = start
+        else:
+            keep = 0
+        f.truncate(keep)
+        f.flush()
+        os.fsync(f.fileno())
+    return size - keep
+
+
+def _sealed_order(path: Path) -> Tuple[str, int]:
+    """
+    Sort key for history-<stamp>[-<n>].jsonl[.gz]: opening time, then the
+    collision counter (an unnumbered name comes first).
+    """
+    name = path.name[len(SEALED_PREFIX):]
+    for suffix in (COMPRESSED_SUFFIX, SEALED_SUFFIX):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+            break
+    stamp, _, n = name.partition("-")
+    return stamp, int(n) if n.isdigit() else 0
+
+
+def history_segments(active: Path) -> List[Path]:
+    """
+    All history files oldest first: sealed segments, then the active one.
+
+    Sealed names embed their opening time, so ordering by (stamp, collision
+    counter) is time order; plain lexical order would put "-1" before ".jsonl".
+    """
+    directory = active.parent
+    sealed = [
+        p for p in directory.glob(f"{SEALED_PREFIX}*")
+        if p.name.endswith(SEALED_SUFFIX) or p.name.endswith(COMPRESSED_SUFFIX)
+    ]
+    sealed.sort(key=_sealed_order)
+    if active.exists():
+        sealed.append(active)
+    return sealed
+
+
+def iter_history_lines(active: Path, since: Optional[float] = None) -> Iterator[bytes]:
+    """
+    Yield every committed JSON line (with newline) across all segments.
+
+    Args:
+        since: Skip segments last modified before this Unix time; they
+            cannot hold newer records
+    """
+    for path in history_segments(active):
+        if since is not None:
+            try:
+                if os.stat(path).st_mtime < since:
+                    continue
+            except FileNotFoundError:
+                continue
+        opener = gzip.open if path.name.endswith(".gz") else open
+        try:
+            with opener(path, "rb") as f:
+                for line in f:
+                    if line.endswith(b"\n"):
+                        yield line
+        except (OSError, EOFError) as e:
+            # Segment removed by retention or truncated gzip; skip it
+            logger.debug(f"Skipping history segment {path}: {e}")
+
+
+def _last_line(path: Path) -> Optional[bytes]:
+    """Last complete line of a plain or gzipped segment."""
+    if path.name.endswith(".gz"):
+        last = None
+        with gzip.open(path, "rb") as f:
+            for line in f:
+                if line.endswith(b"\n"):
+                    last = line
+        return last
+
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        block = 64 * 1024
+        tail = b""
+        while pos > 0:
+            start = max(0, pos - block)
+            f.seek(start)
+            tail = f.read(pos - start) + tail
+            pos = start
+            # Need the newline ending the line before the last complete one
+            if tail.count(b"\n") >= 2:
+                break
+        # Drop a line still being written and, unless at the file start, the
+        # first fragment, which may begin mid-line
+        lines = tail.split(b"\n")[:-1]
+        if pos > 0:
+            lines = lines[1:]
+        lines = [line for line in lines if line]
+        return lines[-1] + b"\n" if lines else None
+
+
+def last_record(active: Path) -> Optional[Dict[str, Any]]:
+    """Most recent committed record across all segments, or None."""
+    for path in reversed(history_segments(active)):
+        try:
+            line = _last_line(path)
+        except (OSError, EOFError):
+            continue
+        if line:
+            try:
+                return json.loads(line)
+            except json.JSONDecodeError:
+                continue
+    return None
+
+
+class HistoryWriter:
+    """
+    Group-committing, rotating writer for history.jsonl.
+
+    Args:
+        path: Active segment path; sealed segments live next to it
+        commit_interval: Max seconds a record waits in memory
+        commit_bytes: Commit early once this many bytes are pending
+        rotate_bytes: Seal the active segment at this size
+        rotate_hourly: Also seal when the local hour changes
+        retention_bytes: Max total size of sealed segments
+        retention_hours: Max age of sealed segments
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        commit_interval: float = 5.0,
+        commit_bytes: int = 64 * 1024,
+        rotate_bytes: int = 16 * 1024 * 1024,
+        rotate_hourly: bool = True,
+        retention_bytes: int = 512 * 1024 * 1024,
+        retention_hours: float = 168.0,
+    ):
+        self.path = Path(path)
+        self.commit_interval = commit_interval
+        self.commit_bytes = commit_bytes
+        self.rotate_bytes = rotate_bytes
+        self.rotate_hourly = rotate_hourly
+        self.retention_bytes = retention_bytes
+        self.retention_hours = retention_hours
+
+        self._pending: List[bytes] = []
+        self._pending_bytes = 0
+        self._lock = threading.Lock()
+        self._commit_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._compress_queue: "queue.Queue[Path]" = queue.Queue()
+
+        self._file = None
+        self._size = 0
+        self._opened_at = 0.0
+        self._started = False
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Recover from a previous crash and start the commit/compress threads."""
+        if self._started:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        removed = recover_torn_tail(self.path)
+        if removed:
+            logger.warning(f"Truncated {removed} bytes of a torn last line in {self.path}")
+
+        for tmp in self.path.parent.glob(f"{SEALED_PREFIX}*.tmp"):
+            tmp.unlink(missing_ok=True)
+        for sealed in history_segments(self.path):
+            if sealed != self.path and sealed.name.endswith(SEALED_SUFFIX):
+                self._compress_queue.put(sealed)
+
+        self._open_active()
+        # An active segment left over from an earlier hour is sealed right away
+        self._maybe_rotate()
+
+        self._started = True
+        threading.Thread(target=self._commit_loop, daemon=True).start()
+        threading.Thread(target=self._compress_loop, daemon=True).start()
+
+    def close(self) -> None:
+        """Commit everything pending and close the active segment."""
+        self.commit()
+        with self._commit_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    # ------------------------------------------------------------------
+    # Write path
+    # ------------------------------------------------------------------
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Queue a record; it becomes durable at the next commit."""
+        line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._lock:
+            self._pending.append(line)
+            self._pending_bytes += len(line)
+            full = self._pending_bytes >= self.commit_bytes
+        if full:
+            self._wake.set()
+
+    def commit(self) -> int:
+        """
+        Write and fsync all pending records in one go, then rotate if due.
+
+        Returns:
+            Number of records committed
+        """
+        with self._lock:
+            batch, self._pending = self._pending, []
+            self._pending_bytes = 0
+        if not batch:
+            return 0
+
+        data = b"".join(batch)
+        with self._commit_lock:
+            try:
+                if self._file is None:
+                    self._open_active()
+                self._file.write(data)
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._size += len(data)
+            except OSError as e:
+                # Drop any partial write so the retry cannot leave a torn line
+                if self._file is not None:
+                    try:
+                        self._file.truncate(self._size)
+                    except OSError:
+                        pass
+                # Keep the batch ahead of anything queued meanwhile so the
+                # next commit retries it in order
+                with self._lock:
+                    self._pending[:0] = batch
+                    self._pending_bytes += len(data)
+                logger.error(f"Failed to commit {len(batch)} history records, will retry: {e}")
+                return 0
+            self._maybe_rotate()
+        return len(batch)
+
+    def _commit_loop(self) -> None:
+        while True:
+            self._wake.wait(self.commit_interval)
+            self._wake.clear()
+            try:
+                self.commit()
+            except Exception as e:
+                logger.error(f"History commit failed: {e}", exc_info=True)
+
+    # ------------------------------------------------------------------
+    # Rotation and retention
+    # ------------------------------------------------------------------
+
+    def _open_active(self) -> None:
+        self._file = open(self.path, "ab")
+        stat = os.fstat(self._file.fileno())
+        self._size = stat.st_size
+        self._opened_at = stat.st_mtime if stat.st_size else time.time()
+
+    def _maybe_rotate(self) -> None:
+        if self._size == 0:
+            return
+        too_big = self._size >= self.rotate_bytes
+        new_hour = self.rotate_hourly and _hour_key(self._opened_at) != _hour_key(time.time())
+        if too_big or new_hour:
+            self._seal()
+
+    def _seal(self) -> None:
+        """Rename the active segment and queue it for compression."""
+        self._file.close()
+        stamp = datetime.fromtimestamp(self._opened_at).strftime("%Y%m%dT%H%M%S")
+        sealed = self.path.with_name(f"{SEALED_PREFIX}{stamp}{SEALED_SUFFIX}")
+        n = 1
+        while sealed.exists() or sealed.with_suffix(".jsonl.gz").exists():
+            sealed = self.path.with_name(f"{SEALED_PREFIX}{stamp}-{n}{SEALED_SUFFIX}")
+            n += 1
+        os.replace(self.path, sealed)
+        logger.info(f"Sealed history segment {sealed.name} ({self._size} bytes)")
+
+        self._file = open(self.path, "ab")
+        self._size = 0
+        self._opened_at = time.time()
+        self._compress_queue.put(sealed)
+
+    def _compress_loop(self) -> None:
+        while True:
+            sealed = self._compress_queue.get()
+            try:
+                self._compress(sealed)
+                self.enforce_retention()
+            except Exception as e:
+                logger.error(f"Failed to compress {sealed}: {e}", exc_info=True)
+
+    def _compress(self, sealed: Path) -> None:
+        if not sealed.exists():
+            return
+        target = sealed.with_name(sealed.name + ".gz")
+        tmp = sealed.with_name(sealed.name + ".gz.tmp")
+        with open(sealed, "rb") as src, gzip.open(tmp, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        with open(tmp, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp, target)
+        sealed.unlink()
+
+    def enforce_retention(self) -> None:
+        """Delete the oldest sealed segments beyond the size/age limits."""
+        sealed = [p for p in history_segments(self.path) if p != self.path]
+        now = time.time()
+        sizes = {}
+        for p in sealed:
+            try:
+                sizes[p] = p.stat()
+            except FileNotFoundError:
+                continue
+        total = sum(st.st_size for st in sizes.values())
+        max_age = self.retention_hours * 3600
+        for p in sealed:
+            st = sizes.get(p)
+            if st is None:
+                continue
+            if total <= self.retention_bytes and now - st.st_mtime <= max_age:
+                break
+            p.unlink(missing_ok=True)
+            total -= st.st_size
+            logger.info(f"Retention removed history segment {p.name}")
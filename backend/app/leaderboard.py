@@ -0,0 +1,252 @@
+"""
+Heavy-hitter process leaderboard (/api/processes/leaderboard).
+
+Snapshots only carry the instant top processes, so periodic offenders
+(cron jobs, builds, backups) never show up in history. The host API's
+process_usage section reports, per sample, CPU seconds and RSS summed per
+command; this module keeps which commands used the most CPU time and memory
+over the last 5 minutes, hour and day.
+
+Every window is a ring of time buckets (5 x 1 min, 12 x 5 min, 24 x 1 h)
+and every bucket keeps a weighted space-saving summary of at most
+LEADERBOARD_CAPACITY commands per metric: when a new command arrives and
+the summary is full, it replaces the smallest entry and inherits its count
+as error. Memory is fixed however many distinct commands or pids go through
+the host. A window's answer merges the summaries of its live buckets; each
+entry carries an error bound (how much of its count may belong to commands
+it replaced, or be missing from buckets it fell out of).
+
+Memory is ranked by RSS x seconds, reported as the average RSS over the
+seconds the window has observed.
+
+The collector process feeds the leaderboard and publishes the merged tables
+with each snapshot (the "leaderboard" key, left out of history), so every
+worker serves the same answer.
+"""
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import settings
+
+# Window name: (bucket seconds, buckets)
+WINDOWS: Dict[str, Tuple[int, int]] = {
+    "5m": (60, 5),
+    "1h": (300, 12),
+    "1d": (3600, 24),
+}
+
+METRICS = ("cpu_seconds", "rss_byte_seconds")
+
+
+class SpaceSaving:
+    """
+    Weighted space-saving summary: the heaviest keys in fixed memory.
+
+    Args:
+        capacity: Keys kept; a key with more than total/capacity weight is
+            guaranteed to be among them
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        # key -> [count, error]
+        self.entries: Dict[str, List[float]] = {}
+
+    def add(self, key: str, weight: float) -> None:
+        entry = self.entries.get(key)
+        if entry is not None:
+            entry[0] += weight
+            return
+        if len(self.entries) < self.capacity:
+            self.entries[key] = [weight, 0.0]
+            return
+        smallest = min(self.entries, key=lambda k: self.entries[k][0])
+        floor = self.entries.pop(smallest)[0]
+        self.entries[key] = [floor + weight, floor]
+
+    def floor(self) -> float:
+        """Largest count a key missing from a full summary can have."""
+        if len(self.entries) < self.capacity:
+            return 0.0
+        return min(entry[0] for entry in self.entries.values())
+
+
+class _Bucket:
+    def __init__(self, index: int, capacity: int):
+        self.index = index
+        self.seconds = 0.0
+        self.summaries = {metric: SpaceSaving(capacity) for metric in METRICS}
+
+
+class WindowedHeavyHitters:
+    """
+    Space-saving summaries over a sliding window of time buckets.
+
+    Args:
+        bucket_seconds: Width of a bucket
+        buckets: Buckets in the window
+        capacity: Keys per bucket summary
+    """
+
+    def __init__(self, bucket_seconds: int, buckets: int, capacity: int):
+        self.bucket_seconds = bucket_seconds
+        self.capacity = capacity
+        self._ring: List[Optional[_Bucket]] = [None] * buckets
+
+    def _bucket(self, now: float) -> _Bucket:
+        index = int(now // self.bucket_seconds)
+        slot = index % len(self._ring)
+        bucket = self._ring[slot]
+        if bucket is None or bucket.index != index:
+            bucket = self._ring[slot] = _Bucket(index, self.capacity)
+        return bucket
+
+    def add(self, now: float, seconds: float, weights: Dict[str, Dict[str, float]]) -> None:
+        """Count one sample: {command: {metric: weight}} covering `seconds`."""
+        bucket = self._bucket(now)
+        bucket.seconds += seconds
+        for key, values in weights.items():
+            for metric, weight in values.items():
+                if weight > 0:
+                    bucket.summaries[metric].add(key, weight)
+
+    def top(self, now: float, metric: str, limit: int) -> Tuple[List[Dict[str, Any]], float]:
+        """
+        The `limit` heaviest keys of the window ending at `now`.
+
+        Returns:
+            ([{key, count, error}], seconds observed in the window)
+        """
+        current = int(now // self.bucket_seconds)
+        live = [b for b in self._ring if b is not None and current - len(self._ring) < b.index <= current]
+        counts: Dict[str, float] = {}
+        errors: Dict[str, float] = {}
+        # A key absent from a full bucket may have had up to its floor there
+        floors: Dict[str, float] = {}
+        total_floor = 0.0
+        for bucket in live:
+            summary = bucket.summaries[metric]
+            floor = summary.floor()
+            total_floor += floor
+            for key, (count, error) in summary.entries.items():
+                counts[key] = counts.get(key, 0.0) + count
+                errors[key] = errors.get(key, 0.0) + error
+                floors[key] = floors.get(key, 0.0) + floor
+        for key in counts:
+            errors[key] += total_floor - floors[key]
+        ranked = sorted(counts, key=counts.get, reverse=True)[:limit]
+        observed = sum(b.seconds for b in live)
+        return [{"key": key, "count": counts[key], "error": errors[key]} for key in ranked], observed
+
+    def export_state(self) -> List[Dict[str, Any]]:
+        return [
+            {"index": b.index, "seconds": b.seconds, "summaries": {m: s.entries for m, s in b.summaries.items()}}
+            for b in self._ring if b is not None
+        ]
+
+    def restore_state(self, state: List[Dict[str, Any]]) -> None:
+        for saved in state:
+            bucket = _Bucket(saved["index"], self.capacity)
+            bucket.seconds = saved["seconds"]
+            for metric, entries in saved["summaries"].items():
+                if metric in bucket.summaries:
+                    bucket.summaries[metric].entries = {k: list(v) for k, v in entries.items()}
+            self._ring[bucket.index % len(self._ring)] = bucket
+
+
+class Leaderboard:
+    """
+    Heaviest commands by CPU time and memory over every window in WINDOWS.
+
+    Args:
+        capacity: Commands kept per bucket and metric
+        size: Entries per table published with each snapshot
+    """
+
+    def __init__(self, capacity: int = 64, size: int = 20):
+        self.size = size
+        self._lock = threading.Lock()
+        self._windows = {name: WindowedHeavyHitters(width, n, capacity) for name, (width, n) in WINDOWS.items()}
+        self._last_sample: Optional[int] = None
+        self._tables: Optional[Dict[str, Any]] = None
+        self._tables_at = 0.0
+
+    def add(self, now: float, usage: Optional[Dict[str, Any]]) -> bool:
+        """
+        Count a process_usage section sampled at `now` (Unix seconds).
+
+        Returns:
+            False if the section was missing, had no interval (first scan
+            after a host API start) or was already counted
+        """
+        if not usage or not usage.get("interval_s") or usage.get("sample") == self._last_sample:
+            return False
+        self._last_sample = usage.get("sample")
+        seconds = float(usage["interval_s"])
+        weights = {
+            c["command"]: {
+                "cpu_seconds": float(c.get("cpu_seconds") or 0.0),
+                "rss_byte_seconds": float(c.get("rss_bytes") or 0) * seconds,
+            }
+            for c in usage.get("commands") or []
+        }
+        with self._lock:
+            for window in self._windows.values():
+                window.add(now, seconds, weights)
+            self._tables = None
+        return True
+
+    def published(self, now: float) -> Dict[str, Any]:
+        """
+        Tables to publish with a snapshot: recomputed after new samples, and
+        once a minute so buckets still expire while the host reports none.
+        """
+        if self._tables is None or now - self._tables_at >= 60:
+            tables = self.tables(now)
+            self._tables, self._tables_at = tables, now
+        return self._tables
+
+    def tables(self, now: float, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Leaderboards of every window.
+
+        Returns:
+            {window: {"observed_s", "cpu": [{command, cpu_seconds,
+            error_seconds}], "memory": [{command, avg_rss_bytes,
+            error_bytes}]}}
+        """
+        limit = limit or self.size
+        tables = {}
+        with self._lock:
+            for name, window in self._windows.items():
+                cpu, observed = window.top(now, "cpu_seconds", limit)
+                memory, _ = window.top(now, "rss_byte_seconds", limit)
+                tables[name] = {
+                    "observed_s": round(observed),
+                    "cpu": [
+                        {"command": e["key"], "cpu_seconds": round(e["count"], 2), "error_seconds": round(e["error"], 2)}
+                        for e in cpu
+                    ],
+                    "memory": [
+                        {
+                            "command": e["key"],
+                            "avg_rss_bytes": round(e["count"] / observed) if observed else None,
+                            "error_bytes": round(e["error"] / observed) if observed else None,
+                        }
+                        for e in memory
+                    ],
+                }
+        return tables
+
+    def export_state(self) -> Dict[str, Any]:
+        with self._lock:
+            return {name: window.export_state() for name, window in self._windows.items()}
+
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        with self._lock:
+            for name, saved in state.items():
+                if name in self._windows:
+                    self._windows[name].restore_state(saved)
+
+
+LEADERBOARD = Leaderboard(settings.LEADERBOARD_CAPACITY, settings.LEADERBOARD_SIZE)
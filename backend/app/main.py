@@ -8,14 +8,20 @@ metrics via a REST API.
 The backend NEVER reads /proc directly - all metrics come from the bash script.
 """
 import logging
-import threading
+import requests
+import time
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from .metrics_proxy import collect_loop, get_latest_metrics, HISTORY_FILE
-from .models import MetricsResponse
-from fastapi.responses import FileResponse
+from . import metrics_proxy
+from .config import settings
+from .metrics_proxy import get_latest_metrics, HISTORY_FILE
+from .history import history_segments, iter_history_lines
+from .models import MetricsResponse, MetricsResponseV2
+from . import leaderboard, pipeline, projection, reports, schema_v2
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi import HTTPException
+from typing import Optional
 
 # Configure logging
 logging.basicConfig(
@@ -44,18 +50,24 @@ app.add_middleware(
 @app.on_event("startup")
 def startup_event():
     """
-    Start the background metrics proxy thread on application startup.
+    Start the metrics proxy on application startup.
     
-    This thread continuously fetches metrics from the host API (which runs
-    system_monitor.sh on the host) and caches them in memory. The thread runs
-    as a daemon so it stops when the app shuts down.
+    With several uvicorn workers, one of them is elected (via a lock file) to
+    fetch metrics from the host API (which runs system_monitor.sh on the
+    host) and publish them to shared memory; the others serve from that
+    segment and take over if the collector exits. Threads run as daemons so
+    they stop when the app shuts down.
     """
-    logger.info("Starting metrics proxy background thread...")
-    thread = threading.Thread(target=collect_loop, daemon=True)
-    thread.start()
-    logger.info("Metrics proxy thread started")
+    logger.info("Starting metrics proxy...")
+    is_collector = metrics_proxy.start()
+    logger.info(f"Metrics proxy started ({'collector' if is_collector else 'reader'})")
 
 
+@app.on_event("shutdown")
+def shutdown_event():
+    """Write a final checkpoint so the next start is warm."""
+    metrics_proxy.shutdown()
+
 
 @app.get("/", tags=["Root"])
 def root():
@@ -70,26 +82,85 @@ def root():
 @app.get("/api/reports/all", tags=["Reports"])
 def download_complete_report():
     """
-    Download the complete history of system readings since startup.
+    Download the complete history of system readings (kept across restarts).
+    
+    Sealed (gzipped) segments and the active segment are streamed oldest
+    first as one JSONL document. Records still waiting for the next group
+    commit are not included.
     
     Returns:
-        FileResponse: JSONL file containing all collected metrics.
+        StreamingResponse: JSONL content containing all retained metrics.
     """
-    if not HISTORY_FILE.exists():
+    if not history_segments(HISTORY_FILE):
         raise HTTPException(status_code=404, detail="No report data available yet")
     
-    return FileResponse(
-        path=HISTORY_FILE,
-        filename=f"system_monitor_report_{HISTORY_FILE.name}",
-        media_type="application/x-jsonlines"
+    return StreamingResponse(
+        iter_history_lines(HISTORY_FILE),
+        media_type="application/x-jsonlines",
+        headers={"Content-Disposition": f'attachment; filename="system_monitor_report_{HISTORY_FILE.name}"'},
+    )
+
+
+def _report_range(start: Optional[str], end: Optional[str]):
+    """Parse the report range query parameters (ISO 8601, UTC if naive)."""
+    try:
+        return reports.parse_time(start), reports.parse_time(end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid time range: {e}")
+
+
+@app.get("/api/reports/csv", tags=["Reports"])
+def download_csv_report(start: Optional[str] = None, end: Optional[str] = None):
+    """
+    CSV report of the stored history between start and end (ISO 8601).
+    
+    Streamed row by row; repeated downloads of the same range are served
+    from a cache until new history is committed.
+    """
+    range_start, range_end = _report_range(start, end)
+    if not history_segments(HISTORY_FILE):
+        raise HTTPException(status_code=404, detail="No report data available yet")
+    return StreamingResponse(
+        reports.csv_report(HISTORY_FILE, range_start, range_end),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="system_monitor_report.csv"'},
+    )
+
+
+@app.get("/api/reports/html", tags=["Reports"])
+def html_report(start: Optional[str] = None, end: Optional[str] = None):
+    """
+    HTML report (summary statistics and sample table) of the stored history
+    between start and end (ISO 8601), rendered on request and cached.
+    """
+    range_start, range_end = _report_range(start, end)
+    if not history_segments(HISTORY_FILE):
+        raise HTTPException(status_code=404, detail="No report data available yet")
+    return Response(
+        content=reports.html_report(HISTORY_FILE, range_start, range_end),
+        media_type="text/html",
     )
 
 
 @app.get("/api/metrics/current", response_model=MetricsResponse, tags=["Metrics"])
-def get_current_metrics():
+def get_current_metrics(
+    fields: Optional[str] = None,
+    trace_rtt_ms: Optional[float] = None,
+    trace_e2e_ms: Optional[float] = None,
+):
     """
     Get the most recent metrics snapshot from the host API.
     
+    Requests also mark the dashboard as watched, which keeps collection at
+    its minimum interval (see adaptive sampling in the host API).
+    
+    Args:
+        fields: Optional projection, e.g. "cpu.usage,memory.percent,network.stats";
+            "data" then contains only these paths
+        trace_rtt_ms: The dashboard's round trip for its previous poll
+        trace_e2e_ms: The resulting end-to-end age of the previous snapshot
+            (see /api/debug/pipeline)
+    
     Returns:
         MetricsResponse with the latest metrics fetched from the host API
         
@@ -97,18 +168,210 @@ def get_current_metrics():
         All metrics come from the host API which executes system_monitor.sh on
         the host. This backend container never reads /proc or computes metrics directly.
     """
+    paths = None
+    if fields is not None:
+        try:
+            paths = projection.parse_fields(fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    metrics_proxy.note_viewer()
+    pipeline.STATS.client_report(trace_rtt_ms, trace_e2e_ms)
     latest = get_latest_metrics()
+    trace = pipeline.STATS.served(latest)
+    
+    if paths is not None:
+        # A partial snapshot does not validate as MetricsSnapshot
+        return JSONResponse({
+            "timestamp": latest.get("timestamp", ""),
+            "seq": latest.get("seq"),
+            "interval_s": latest.get("interval_s"),
+            "data": projection.CACHE.get(latest, paths),
+            "error": latest.get("error"),
+            "trace": trace,
+        })
     
     # Convert to response model
     response = MetricsResponse(
         timestamp=latest.get("timestamp", ""),
+        seq=latest.get("seq"),
+        interval_s=latest.get("interval_s"),
         data=latest.get("data"),
-        error=latest.get("error")
+        error=latest.get("error"),
+        trace=trace,
     )
     
     return response
 
 
+@app.get("/api/metrics/history", tags=["Metrics"])
+def get_metrics_history(window_s: float = 3600, points: int = 720):
+    """
+    Chart series (CPU, memory, disk, GPU, LAN/WiFi rx/tx) of the last
+    `window_s` seconds of history, averaged into `points` equal buckets.
+    
+    Used by the dashboard to backfill its graphs on load. Buckets without
+    samples are null; records still waiting for the next history commit are
+    not included.
+    """
+    if not 0 < window_s <= settings.HISTORY_RETENTION_HOURS * 3600:
+        raise HTTPException(status_code=400, detail="window_s must be within the history retention")
+    if not 1 <= points <= 5000:
+        raise HTTPException(status_code=400, detail="points must be between 1 and 5000")
+    return Response(
+        content=reports.series_report(HISTORY_FILE, window_s, points, time.time()),
+        media_type="application/json",
+    )
+
+
+@app.get("/api/metrics/since", tags=["Metrics"])
+def get_metrics_since(seq: int, wait_ms: int = 0, limit: int = 100):
+    """
+    Every snapshot published after sequence number `seq`, oldest first.
+    
+    If none is newer, waits up to `wait_ms` (at most SINCE_MAX_WAIT_MS) for
+    the next one, so a client that passes back "next_seq" each time sees
+    every snapshot exactly once and in order. Snapshots older than this
+    worker's ring (SINCE_BUFFER_SIZE) are reported as a "gap" with the
+    missing sequence numbers; "reset" means `seq` was ahead of the newest
+    published snapshot (its sequence numbers restarted) and delivery
+    restarted from the oldest buffered snapshot. A `seq` this worker has not
+    caught up with yet returns no snapshots and the same cursor.
+    
+    A waiting request holds one of the worker's request threads.
+    """
+    if seq < 0:
+        raise HTTPException(status_code=400, detail="seq must be >= 0")
+    wait_ms = min(max(wait_ms, 0), settings.SINCE_MAX_WAIT_MS)
+    limit = min(max(limit, 1), settings.SINCE_BUFFER_SIZE)
+    metrics_proxy.note_viewer()
+    head = metrics_proxy.published_seq()
+    return metrics_proxy.RING.since(seq, wait_seconds=wait_ms / 1000.0, limit=limit, head=head)
+
+
+@app.get("/api/v2/metrics/current", response_model=MetricsResponseV2, tags=["Metrics"])
+def get_current_metrics_v2():
+    """
+    The latest snapshot in the numeric v2 schema.
+    
+    Every value is a number in a base unit (bytes, bytes/s, seconds,
+    degrees Celsius, watts, joules or a 0-1 ratio) and per-entity values are
+    maps keyed by mount point, interface, GPU index, device or pid. Units and
+    the host's static text (CPU model, GPU names, ...) are served once by
+    /api/v2/schema instead of with every sample.
+    """
+    metrics_proxy.note_viewer()
+    latest = get_latest_metrics()
+    return MetricsResponseV2(
+        timestamp=latest.get("timestamp", ""),
+        seq=latest.get("seq"),
+        interval_s=latest.get("interval_s"),
+        data=schema_v2.CACHE.get(latest),
+        error=latest.get("error"),
+        trace=pipeline.STATS.served(latest),
+    )
+
+
+@app.get("/api/v2/schema", tags=["Metrics"])
+def get_schema_v2():
+    """
+    Descriptor of the v2 schema: version, unit and meaning of every field
+    ("*" stands for a map key) and the host metadata left out of samples.
+    
+    Clients fetch it once; the host section changes only when hardware does.
+    """
+    return schema_v2.describe(get_latest_metrics().get("data"))
+
+
+@app.get("/api/forecast", tags=["Metrics"])
+def get_forecast():
+    """
+    Trend forecasts of the latest snapshot: growth per hour and seconds until
+    full of memory %, used swap and the used bytes of every partition.
+    
+    time_to_full_s is null while a series is flat or shrinking, or before
+    FORECAST_MIN_SPAN_SECONDS of history has been fitted.
+    """
+    latest = get_latest_metrics()
+    return {
+        "timestamp": latest.get("timestamp"),
+        "seq": latest.get("seq"),
+        "forecast": (latest.get("data") or {}).get("forecast"),
+    }
+
+
+@app.get("/api/processes/leaderboard", tags=["Metrics"])
+def process_leaderboard(window: str = "1h", by: str = "cpu", limit: Optional[int] = None):
+    """
+    Commands that used the most CPU time or memory over a window.
+    
+    Args:
+        window: "5m", "1h" or "1d"
+        by: "cpu" (CPU seconds) or "memory" (average RSS over the window)
+        limit: Entries returned (at most LEADERBOARD_SIZE)
+    
+    Counts come from bounded space-saving summaries (see leaderboard.py);
+    every entry carries an error bound and is exact when the bound is 0.
+    """
+    if window not in leaderboard.WINDOWS:
+        raise HTTPException(status_code=400, detail=f"window must be one of {', '.join(leaderboard.WINDOWS)}")
+    if by not in ("cpu", "memory"):
+        raise HTTPException(status_code=400, detail="by must be cpu or memory")
+    if limit is not None and limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be >= 1")
+    latest = get_latest_metrics()
+    table = (latest.get("leaderboard") or {}).get(window) or {"observed_s": 0, "cpu": [], "memory": []}
+    return {
+        "timestamp": latest.get("timestamp"),
+        "window": window,
+        "by": by,
+        "observed_s": table["observed_s"],
+        "commands": table[by][:limit],
+    }
+
+
+def _fetch_incidents(incident_id: Optional[str] = None):
+    try:
+        return metrics_proxy.fetch_incidents(incident_id)
+    except requests.exceptions.HTTPError as e:
+        status = e.response.status_code if e.response is not None else 502
+        if status == 404:
+            raise HTTPException(status_code=404, detail=f"Unknown incident {incident_id}")
+        raise HTTPException(status_code=502, detail=f"Host API error: {e}")
+    except requests.exceptions.RequestException as e:
+        raise HTTPException(status_code=502, detail=f"Failed to fetch from host API: {e}")
+
+
+@app.get("/api/incidents", tags=["Incidents"])
+def list_incidents():
+    """
+    High-resolution captures started when CPU or memory crossed the incident
+    threshold (id, reason, start/end, sample count), newest first.
+    """
+    return _fetch_incidents()
+
+
+@app.get("/api/incidents/{incident_id}", tags=["Incidents"])
+def get_incident(incident_id: str):
+    """
+    One incident record: the snapshot that triggered it, ~250 ms
+    CPU/memory/network series stored as column arrays, and the top
+    processes every second. A capture still running has "ended": null.
+    """
+    return _fetch_incidents(incident_id)
+
+
+@app.get("/api/debug/pipeline", tags=["Health"])
+def pipeline_latency():
+    """
+    Latency histograms per pipeline stage, as seen by the worker serving
+    the request: host queueing, collection (overall and per collector),
+    host response, host -> backend transfer, publish, age at serve time,
+    the dashboard's fetch round trip and the end-to-end age it reported.
+    """
+    return pipeline.STATS.summary()
+
+
 @app.get("/api/health", tags=["Health"])
 def health_check():
     """
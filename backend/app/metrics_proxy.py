@@ -8,82 +8,248 @@ The backend container NEVER reads /proc directly - it only fetches metrics
 from the host API which runs the trusted bash script on the host.
 """
 import requests
+import threading
 import time
 import logging
-import json
-from pathlib import Path
+from datetime import datetime
+from typing import Dict, Any, Optional
 
-# ... (imports)
+from . import forecast, leaderboard, pipeline
+from .config import settings
+from .history import HistoryWriter, last_record
+from .ring import SnapshotRing
+from .shm import CollectorLock, SnapshotSegment
+from .state import StateStore
 
-HISTORY_FILE = Path("history.jsonl")
+logger = logging.getLogger(__name__)
 
-# Initialize persistent storage (reset on startup)
-if HISTORY_FILE.exists():
-    try:
-        HISTORY_FILE.unlink()
-    except OSError:
-        pass # Ignore if open
+# Persistent history (kept across restarts), written only by the collector
+HISTORY_FILE = settings.HISTORY_FILE
+HISTORY = HistoryWriter(
+    HISTORY_FILE,
+    commit_interval=settings.HISTORY_COMMIT_INTERVAL_SECONDS,
+    commit_bytes=settings.HISTORY_COMMIT_BYTES,
+    rotate_bytes=settings.HISTORY_ROTATE_BYTES,
+    rotate_hourly=settings.HISTORY_ROTATE_HOURLY,
+    retention_bytes=settings.HISTORY_RETENTION_BYTES,
+    retention_hours=settings.HISTORY_RETENTION_HOURS,
+)
 
 # Global storage for latest metrics fetched from host API
 LATEST: Dict[str, Any] = {
-# ...
+    "timestamp": None,
+    "data": None,
+    "error": None,
 }
 
+# Warm-start checkpoint of the latest snapshot
+STATE_STORE = StateStore(settings.STATE_FILE, settings.STATE_MAX_AGE_SECONDS)
+
+
+def _export_snapshot() -> Optional[Dict[str, Any]]:
+    # Only checkpoint snapshots that carry data; an error is not worth restoring
+    return LATEST if LATEST.get("data") else None
+
+
+def _restore_snapshot(snapshot: Optional[Dict[str, Any]]) -> None:
+    global LATEST
+    if snapshot and snapshot.get("data"):
+        LATEST = snapshot
+
+
+STATE_STORE.register("snapshot", _export_snapshot, _restore_snapshot)
+STATE_STORE.register("forecast", forecast.FORECASTS.trends.export_state, forecast.FORECASTS.trends.restore_state)
+STATE_STORE.register("leaderboard", leaderboard.LEADERBOARD.export_state, leaderboard.LEADERBOARD.restore_state)
+
+# Multi-worker coordination: exactly one process (the lock holder) polls the
+# host API, writes history and publishes into the shared segment; the other
+# workers only read the segment. See shm.py.
+COLLECTOR_LOCK = CollectorLock(settings.COLLECTOR_LOCK_FILE)
+SEGMENT: Optional[SnapshotSegment] = None
+
+# Latest viewer request seen by this process (time.time()); set by the
+# current-metrics endpoint, wakes the poll loop while it backs off
+LAST_VIEWER = 0.0
+VIEWER_ARRIVED = threading.Event()
+
+# Recent snapshots of this worker for /api/metrics/since
+RING = SnapshotRing(settings.SINCE_BUFFER_SIZE)
+
+# Sequence number of the latest published snapshot. It continues across
+# restarts and collector takeovers, so a sequence number identifies how much
+# history exists (used as a cache key for reports).
+SEQ = 0
+
+
+def publish(snapshot: Dict[str, Any]) -> None:
+    """
+    Make a snapshot the latest one for this process and all workers.
+
+    New snapshots get the next sequence number; a restored snapshot keeps
+    its own.
+    """
+    global LATEST, SEQ
+    if snapshot.get("seq") is None:
+        SEQ += 1
+        snapshot = {**snapshot, "seq": SEQ}
+        if snapshot.get("trace"):
+            snapshot["trace"] = {**snapshot["trace"], "published": pipeline.stamp()}
+    else:
+        SEQ = max(SEQ, snapshot["seq"])
+    LATEST = snapshot
+    if SEGMENT is not None and SEGMENT.owner:
+        SEGMENT.write(snapshot)
+    pipeline.STATS.observe(snapshot)
+    RING.append(history_record(snapshot))
+
+
+def history_record(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """A snapshot as stored in history and replayed to clients (without the leaderboard tables)."""
+    return {k: v for k, v in snapshot.items() if k != "leaderboard"}
+
+
+def _latest_known() -> Optional[Dict[str, Any]]:
+    """
+    Newest snapshot left by any previous collector: the restored checkpoint,
+    the shared segment or the last history record, by sequence number. The
+    checkpoint may be up to CHECKPOINT_INTERVAL_SECONDS older than the other
+    two.
+    """
+    candidates = [LATEST] if LATEST.get("data") else []
+    if SEGMENT is not None:
+        _, snapshot = SEGMENT.read()
+        if snapshot:
+            candidates.append(snapshot)
+    try:
+        record = last_record(HISTORY_FILE)
+    except OSError:
+        record = None
+    if record:
+        candidates.append(record)
+    return max(candidates, key=lambda s: s.get("seq") or 0, default=None)
+
+
+def note_viewer() -> None:
+    """Record that a client requested current metrics (from any worker)."""
+    global LAST_VIEWER
+    now = time.time()
+    idle = not viewers_active(now)
+    LAST_VIEWER = now
+    if SEGMENT is not None:
+        SEGMENT.touch_viewer(now)
+    if idle:
+        VIEWER_ARRIVED.set()
 
-def collect_from_host_api():
+
+def viewers_active(now: Optional[float] = None) -> bool:
+    """True if any worker served current metrics within VIEWER_TIMEOUT_SECONDS."""
+    now = time.time() if now is None else now
+    last = LAST_VIEWER
+    if SEGMENT is not None:
+        last = max(last, SEGMENT.last_viewer())
+    return now - last < settings.VIEWER_TIMEOUT_SECONDS
+
+
+def collect_from_host_api(live: bool = False, interval: Optional[float] = None) -> Optional[float]:
     """
     Fetch metrics from the host API and update LATEST.
-    Also appends the data to the persistent history file.
+    Also queues the data for the persistent history log (committed to disk
+    by the history writer's own thread).
+
+    Args:
+        live: Ask the host API to sample every group at its minimum interval
+        interval: Seconds since the previous poll, recorded in the snapshot
+
+    Returns:
+        Seconds until the host API expects its next collector group to be
+        due, or None if it did not say
     """
-    global LATEST
-    
     url = f"{settings.HOST_API_BASE_URL}/api/metrics/current"
     
     try:
         logger.debug(f"Fetching metrics from host API: {url}")
-        r = requests.get(url, timeout=180)
+        r = requests.get(url, params={"live": "true" if live else "false"}, timeout=180)
         r.raise_for_status()
         payload = r.json()
+        received = pipeline.stamp()
         
-        # Normalize: expect host API to return {timestamp, data, error}
+        # Normalize: expect host API to return {timestamp, data, error, trace}
         current_data = {
             "timestamp": payload.get("timestamp", datetime.utcnow().isoformat() + "Z"),
             "data": payload.get("data"),
             "error": payload.get("error"),
+            "interval_s": None if interval is None else round(interval, 3),
         }
+        if payload.get("trace"):
+            current_data["trace"] = {**payload["trace"], "received": received}
+        if current_data["data"] and not current_data["error"]:
+            now = time.time()
+            current_data["data"]["forecast"] = forecast.FORECASTS.update(now, current_data["data"])
+            # Published for all workers, but not part of the host's data
+            leaderboard.LEADERBOARD.add(now, current_data["data"].get("process_usage"))
+            current_data["leaderboard"] = leaderboard.LEADERBOARD.published(now)
         
-        LATEST = current_data
+        publish(current_data)
         
-        # Append to history file if data is valid
-        if not LATEST.get("error") and LATEST.get("data"):
-            try:
-                with open(HISTORY_FILE, "a", encoding="utf-8") as f:
-                    json.dump(LATEST, f)
-                    f.write("\n")
-            except Exception as e:
-                logger.error(f"Failed to write to history file: {e}")
+        # Queue for history if data is valid
+        if not current_data.get("error") and current_data.get("data"):
+            HISTORY.append(history_record(LATEST))
         
-        if LATEST.get("error"):
-            logger.warning(f"Host API returned error: {LATEST['error']}")
+        if current_data.get("error"):
+            logger.warning(f"Host API returned error: {current_data['error']}")
         else:
             logger.debug(f"Successfully fetched metrics from host API")
+        return ((current_data.get("data") or {}).get("sampling") or {}).get("next_due_s")
             
     except requests.exceptions.RequestException as e:
         error_msg = f"Failed to fetch from host API: {str(e)}"
         logger.error(error_msg)
-        LATEST = {
+        publish({
             "timestamp": datetime.utcnow().isoformat() + "Z",
             "data": None,
             "error": error_msg,
-        }
+        })
     except Exception as e:
         error_msg = f"Unexpected error fetching from host API: {str(e)}"
         logger.error(error_msg, exc_info=True)
-        LATEST = {
+        publish({
             "timestamp": datetime.utcnow().isoformat() + "Z",
             "data": None,
             "error": error_msg,
-        }
+        })
+
+
+def fetch_incidents(incident_id: Optional[str] = None) -> Any:
+    """
+    Incident captures from the host API: the list, or one record by id.
+
+    Records are stored and served by the host API (they are written while
+    the host samples at high resolution), so they are fetched on request.
+
+    Raises:
+        requests.exceptions.RequestException: If the host API fails or
+            does not know the incident (HTTPError with the status code)
+    """
+    url = f"{settings.HOST_API_BASE_URL}/api/incidents"
+    if incident_id is not None:
+        url = f"{url}/{incident_id}"
+    r = requests.get(url, timeout=30)
+    r.raise_for_status()
+    return r.json()
+
+
+def poll_delay(live: bool, next_due: Optional[float]) -> float:
+    """
+    Seconds to wait before the next poll.
+
+    With viewers the poll runs every POLL_INTERVAL_SECONDS; without them it
+    follows the host's next due collector group, within
+    [POLL_INTERVAL_SECONDS, POLL_INTERVAL_MAX_SECONDS].
+    """
+    low = settings.POLL_INTERVAL_SECONDS
+    if live or next_due is None:
+        return low
+    return min(max(next_due, low), max(settings.POLL_INTERVAL_MAX_SECONDS, low))
 
 
 def collect_loop():
@@ -91,35 +257,178 @@ def collect_loop():
     Background loop that periodically fetches metrics from the host API.
     
     This function runs in a background thread and continuously polls the
-    host API for the latest metrics.
+    host API for the latest metrics. While nobody is watching it backs off
+    as the host's adaptive sampling allows, and polls again as soon as a
+    viewer shows up.
     """
-    global LATEST
-    
-    logger.info(f"Starting metrics proxy loop (interval: {settings.POLL_INTERVAL_SECONDS}s)")
+    logger.info(
+        f"Starting metrics proxy loop (interval: {settings.POLL_INTERVAL_SECONDS}s, "
+        f"up to {settings.POLL_INTERVAL_MAX_SECONDS}s without viewers)"
+    )
     logger.info(f"Host API URL: {settings.HOST_API_BASE_URL}")
     
+    last_poll: Optional[float] = None
     while True:
+        live = viewers_active()
+        next_due = None
+        started = time.monotonic()
         try:
-            collect_from_host_api()
+            next_due = collect_from_host_api(
+                live=live,
+                interval=None if last_poll is None else started - last_poll,
+            )
         except Exception as e:
             logger.error(f"Error in metrics proxy loop: {e}", exc_info=True)
-            LATEST = {
+            publish({
                 "timestamp": datetime.utcnow().isoformat() + "Z",
                 "data": None,
                 "error": str(e),
-            }
+            })
+        
+        last_poll = started
         
-        # Wait before next fetch
+        # Wait before next fetch; viewers on other workers are only visible
+        # through the shared segment, so check it once a second
+        deadline = started + poll_delay(live, next_due)
+        VIEWER_ARRIVED.clear()
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if VIEWER_ARRIVED.wait(min(remaining, 1.0)) or (not live and viewers_active()):
+                break
+
+
+def become_collector() -> None:
+    """
+    Take over polling in this process (the collector lock must be held).
+
+    Creates the shared segment, restores the warm-start checkpoint, opens
+    the history log and starts the polling and checkpoint threads.
+    """
+    global SEGMENT, SEQ
+    if SEGMENT is not None:
+        SEGMENT.close()
+        SEGMENT = None
+    try:
+        SEGMENT = SnapshotSegment.create(settings.SHM_NAME, settings.SHM_SIZE_BYTES)
+    except OSError as e:
+        logger.warning(f"Shared memory unavailable, serving from this process only: {e}")
+
+    # Serve the last known snapshot until the first poll completes; never
+    # one older than what followers and clients have already seen
+    STATE_STORE.load()
+    latest = _latest_known()
+    SEQ = (latest.get("seq") or 0) if latest else 0
+    if latest is not None and latest.get("data"):
+        publish(latest)
+
+    try:
+        HISTORY.start()
+    except OSError as e:
+        logger.error(f"Cannot open history log {HISTORY_FILE}: {e}")
+
+    threading.Thread(target=collect_loop, daemon=True).start()
+    threading.Thread(
+        target=STATE_STORE.checkpoint_loop,
+        args=(settings.CHECKPOINT_INTERVAL_SECONDS,),
+        daemon=True,
+    ).start()
+    logger.info("This worker is the metrics collector")
+
+
+def standby_loop() -> None:
+    """
+    Background loop for non-collector workers.
+
+    Attaches to the shared segment once it exists and takes over collection
+    if the collector process exits (its flock is released by the kernel).
+    """
+    global SEGMENT
+    while True:
+        if SEGMENT is None:
+            try:
+                SEGMENT = SnapshotSegment.attach(settings.SHM_NAME)
+            except OSError as e:
+                logger.debug(f"Cannot attach shared segment yet: {e}")
+        if COLLECTOR_LOCK.try_acquire():
+            logger.info("Collector process went away, taking over collection")
+            become_collector()
+            return
         time.sleep(settings.POLL_INTERVAL_SECONDS)
 
 
+def follow_segment() -> None:
+    """
+    Feed this worker's ring from the shared segment until it becomes the
+    collector (which then appends in publish()). An unchanged segment costs
+    one 8-byte read per check.
+    """
+    interval = settings.SINCE_FOLLOW_INTERVAL_MS / 1000.0
+    while not COLLECTOR_LOCK.held:
+        segment = SEGMENT
+        if segment is not None and not segment.owner:
+            _, snapshot = segment.read()
+            if snapshot is not None:
+                RING.append(history_record(snapshot))
+        time.sleep(interval)
+
+
+def published_seq() -> Optional[int]:
+    """
+    Sequence number of the newest published snapshot, None if unknown.
+
+    Workers that are not the collector read it from the shared segment and
+    append that snapshot to their ring, so a client handed over from a
+    worker that was further ahead is caught up without waiting for
+    follow_segment.
+    """
+    if SEGMENT is not None and not SEGMENT.owner:
+        _, snapshot = SEGMENT.read()
+        if snapshot is None:
+            return None
+        RING.append(history_record(snapshot))
+        return snapshot.get("seq")
+    return SEQ
+
+
+def start() -> bool:
+    """
+    Elect the collector process and start this worker's background threads.
+
+    Returns:
+        True if this process polls the host API, False if it only reads
+    """
+    if COLLECTOR_LOCK.try_acquire():
+        become_collector()
+        return True
+    threading.Thread(target=standby_loop, daemon=True).start()
+    threading.Thread(target=follow_segment, daemon=True).start()
+    logger.info("Another worker is collecting; serving from shared memory")
+    return False
+
+
+def shutdown() -> None:
+    """Commit pending history and write a final checkpoint if this process is the collector."""
+    if COLLECTOR_LOCK.held:
+        HISTORY.close()
+        STATE_STORE.save()
+
+
 def get_latest_metrics() -> Dict[str, Any]:
     """
     Get the latest metrics fetched from the host API.
     
+    Workers that are not the collector read the shared segment; the decoded
+    snapshot is reused until its sequence number changes.
+
     Returns:
         Dictionary with timestamp, data, and error fields
     """
+    if SEGMENT is not None and not SEGMENT.owner:
+        _, snapshot = SEGMENT.read()
+        if snapshot is not None:
+            return snapshot.copy()
     # Return a copy to avoid race conditions
     return LATEST.copy()
 
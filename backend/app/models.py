@@ -6,6 +6,23 @@ from typing import Optional, List, Dict, Any
 from pydantic import BaseModel
 from datetime import datetime
 
+class CPUBurst(BaseModel):
+    """Distribution of sub-second CPU usage ticks since the previous snapshot."""
+    interval_ms: int
+    samples: int
+    window_s: float
+    dropped: int = 0  # Ticks overwritten before a snapshot summarised them
+    min: float
+    max: float
+    mean: Optional[float] = None
+    p50: float
+    p95: float
+    p99: float
+    threshold: float
+    above_threshold_s: float
+    above_threshold_percent: float
+    stall_max_percent: Optional[float] = None  # From /proc/pressure/cpu "some"
+
 class CPUMetrics(BaseModel):
     """CPU metrics model."""
     model: str
@@ -13,13 +30,69 @@ class CPUMetrics(BaseModel):
     usage: float  # percentage
     load_avg: Optional[str] = None
     temperature: Optional[str] = None  # Can be "N/A" or "XX°C"
+    burst: Optional[CPUBurst] = None  # None without the native sampler
+
+class MemoryDetail(BaseModel):
+    """Full /proc/meminfo breakdown in bytes (hugepage counts are pages)."""
+    total: Optional[int] = None
+    free: Optional[int] = None
+    available: Optional[int] = None
+    used: Optional[int] = None
+    buffers: Optional[int] = None
+    cached: Optional[int] = None
+    swap_cached: Optional[int] = None
+    active: Optional[int] = None
+    inactive: Optional[int] = None
+    swap_total: Optional[int] = None
+    swap_free: Optional[int] = None
+    swap_used: Optional[int] = None
+    dirty: Optional[int] = None
+    writeback: Optional[int] = None
+    anon: Optional[int] = None
+    mapped: Optional[int] = None
+    shmem: Optional[int] = None
+    slab: Optional[int] = None
+    slab_reclaimable: Optional[int] = None
+    slab_unreclaimable: Optional[int] = None
+    page_tables: Optional[int] = None
+    commit_limit: Optional[int] = None
+    committed: Optional[int] = None
+    hugepages_total: Optional[int] = None
+    hugepages_free: Optional[int] = None
+    hugepage_size: Optional[int] = None
+
+class VmstatMetrics(BaseModel):
+    """Paging/OOM counters from /proc/vmstat and their per-second rates."""
+    counters: Dict[str, int]
+    rates: Dict[str, float]
 
 class MemoryMetrics(BaseModel):
     """Memory metrics model."""
     total_gb: float
-    used_gb: float
-    free_gb: float
+    used_gb: float  # total - available
+    free_gb: float  # MemFree (native collector) or MemAvailable (script)
     percent: float
+    available_gb: Optional[float] = None
+    detail: Optional[MemoryDetail] = None
+    vmstat: Optional[VmstatMetrics] = None
+
+class PressureStats(BaseModel):
+    """One PSI line: averages in percent, total stall time in microseconds."""
+    avg10: float
+    avg60: float
+    avg300: float
+    total: int
+
+class ResourcePressure(BaseModel):
+    """PSI for one resource; "full" is absent for cpu on older kernels."""
+    some: Optional[PressureStats] = None
+    full: Optional[PressureStats] = None
+
+class PressureMetrics(BaseModel):
+    """Pressure Stall Information from /proc/pressure."""
+    cpu: Optional[ResourcePressure] = None
+    memory: Optional[ResourcePressure] = None
+    io: Optional[ResourcePressure] = None
 
 class PartitionInfo(BaseModel):
     """Details for a single disk partition."""
@@ -28,34 +101,178 @@ class PartitionInfo(BaseModel):
     used: str
     avail: str
     percent: float
+    size_bytes: Optional[int] = None  # Exact, from df -kP
+    used_bytes: Optional[int] = None
+    avail_bytes: Optional[int] = None
+
+class PartitionIO(BaseModel):
+    """Throughput and IOPS of one partition."""
+    name: str
+    read_bytes_per_s: float
+    write_bytes_per_s: float
+    read_iops: float
+    write_iops: float
+
+class DiskIODevice(BaseModel):
+    """Rates of one disk from /proc/diskstats deltas."""
+    name: str
+    read_bytes_per_s: float
+    write_bytes_per_s: float
+    read_iops: float
+    write_iops: float
+    read_await_ms: Optional[float] = None  # None without completed reads
+    write_await_ms: Optional[float] = None
+    await_ms: Optional[float] = None
+    queue_depth: float  # Average requests in flight
+    util_percent: float  # Share of wall time with I/O in flight
+    in_flight: int
+    partitions: List[PartitionIO] = []
+
+class DiskIOTotal(BaseModel):
+    """Read/write rollup over disks not stacked on other disks (dm, md)."""
+    read_bytes_per_s: float
+    write_bytes_per_s: float
+    read_iops: float
+    write_iops: float
+
+class DiskIOMetrics(BaseModel):
+    """Block device I/O from /proc/diskstats."""
+    devices: List[DiskIODevice]
+    total: DiskIOTotal
 
 class DiskMetrics(BaseModel):
     """Disk metrics model."""
     display: Optional[str] = None  # Formatted string (Legacy)
     percent: Optional[float] = None # Primary disk percent
     partitions: Optional[List[PartitionInfo]] = None # List of all partitions
+    io: Optional[DiskIOMetrics] = None  # None without /proc/diskstats
 
 class TrafficStats(BaseModel):
     rx: float
     tx: float
 
+class InterfaceStats(BaseModel):
+    """Counters and rates for a single network interface."""
+    name: str
+    link: str  # "lan", "wifi" or "loopback" (from /sys/class/net)
+    rx_bytes: int
+    tx_bytes: int
+    rx_packets: int
+    tx_packets: int
+    rx_errors: int
+    tx_errors: int
+    rx_drops: int
+    tx_drops: int
+    rx_rate: float  # bytes/s
+    tx_rate: float  # bytes/s
+
 class NetworkStats(BaseModel):
     lan: TrafficStats
     wifi: TrafficStats
     tcp: int
+    interfaces: Optional[List[InterfaceStats]] = None  # Native collector only
+
+class TcpSummary(BaseModel):
+    """TCP socket counts by address family and state."""
+    total: int
+    ipv4: int
+    ipv6: int
+    states: Dict[str, int]  # e.g. {"ESTABLISHED": 120, "TIME_WAIT": 30}
+
+class UdpSummary(BaseModel):
+    """UDP socket counts by address family."""
+    total: int
+    ipv4: int
+    ipv6: int
+
+class ListenPort(BaseModel):
+    """A listening port and its established connection count."""
+    port: int
+    connections: int
+
+class SocketSummary(BaseModel):
+    """Socket summary from netlink sock_diag (or /proc/net fallback)."""
+    source: str  # "netlink" or "proc"
+    tcp: TcpSummary
+    udp: UdpSummary
+    top_listen_ports: List[ListenPort] = []
 
 class NetworkMetrics(BaseModel):
     """Network metrics model."""
     data: Optional[str] = None
     stats: Optional[NetworkStats] = None  # Formatted network data string
+    sockets: Optional[SocketSummary] = None
     # Could be parsed further if needed
 
+class GPUDevice(BaseModel):
+    """Latest values for one GPU from the nvidia-smi stream."""
+    index: int
+    uuid: Optional[str] = None
+    name: str
+    utilization_percent: Optional[float] = None
+    memory_utilization_percent: Optional[float] = None
+    memory_used_mib: Optional[float] = None
+    memory_total_mib: Optional[float] = None
+    temperature_c: Optional[float] = None
+    power_draw_w: Optional[float] = None
+    power_limit_w: Optional[float] = None
+    clock_sm_mhz: Optional[float] = None
+    clock_mem_mhz: Optional[float] = None
+    energy_j: float = 0.0  # Integrated from power draw since the stream started
+    memory_used_rate_mib_s: Optional[float] = None
+    age_seconds: Optional[float] = None
+
 class GPUMetrics(BaseModel):
     """GPU metrics model."""
     name: str
     memory: Optional[str] = None
     temperature: Optional[str] = None
     utilization: Optional[str] = None
+    devices: Optional[List[GPUDevice]] = None  # All GPUs when streamed natively
+
+class PowerDomain(BaseModel):
+    """One RAPL domain (package, core, uncore, dram)."""
+    zone: str  # powercap zone, e.g. "intel-rapl:0:1"
+    name: str
+    package: str
+    power_w: Optional[float] = None  # None on the first sample
+    energy_j: Optional[float] = None  # Energy used over the sample interval
+
+class PowerMetrics(BaseModel):
+    """CPU/DRAM power from RAPL energy counters."""
+    available: bool
+    reason: Optional[str] = None  # Why power is unavailable (VM, WSL, permissions)
+    interval_s: Optional[float] = None
+    package_w: Optional[float] = None  # Sum over CPU packages
+    domains: List[PowerDomain] = []
+
+class CommandUsage(BaseModel):
+    """CPU time and RSS of all processes of one command over a sample."""
+    command: str
+    cpu_seconds: float
+    rss_bytes: int
+    processes: int
+
+class ProcessUsage(BaseModel):
+    """Per-command usage since the previous scan (feeds the process leaderboard)."""
+    sample: int  # Increases by one per host scan; repeated while cached
+    interval_s: Optional[float] = None  # None on the first scan
+    commands: List[CommandUsage] = []
+
+class ForecastEstimate(BaseModel):
+    """Least-squares trend of one series (see forecast.py)."""
+    level: float  # Fitted current value (percent or bytes)
+    growth_per_hour: float  # Negative while shrinking
+    time_to_full_s: Optional[int] = None  # None while flat/shrinking or with too little history
+    samples: int
+    span_s: int  # History behind the fit
+
+class ForecastMetrics(BaseModel):
+    """Growth and time until full of memory, swap and every partition."""
+    window_s: float  # Time constant of the weighting
+    memory: Optional[ForecastEstimate] = None
+    swap: Optional[ForecastEstimate] = None  # Used swap bytes
+    partitions: Dict[str, Optional[ForecastEstimate]] = {}  # By mount path, used bytes
 
 class SystemMetrics(BaseModel):
     """System info metrics model."""
@@ -72,6 +289,101 @@ class ProcessInfo(BaseModel):
     memory_percent: Optional[str] = None
     command: Optional[str] = None
 
+class CgroupIO(BaseModel):
+    """io.stat counters summed across devices."""
+    rbytes: int
+    wbytes: int
+    rios: int
+    wios: int
+
+class CgroupInfo(BaseModel):
+    """Resource usage of one cgroup v2 slice, scope or container."""
+    path: str
+    container_id: Optional[str] = None  # Short Docker/containerd/podman id
+    cpu_usage_usec: int
+    cpu_user_usec: int
+    cpu_system_usec: int
+    cpu_throttled_usec: int
+    cpu_percent: float  # 100 = one full core
+    memory_current: Optional[int] = None  # bytes
+    memory: Optional[Dict[str, int]] = None  # Selected memory.stat fields
+    io: Optional[CgroupIO] = None
+    io_read_rate: float  # bytes/s
+    io_write_rate: float  # bytes/s
+    cpu_pressure: Optional[ResourcePressure] = None
+
+class CgroupMetrics(BaseModel):
+    """Per-cgroup usage, sorted by CPU."""
+    root: str
+    groups: List[CgroupInfo]
+
+class SmartDevice(BaseModel):
+    """SMART health of one drive."""
+    device: str
+    model: Optional[str] = None
+    serial: Optional[str] = None
+    health: str  # PASSED, FAILED or Unknown
+    temperature_c: Optional[float] = None
+    reallocated_sectors: Optional[int] = None
+    wear_percent: Optional[float] = None  # Rated life used (NVMe percentage_used / SSD wear attributes)
+    power_on_hours: Optional[int] = None
+    media_errors: Optional[int] = None
+    error: Optional[str] = None
+
+class SmartMetrics(BaseModel):
+    """Cached SMART results for all drives."""
+    devices: List[SmartDevice]
+    age_seconds: float  # Time since the last smartctl refresh
+
+class CollectorRun(BaseModel):
+    """One collector's part of a sample."""
+    ms: float
+    cpu_ms: Optional[float] = None  # CPU time of the collect call on its thread
+    error: Optional[str] = None
+    interval_s: Optional[float] = None  # Time since its previous run (actual sampling interval)
+    target_s: Optional[float] = None  # Adaptive interval it is currently held to
+    cached: bool = False  # Not due; previous values reused
+
+class OverheadGovernor(BaseModel):
+    """State of the host API's monitoring cost budget governor."""
+    budget_percent: float  # Percent of one core; 0 only measures
+    average_cpu_percent: Optional[float] = None
+    over_budget: bool = False
+    degraded: bool = False  # Some intervals are stretched beyond their minimum
+    exhausted: bool = False  # Over budget with nothing left to stretch
+    stretched: Dict[str, float] = {}  # Collector -> interval floor (s)
+    cost_ms: Dict[str, float] = {}  # Estimated CPU ms per collector run
+    child_cpu_percent: Dict[str, float] = {}  # Long-lived child of a collector (script stream, nvidia-smi)
+    unattributed_cpu_percent: Optional[float] = None  # Children that exited between samples
+
+class OverheadMetrics(BaseModel):
+    """What the host API and its children cost since the previous sample."""
+    interval_s: Optional[float] = None
+    cpu_percent: Optional[float] = None  # Self + children, percent of one core
+    self_cpu_percent: Optional[float] = None
+    children_cpu_percent: Optional[float] = None
+    self_cpu_s: float
+    children_cpu_s: float
+    children_cpu_delta_s: float = 0.0
+    long_lived_cpu_s: Dict[str, float] = {}  # Collector -> CPU of its long-lived child
+    rss_bytes: Optional[int] = None
+    threads: Optional[int] = None
+    forks: int = 0
+    forks_total: int = 0
+    governor: Optional[OverheadGovernor] = None
+
+class SamplingInfo(BaseModel):
+    """Adaptive sampling state of the host API."""
+    live: bool
+    next_due_s: Optional[float] = None  # Until the next collector group is due
+
+class ScriptStreamStatus(BaseModel):
+    """State of the host's system_monitor.sh --json-stream child (SCRIPT_MODE=stream)."""
+    running: bool
+    age_s: Optional[float] = None  # Since the last tick
+    stale: bool  # The script sections come from a child that exited or is overdue
+    restarts: int
+
 class MetricsSnapshot(BaseModel):
     """Complete metrics snapshot from the monitoring script."""
     timestamp: str
@@ -82,12 +394,162 @@ class MetricsSnapshot(BaseModel):
     gpu: GPUMetrics
     system: SystemMetrics
     top_processes: List[ProcessInfo]
+    pressure: Optional[PressureMetrics] = None  # None on kernels without PSI
+    cgroups: Optional[CgroupMetrics] = None  # None without cgroup v2
+    smart: Optional[SmartMetrics] = None  # None without smartctl
+    power: Optional[PowerMetrics] = None
+    process_usage: Optional[ProcessUsage] = None
+    script_stream: Optional[ScriptStreamStatus] = None
+    forecast: Optional[ForecastMetrics] = None  # Added by the backend collector
+    collectors: Optional[Dict[str, CollectorRun]] = None
+    overhead: Optional[OverheadMetrics] = None  # Cost of the host API itself
+    sampling: Optional[SamplingInfo] = None
     alerts: Optional[str] = None
+    incident: Optional[str] = None  # Id of the running incident capture
     error: Optional[str] = None
 
 class MetricsResponse(BaseModel):
     """API response model for current metrics."""
     timestamp: str
+    seq: Optional[int] = None  # Increases by one per snapshot fetched from the host API
+    interval_s: Optional[float] = None  # Time since the previous poll of the host API
     data: Optional[MetricsSnapshot] = None
     error: Optional[str] = None
+    trace: Optional[Dict[str, Any]] = None  # Freshness trace (see pipeline.py)
+
+
+
+# Schema v2: numbers in base units only (see schema_v2.py); field names end
+# in their unit and per-entity values are keyed maps
+
+class CPUBurstV2(BaseModel):
+    """Sub-second CPU usage distribution as ratios."""
+    min_ratio: Optional[float] = None
+    max_ratio: Optional[float] = None
+    p50_ratio: Optional[float] = None
+    p95_ratio: Optional[float] = None
+    p99_ratio: Optional[float] = None
+    above_threshold_s: Optional[float] = None
+    window_s: Optional[float] = None
+
+class CPUMetricsV2(BaseModel):
+    """CPU metrics (v2)."""
+    usage_ratio: Optional[float] = None
+    cores: Optional[int] = None
+    load_1m: Optional[float] = None
+    temperature_c: Optional[float] = None
+    burst: Optional[CPUBurstV2] = None
+
+class MemoryMetricsV2(BaseModel):
+    """Memory in bytes."""
+    total_bytes: Optional[int] = None
+    used_bytes: Optional[int] = None
+    free_bytes: Optional[int] = None
+    available_bytes: Optional[int] = None
+    used_ratio: Optional[float] = None
+    swap_total_bytes: Optional[int] = None
+    swap_used_bytes: Optional[int] = None
+
+class PartitionV2(BaseModel):
+    """One filesystem in bytes."""
+    size_bytes: Optional[int] = None
+    used_bytes: Optional[int] = None
+    avail_bytes: Optional[int] = None
+    used_ratio: Optional[float] = None
 
+class DiskDeviceV2(BaseModel):
+    """I/O of one block device (disk or partition)."""
+    read_bytes_per_s: Optional[float] = None
+    write_bytes_per_s: Optional[float] = None
+    read_iops: Optional[float] = None
+    write_iops: Optional[float] = None
+    await_s: Optional[float] = None
+    queue_depth: Optional[float] = None
+    util_ratio: Optional[float] = None
+
+class DiskMetricsV2(BaseModel):
+    """Disk metrics (v2)."""
+    used_ratio: Optional[float] = None
+    partitions: Dict[str, PartitionV2]  # By mount point
+    devices: Dict[str, DiskDeviceV2] = {}  # By block device name
+
+class InterfaceV2(BaseModel):
+    """Counters and rates of one network interface."""
+    rx_bytes: Optional[int] = None
+    tx_bytes: Optional[int] = None
+    rx_bytes_per_s: Optional[float] = None
+    tx_bytes_per_s: Optional[float] = None
+    errors: int = 0
+    drops: int = 0
+
+class NetworkMetricsV2(BaseModel):
+    """Network metrics (v2)."""
+    lan_rx_bytes_per_s: Optional[float] = None
+    lan_tx_bytes_per_s: Optional[float] = None
+    wifi_rx_bytes_per_s: Optional[float] = None
+    wifi_tx_bytes_per_s: Optional[float] = None
+    tcp_connections: Optional[int] = None
+    interfaces: Dict[str, InterfaceV2]  # By interface name
+
+class GPUDeviceV2(BaseModel):
+    """One GPU in bytes, degrees Celsius, watts and joules."""
+    utilization_ratio: Optional[float] = None
+    memory_used_bytes: Optional[int] = None
+    memory_total_bytes: Optional[int] = None
+    temperature_c: Optional[float] = None
+    power_w: Optional[float] = None
+    energy_j: Optional[float] = None
+
+class SystemMetricsV2(BaseModel):
+    """System metrics (v2)."""
+    uptime_s: Optional[int] = None
+    process_count: Optional[int] = None
+
+class PressureV2(BaseModel):
+    """PSI of one resource as ratios and seconds."""
+    some_avg10_ratio: Optional[float] = None
+    some_avg60_ratio: Optional[float] = None
+    full_avg10_ratio: Optional[float] = None
+    some_total_s: Optional[float] = None
+
+class SmartDeviceV2(BaseModel):
+    """SMART health of one drive."""
+    healthy: Optional[int] = None  # 1 PASSED, 0 FAILED, None unknown
+    temperature_c: Optional[float] = None
+    wear_ratio: Optional[float] = None
+    power_on_s: Optional[int] = None
+    reallocated_sectors: Optional[int] = None
+
+class PowerDomainV2(BaseModel):
+    """Power of one RAPL domain."""
+    power_w: Optional[float] = None
+    energy_j: Optional[float] = None
+
+class ProcessV2(BaseModel):
+    """One top process."""
+    command: Optional[str] = None
+    memory_ratio: Optional[float] = None
+
+class MetricsSnapshotV2(BaseModel):
+    """Numeric snapshot; units and host metadata are in /api/v2/schema."""
+    cpu: CPUMetricsV2
+    memory: MemoryMetricsV2
+    disk: DiskMetricsV2
+    network: NetworkMetricsV2
+    gpu: Dict[str, GPUDeviceV2]  # By GPU index
+    system: SystemMetricsV2
+    pressure: Dict[str, PressureV2]  # cpu, memory, io
+    smart: Dict[str, SmartDeviceV2]  # By device path
+    power: Dict[str, PowerDomainV2] = {}  # By powercap zone; empty when unavailable
+    processes: Dict[str, ProcessV2]  # Top processes by pid
+    alerts_active: int = 0
+
+class MetricsResponseV2(BaseModel):
+    """API response wrapper for the v2 schema."""
+    schema_version: int = 2
+    timestamp: str
+    seq: Optional[int] = None
+    interval_s: Optional[float] = None
+    data: Optional[MetricsSnapshotV2] = None
+    error: Optional[str] = None
+    trace: Optional[Dict[str, Any]] = None
@@ -0,0 +1,160 @@
+"""
+Freshness tracing and per-stage latency histograms (/api/debug/pipeline).
+
+Every snapshot carries a trace record through the pipeline:
+
+    host API     requested, collect_start, collect_end, responded, and
+                 per-collector start/end offsets ("sections")
+    backend      received (response parsed), published (seq assigned and
+                 written to the shared segment), served (per request)
+    dashboard    reports its fetch round trip and the resulting end-to-end
+                 age on its next poll (trace_rtt_ms, trace_e2e_ms)
+
+Each point is {"wall": time.time(), "mono": time.monotonic()}. Durations
+within one process use the monotonic clock; hops between processes (host
+API -> backend -> worker serving the request) use wall time, which all
+processes on the host share. The dashboard never compares its own clock
+with the server's: it adds half its measured round trip to the server-side
+age at serve time.
+
+Stage durations go into fixed-bucket histograms, one per stage. Each worker
+keeps its own: stages of a snapshot are recorded by the collector when it
+publishes and by reader workers when they first serve it, so every worker
+reports the snapshots it saw plus the requests it served.
+"""
+import bisect
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# Upper bounds of the histogram buckets in milliseconds (last bucket: +Inf)
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000, 120000, 300000)
+
+
+def stamp() -> Dict[str, float]:
+    """A point of the trace."""
+    return {"wall": time.time(), "mono": time.monotonic()}
+
+
+def _ms(start: Optional[Dict[str, float]], end: Optional[Dict[str, float]], clock: str) -> Optional[float]:
+    if not start or not end or start.get(clock) is None or end.get(clock) is None:
+        return None
+    # Wall clocks can step backwards (NTP); never record a negative latency
+    return max((end[clock] - start[clock]) * 1000, 0.0)
+
+
+class LatencyHistogram:
+    """Counts per fixed latency bucket, with sum and max."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (max for the last bucket)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return float(min(BUCKETS_MS[i], round(self.max, 2))) if i < len(BUCKETS_MS) else round(self.max, 2)
+        return round(self.max, 2)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 2) if self.count else None,
+            "max_ms": round(self.max, 2),
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "buckets": {
+                **{f"le_{bound}": n for bound, n in zip(BUCKETS_MS, self.counts)},
+                "le_inf": self.counts[-1],
+            },
+        }
+
+
+class PipelineStats:
+    """Stage histograms of this worker."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: Dict[str, LatencyHistogram] = {}
+        self._seen_seq: Optional[int] = None
+        self.started = time.time()
+
+    def record(self, stage: str, ms: Optional[float]) -> None:
+        if ms is None:
+            return
+        with self._lock:
+            histogram = self._stages.get(stage)
+            if histogram is None:
+                histogram = self._stages[stage] = LatencyHistogram()
+            histogram.add(ms)
+
+    def observe(self, snapshot: Dict[str, Any]) -> None:
+        """Record the host and backend stages of a snapshot, once per sequence number."""
+        trace = snapshot.get("trace")
+        seq = snapshot.get("seq")
+        if not trace or seq is None:
+            return
+        with self._lock:
+            if seq == self._seen_seq:
+                return
+            self._seen_seq = seq
+        self.record("host.queue", _ms(trace.get("requested"), trace.get("collect_start"), "mono"))
+        self.record("host.collect", _ms(trace.get("collect_start"), trace.get("collect_end"), "mono"))
+        self.record("host.respond", _ms(trace.get("collect_end"), trace.get("responded"), "mono"))
+        self.record("host_to_backend", _ms(trace.get("responded"), trace.get("received"), "wall"))
+        self.record("backend.publish", _ms(trace.get("received"), trace.get("published"), "mono"))
+        self.record("collect_to_publish", _ms(trace.get("collect_start"), trace.get("published"), "wall"))
+        for name, span in (trace.get("sections") or {}).items():
+            self.record(f"section.{name}", max(span["end_ms"] - span["start_ms"], 0.0))
+
+    def served(self, snapshot: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Stamp a snapshot's trace as served by this request.
+
+        Returns:
+            The trace to return to the client (with "served" added), or
+            None for snapshots without one
+        """
+        trace = snapshot.get("trace")
+        if not trace:
+            return None
+        self.observe(snapshot)
+        served = stamp()
+        self.record("publish_to_serve", _ms(trace.get("published"), served, "wall"))
+        return {**trace, "served": served}
+
+    def client_report(self, rtt_ms: Optional[float], e2e_ms: Optional[float]) -> None:
+        """Record a dashboard's fetch round trip and end-to-end age estimate."""
+        if rtt_ms is not None and rtt_ms >= 0:
+            self.record("client.fetch", rtt_ms)
+        if e2e_ms is not None and e2e_ms >= 0:
+            self.record("end_to_end", e2e_ms)
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = {name: h.summary() for name, h in sorted(self._stages.items())}
+        return {
+            "worker": os.getpid(),
+            "since": self.started,
+            "buckets_ms": list(BUCKETS_MS),
+            "stages": stages,
+        }
+
+
+STATS = PipelineStats()
@@ -0,0 +1,94 @@
+"""
+Field projections for /api/metrics/current?fields=...
+
+A caller that only needs a few values (a status light showing memory %)
+asks for them as dotted paths, e.g. "cpu.usage,memory.percent,network.stats",
+and receives only those paths instead of the whole snapshot.
+
+Projections are parsed once and cached, and the projected data of the
+latest snapshot is cached per projection until the snapshot's sequence
+number changes, so repeated requests cost a few dictionary lookups.
+"""
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+from .models import MetricsSnapshot
+
+# Keys of a snapshot that can be projected
+SECTIONS = frozenset(MetricsSnapshot.model_fields)
+
+# Projected results kept for the latest snapshot
+MAX_CACHED_PROJECTIONS = 64
+
+
+@lru_cache(maxsize=256)
+def parse_fields(fields: str) -> Tuple[str, ...]:
+    """
+    Parse a comma-separated list of dotted paths.
+
+    Paths covered by a shorter requested path are dropped.
+
+    Raises:
+        ValueError: If no path is given, a path is malformed or its first
+            key is not a snapshot section
+    """
+    paths = sorted({part.strip() for part in fields.split(",") if part.strip()})
+    if not paths:
+        raise ValueError("fields must name at least one section path")
+    for path in paths:
+        keys = path.split(".")
+        if any(not key for key in keys):
+            raise ValueError(f"Malformed field path {path!r}")
+        if keys[0] not in SECTIONS:
+            raise ValueError(f"Unknown field {path!r}")
+    return tuple(p for p in paths if not any(p != q and p.startswith(q + ".") for q in paths))
+
+
+def project(data: Dict[str, Any], paths: Tuple[str, ...]) -> Dict[str, Any]:
+    """Copy only the given paths of a snapshot (missing paths are left out)."""
+    result: Dict[str, Any] = {}
+    for path in paths:
+        keys = path.split(".")
+        value: Any = data
+        for key in keys:
+            if not isinstance(value, dict):
+                value = None
+                break
+            value = value.get(key)
+        if value is None:
+            continue
+        target = result
+        for key in keys[:-1]:
+            target = target.setdefault(key, {})
+        target[keys[-1]] = value
+    return result
+
+
+class ProjectionCache:
+    """Projected data of the latest snapshot, per projection."""
+
+    def __init__(self, max_entries: int = MAX_CACHED_PROJECTIONS):
+        self.max_entries = max_entries
+        self._seq: Optional[int] = None
+        self._items: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, snapshot: Dict[str, Any], paths: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+        data = snapshot.get("data")
+        if data is None:
+            return None
+        seq = snapshot.get("seq")
+        with self._lock:
+            if seq is None or seq != self._seq:
+                self._seq = seq
+                self._items = {}
+            projected = self._items.get(paths)
+            if projected is None:
+                projected = project(data, paths)
+                if seq is not None and len(self._items) < self.max_entries:
+                    self._items[paths] = projected
+            return projected
+
+
+CACHE = ProjectionCache()
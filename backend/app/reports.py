@@ -0,0 +1,443 @@
+"""
+On-demand HTML and CSV reports rendered from the stored history.
+
+Reports used to be rewritten by system_monitor.sh on every tick whether or
+not anyone read them. They are now produced only when requested, for a time
+range, from the history segments (see history.py):
+
+- CSV is streamed row by row through csv.writer, so fields containing
+  commas or quotes (CPU and GPU model names) are quoted correctly and memory
+  stays flat for long ranges.
+- HTML is rendered from templates compiled once at import.
+- Series (/api/metrics/history) are the chart metrics averaged into a fixed
+  number of time buckets, so the dashboard can backfill its graphs after a
+  reload with a few hundred points however long the window is.
+
+Finished reports are cached by (format, range, sequence number of the last
+committed history record); until a new record is committed, repeated
+downloads of the same range are served from memory.
+"""
+import csv
+import html
+import io
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from string import Template
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .history import iter_history_lines, last_record
+
+logger = logging.getLogger(__name__)
+
+# Cached reports: entry count and largest report kept
+CACHE_ENTRIES = 16
+CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+# Rows in the HTML table; longer ranges are evenly thinned
+HTML_MAX_ROWS = 500
+
+CSV_COLUMNS = [
+    "timestamp",
+    "seq",
+    "cpu_model",
+    "cpu_cores",
+    "cpu_usage",
+    "cpu_temperature",
+    "mem_total_gb",
+    "mem_used_gb",
+    "mem_percent",
+    "disk_percent",
+    "disk_read_bytes_per_s",
+    "disk_write_bytes_per_s",
+    "disk_util_max_percent",
+    "cpu_package_w",
+    "gpu_name",
+    "gpu_utilization",
+    "lan_rx",
+    "lan_tx",
+    "wifi_rx",
+    "wifi_tx",
+    "tcp_connections",
+    "alerts",
+]
+
+HTML_TEMPLATE = Template("""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>System Report - $title</title>
+    <style>
+        body { font-family: sans-serif; margin: 20px; background: #f0f2f5; }
+        .container { max-width: 1000px; margin: 0 auto; background: white; padding: 20px; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }
+        h1 { color: #333; border-bottom: 2px solid #eee; padding-bottom: 10px; }
+        .metric { margin-bottom: 15px; padding: 10px; background: #f9f9f9; border-radius: 4px; }
+        .label { font-weight: bold; color: #555; }
+        .value { color: #000; font-family: monospace; }
+        .alert { color: red; font-weight: bold; }
+        table { border-collapse: collapse; width: 100%; font-size: 0.85rem; }
+        th, td { border-bottom: 1px solid #eee; padding: 4px 8px; text-align: right; }
+        th:first-child, td:first-child { text-align: left; }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>System Monitoring Report</h1>
+        <p>Range: $range_start &ndash; $range_end ($count samples). Generated: $generated</p>
+
+        <div class="metric"><span class="label">CPU Model:</span> <span class="value">$cpu_model</span></div>
+        <div class="metric"><span class="label">CPU Cores:</span> <span class="value">$cpu_cores</span></div>
+        <div class="metric"><span class="label">CPU Usage (min / avg / max):</span> <span class="value">$cpu_stats</span></div>
+        <div class="metric"><span class="label">Memory % (min / avg / max):</span> <span class="value">$mem_stats</span></div>
+        <div class="metric"><span class="label">Disk % (min / avg / max):</span> <span class="value">$disk_stats</span></div>
+        <div class="metric"><span class="label">GPU:</span> <span class="value">$gpu</span></div>
+        <div class="metric"><span class="label">Alerts:</span> <span class="value">$alerts</span></div>
+
+        <h3>Samples</h3>
+        <table>
+            <tr><th>Timestamp</th><th>CPU %</th><th>Memory %</th><th>Disk %</th><th>Temp</th></tr>
+$rows
+        </table>
+
+        <h3>Top Processes (latest sample)</h3>
+        <pre>$top_processes</pre>
+    </div>
+</body>
+</html>
+""")
+
+# Chart series of /api/metrics/history: name -> value of a snapshot
+SERIES = {
+    "cpu": lambda data: _number(_get(data, "cpu", "usage")),
+    "memory": lambda data: _number(_get(data, "memory", "percent")),
+    "disk": lambda data: _number(_get(data, "disk", "percent")),
+    "gpu": lambda data: _number(_get(data, "gpu", "utilization")),
+    "lan_rx": lambda data: _number(_get(data, "network", "stats", "lan", "rx")),
+    "lan_tx": lambda data: _number(_get(data, "network", "stats", "lan", "tx")),
+    "wifi_rx": lambda data: _number(_get(data, "network", "stats", "wifi", "rx")),
+    "wifi_tx": lambda data: _number(_get(data, "network", "stats", "wifi", "tx")),
+}
+
+HTML_ROW = "            <tr><td>{}</td><td>{}</td><td>{}</td><td>{}</td><td>{}</td></tr>"
+
+
+def parse_time(value: Optional[str]) -> Optional[datetime]:
+    """
+    Parse an ISO 8601 range bound; naive values are taken as UTC.
+
+    Raises:
+        ValueError: If the value is not ISO 8601
+    """
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def iter_records(active: Path, start: Optional[datetime], end: Optional[datetime]) -> Iterator[Dict[str, Any]]:
+    """Yield history records with start <= timestamp <= end, oldest first."""
+    since = start.timestamp() if start else None
+    for line in iter_history_lines(active, since=since):
+        try:
+            record = json.loads(line)
+            ts = parse_time(record.get("timestamp"))
+        except (json.JSONDecodeError, ValueError):
+            continue
+        if ts is None or (start and ts < start):
+            continue
+        if end and ts > end:
+            return
+        yield record
+
+
+def _get(data: Dict[str, Any], *keys: str) -> Any:
+    value: Any = data
+    for key in keys:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        return float(str(value).rstrip("%"))
+    except (TypeError, ValueError):
+        return None
+
+
+def csv_row(record: Dict[str, Any]) -> List[Any]:
+    data = record.get("data") or {}
+    stats = _get(data, "network", "stats") or {}
+    disk_io = _get(data, "disk", "io") or {}
+    utils = [d.get("util_percent") for d in disk_io.get("devices") or [] if d.get("util_percent") is not None]
+    return [
+        record.get("timestamp"),
+        record.get("seq"),
+        _get(data, "cpu", "model"),
+        _get(data, "cpu", "cores"),
+        _get(data, "cpu", "usage"),
+        _get(data, "cpu", "temperature"),
+        _get(data, "memory", "total_gb"),
+        _get(data, "memory", "used_gb"),
+        _get(data, "memory", "percent"),
+        _get(data, "disk", "percent"),
+        _get(disk_io, "total", "read_bytes_per_s"),
+        _get(disk_io, "total", "write_bytes_per_s"),
+        max(utils) if utils else None,
+        _get(data, "power", "package_w"),
+        _get(data, "gpu", "name"),
+        _get(data, "gpu", "utilization"),
+        _get(stats, "lan", "rx"),
+        _get(stats, "lan", "tx"),
+        _get(stats, "wifi", "rx"),
+        _get(stats, "wifi", "tx"),
+        stats.get("tcp"),
+        data.get("alerts"),
+    ]
+
+
+def render_csv(records: Iterator[Dict[str, Any]]) -> Iterator[bytes]:
+    """Stream CSV: one chunk for the header, then one per record."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> bytes:
+        chunk = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
+
+    writer.writerow(CSV_COLUMNS)
+    yield flush()
+    for record in records:
+        writer.writerow(csv_row(record))
+        yield flush()
+
+
+class _Stats:
+    """Running min/avg/max."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def add(self, value: Optional[float]) -> None:
+        if value is None:
+            return
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def __str__(self) -> str:
+        if not self.count:
+            return "N/A"
+        return f"{self.min:.1f} / {self.total / self.count:.1f} / {self.max:.1f} %"
+
+
+def render_html(records: Iterator[Dict[str, Any]], start: Optional[datetime], end: Optional[datetime]) -> bytes:
+    """Render the HTML report in one pass over the records."""
+    cpu, mem, disk = _Stats(), _Stats(), _Stats()
+    rows: List[Tuple[Any, ...]] = []
+    first_ts = last_ts = None
+    latest: Dict[str, Any] = {}
+    alerts = set()
+    count = 0
+    # Rows keep every stride-th record; the stride doubles when rows is halved
+    stride = 1
+
+    for record in records:
+        data = record.get("data") or {}
+        count += 1
+        first_ts = first_ts or record.get("timestamp")
+        last_ts = record.get("timestamp")
+        latest = data
+        cpu.add(_number(_get(data, "cpu", "usage")))
+        mem.add(_number(_get(data, "memory", "percent")))
+        disk.add(_number(_get(data, "disk", "percent")))
+        if data.get("alerts") and data["alerts"] != "No alerts.":
+            alerts.add(data["alerts"])
+        if (count - 1) % stride:
+            continue
+        rows.append((
+            record.get("timestamp"),
+            _get(data, "cpu", "usage"),
+            _get(data, "memory", "percent"),
+            _get(data, "disk", "percent"),
+            _get(data, "cpu", "temperature"),
+        ))
+        # Thin evenly in place so memory stays bounded for long ranges
+        if len(rows) >= 2 * HTML_MAX_ROWS:
+            rows = rows[::2]
+            stride *= 2
+
+    if len(rows) > HTML_MAX_ROWS:
+        step = len(rows) / HTML_MAX_ROWS
+        rows = [rows[int(i * step)] for i in range(HTML_MAX_ROWS)]
+
+    esc = lambda value: html.escape("N/A" if value is None else str(value))
+    processes = "\n".join(
+        f"{p.get('pid', '')} {p.get('user', '')} {p.get('memory_percent', '')}% {p.get('command', '')}"
+        for p in latest.get("top_processes") or []
+    )
+    gpu = latest.get("gpu") or {}
+
+    page = HTML_TEMPLATE.substitute(
+        title=esc(last_ts),
+        range_start=esc(start.isoformat() if start else first_ts),
+        range_end=esc(end.isoformat() if end else last_ts),
+        count=count,
+        generated=esc(datetime.now(timezone.utc).isoformat(timespec="seconds")),
+        cpu_model=esc(_get(latest, "cpu", "model")),
+        cpu_cores=esc(_get(latest, "cpu", "cores")),
+        cpu_stats=esc(cpu),
+        mem_stats=esc(mem),
+        disk_stats=esc(disk),
+        gpu=esc(f"{gpu.get('name', 'N/A')} ({gpu.get('memory', 'N/A')}) - {gpu.get('temperature', 'N/A')}"),
+        alerts=esc("; ".join(sorted(alerts)) or "No alerts."),
+        rows="\n".join(HTML_ROW.format(*(esc(v) for v in row)) for row in rows),
+        top_processes=html.escape(processes),
+    )
+    return page.encode("utf-8")
+
+
+def render_series(records: Iterator[Dict[str, Any]], start: float, bucket_s: float, points: int) -> bytes:
+    """
+    Average every SERIES metric into `points` buckets of `bucket_s` seconds
+    from `start` (Unix seconds).
+
+    Returns:
+        JSON {"start", "bucket_s", "t": [bucket start], "series": {name:
+        [mean or null]}, "last_seq"}
+    """
+    sums = {name: [0.0] * points for name in SERIES}
+    counts = {name: [0] * points for name in SERIES}
+    last_seq = None
+    for record in records:
+        ts = parse_time(record.get("timestamp"))
+        i = int((ts.timestamp() - start) // bucket_s)
+        if not 0 <= i < points:
+            continue
+        data = record.get("data") or {}
+        for name, value_of in SERIES.items():
+            value = value_of(data)
+            if value is not None:
+                sums[name][i] += value
+                counts[name][i] += 1
+        last_seq = record.get("seq", last_seq)
+    body = {
+        "start": start,
+        "bucket_s": bucket_s,
+        "t": [round(start + i * bucket_s, 3) for i in range(points)],
+        "series": {
+            name: [round(total / n, 2) if n else None for total, n in zip(sums[name], counts[name])]
+            for name in SERIES
+        },
+        "last_seq": last_seq,
+    }
+    return json.dumps(body, separators=(",", ":")).encode("utf-8")
+
+
+class ReportCache:
+    """Small LRU of rendered reports keyed by (format, range, history version)."""
+
+    def __init__(self, entries: int = CACHE_ENTRIES, max_bytes: int = CACHE_MAX_BYTES):
+        self.entries = entries
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        with self._lock:
+            body = self._items.get(key)
+            if body is not None:
+                self._items.move_to_end(key)
+            return body
+
+    def put(self, key: tuple, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            self._items[key] = body
+            self._items.move_to_end(key)
+            while len(self._items) > self.entries:
+                self._items.popitem(last=False)
+
+
+CACHE = ReportCache()
+
+
+def history_version(active: Path) -> Any:
+    """Sequence number of the last committed record (file size/mtime for records without one)."""
+    record = last_record(active)
+    if record and record.get("seq") is not None:
+        return record["seq"]
+    try:
+        stat = os.stat(active)
+        return (stat.st_size, stat.st_mtime_ns)
+    except FileNotFoundError:
+        return None
+
+
+def csv_report(active: Path, start: Optional[datetime], end: Optional[datetime]) -> Iterator[bytes]:
+    """
+    CSV report for a range, streamed; served from the cache when unchanged.
+
+    The streamed chunks are kept and cached once the stream completes.
+    """
+    key = ("csv", start, end, history_version(active))
+    cached = CACHE.get(key)
+    if cached is not None:
+        yield cached
+        return
+
+    chunks: Optional[List[bytes]] = []
+    size = 0
+    for chunk in render_csv(iter_records(active, start, end)):
+        if chunks is not None:
+            size += len(chunk)
+            if size <= CACHE.max_bytes:
+                chunks.append(chunk)
+            else:
+                chunks = None
+        yield chunk
+    if chunks is not None:
+        CACHE.put(key, b"".join(chunks))
+
+
+def html_report(active: Path, start: Optional[datetime], end: Optional[datetime]) -> bytes:
+    """HTML report for a range, cached until new history is committed."""
+    key = ("html", start, end, history_version(active))
+    body = CACHE.get(key)
+    if body is None:
+        body = render_html(iter_records(active, start, end), start, end)
+        CACHE.put(key, body)
+    return body
+
+
+def series_report(active: Path, window_s: float, points: int, now: float) -> bytes:
+    """
+    Downsampled chart series of the last `window_s` seconds, cached until
+    new history is committed.
+
+    The window is aligned to whole buckets so requests within one bucket
+    share a cache entry.
+    """
+    bucket_s = window_s / points
+    start = (now // bucket_s + 1) * bucket_s - window_s
+    key = ("series", start, bucket_s, points, history_version(active))
+    body = CACHE.get(key)
+    if body is None:
+        range_start = datetime.fromtimestamp(start, timezone.utc)
+        body = render_series(iter_records(active, range_start, None), start, bucket_s, points)
+        CACHE.put(key, body)
+    return body
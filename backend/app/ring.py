@@ -0,0 +1,93 @@
+"""
+In-memory ring of recent snapshots for cursor-based catch-up (/api/metrics/since).
+
+A client that reconnects after a network blip or a laptop sleep asks for
+every snapshot after the last sequence number it saw; a client that is up
+to date blocks until the next snapshot arrives (long-poll), so it receives
+each snapshot exactly once, in order, without empty polls.
+
+Every worker keeps its own ring: the collector appends in publish(), other
+workers follow the shared segment (see follow_segment in metrics_proxy.py).
+If the requested cursor is older than the ring, or snapshots were never
+seen by this worker, the response carries an explicit gap marker instead
+of silently skipping them; the client can then backfill from history.
+"""
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+
+class SnapshotRing:
+    """
+    The last `capacity` snapshots, ordered by sequence number.
+
+    Args:
+        capacity: Snapshots kept
+    """
+
+    def __init__(self, capacity: int):
+        self._items: deque = deque(maxlen=capacity)
+        self._changed = threading.Condition()
+
+    @property
+    def last_seq(self) -> Optional[int]:
+        with self._changed:
+            return self._items[-1]["seq"] if self._items else None
+
+    def append(self, snapshot: Dict[str, Any]) -> None:
+        """Add a published snapshot; repeats and older sequence numbers are ignored."""
+        seq = snapshot.get("seq")
+        if seq is None:
+            return
+        with self._changed:
+            if self._items and seq <= self._items[-1]["seq"]:
+                return
+            self._items.append(snapshot)
+            self._changed.notify_all()
+
+    def since(self, seq: int, wait_seconds: float = 0.0, limit: int = 100, head: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Snapshots after `seq`, waiting up to `wait_seconds` for one if none
+        are buffered yet.
+
+        `head` is the newest sequence number published by the collector (the
+        shared segment's). A cursor ahead of this ring but not of `head` only
+        means this worker has not caught up yet: the answer is an empty batch
+        keeping the cursor. Sequence numbers are taken to have restarted only
+        when the cursor is ahead of `head`.
+
+        Returns:
+            {"snapshots": [...], "next_seq": cursor for the next call,
+            "gap": None or {"from_seq", "to_seq"} (sequence numbers that
+            cannot be delivered), "reset": the cursor was ahead of the
+            server (sequence numbers restarted), "more": truncated at
+            `limit`}
+        """
+        restarted = head is not None and seq > head
+        with self._changed:
+            if wait_seconds > 0 and not restarted:
+                self._changed.wait_for(lambda: self._items and self._items[-1]["seq"] > seq, timeout=wait_seconds)
+            items: List[Dict[str, Any]] = list(self._items)
+
+        reset = restarted and bool(items)
+        if reset:
+            # The client's cursor is from before sequence numbers restarted
+            seq = items[0]["seq"] - 1
+        newer = [s for s in items if s["seq"] > seq]
+        gap = None
+        if newer and newer[0]["seq"] > seq + 1 and not reset:
+            gap = {"from_seq": seq + 1, "to_seq": newer[0]["seq"] - 1}
+        else:
+            # Holes inside the ring (a follower worker missed a publish)
+            for prev, cur in zip(newer, newer[1:limit]):
+                if cur["seq"] > prev["seq"] + 1:
+                    gap = {"from_seq": prev["seq"] + 1, "to_seq": cur["seq"] - 1}
+                    break
+        delivered = newer[:limit]
+        return {
+            "snapshots": delivered,
+            "next_seq": delivered[-1]["seq"] if delivered else seq,
+            "gap": gap,
+            "reset": reset,
+            "more": len(newer) > limit,
+        }
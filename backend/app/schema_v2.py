@@ -0,0 +1,404 @@
+"""
+Numeric, unit-typed snapshot schema (v2).
+
+The v1 snapshot (MetricsSnapshot) carries many numbers as display strings:
+"45.5°C", "8192 MB", "37%", "50G", and the network summary as a sentence.
+v2 converts a v1 snapshot into numbers in base units only, so history,
+rollups and exporters can work on plain floats:
+
+    bytes, bytes/s, seconds, degrees Celsius, watts, joules, and ratios
+    (0.0-1.0) instead of percentages
+
+Field names end in their unit (_bytes, _bytes_per_s, _s, _c, _w, _j,
+_ratio). Per-entity values (partitions, interfaces, GPUs, drives,
+processes) are maps keyed by mount point, interface name, GPU index, device
+or pid. Text that does not change between samples (CPU model, GPU names,
+ROM info, drive models) is left out of the samples and published once in
+the descriptor (/api/v2/schema) together with the unit of every field.
+
+v1 stays the stored and default format; v2 is derived on request and
+cached for the latest sequence number.
+"""
+import re
+import threading
+from typing import Any, Dict, Optional
+
+SCHEMA_VERSION = 2
+
+KIB = 1024
+GIB = 1024 ** 3
+MIB = 1024 ** 2
+
+# df -hP suffixes (powers of 1024)
+SIZE_SUFFIXES = {"": 1, "B": 1, "K": KIB, "M": MIB, "G": GIB, "T": 1024 ** 4, "P": 1024 ** 5, "E": 1024 ** 6}
+
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+_SIZE = re.compile(r"^\s*(\d+(?:[.,]\d+)?)\s*([KMGTPE]?)(?:i?B)?\s*$", re.IGNORECASE)
+_UPTIME = re.compile(r"(\d+)\s*([dhms])")
+
+# Unit and meaning of every v2 field; "*" stands for a map key
+UNITS: Dict[str, Dict[str, str]] = {
+    "cpu.usage_ratio": {"unit": "ratio", "description": "CPU busy time over the sample interval"},
+    "cpu.cores": {"unit": "count", "description": "Logical CPUs"},
+    "cpu.load_1m": {"unit": "count", "description": "1-minute load average"},
+    "cpu.temperature_c": {"unit": "celsius", "description": "CPU package temperature"},
+    "cpu.burst.min_ratio": {"unit": "ratio", "description": "Lowest sub-second CPU usage since the previous sample"},
+    "cpu.burst.max_ratio": {"unit": "ratio", "description": "Highest sub-second CPU usage since the previous sample"},
+    "cpu.burst.p50_ratio": {"unit": "ratio", "description": "Median sub-second CPU usage"},
+    "cpu.burst.p95_ratio": {"unit": "ratio", "description": "95th percentile sub-second CPU usage"},
+    "cpu.burst.p99_ratio": {"unit": "ratio", "description": "99th percentile sub-second CPU usage"},
+    "cpu.burst.above_threshold_s": {"unit": "seconds", "description": "Time at or above the burst threshold"},
+    "cpu.burst.window_s": {"unit": "seconds", "description": "Time covered by the sub-second ticks"},
+    "memory.total_bytes": {"unit": "bytes", "description": "MemTotal"},
+    "memory.used_bytes": {"unit": "bytes", "description": "MemTotal - MemAvailable"},
+    "memory.free_bytes": {"unit": "bytes", "description": "MemFree"},
+    "memory.available_bytes": {"unit": "bytes", "description": "MemAvailable"},
+    "memory.used_ratio": {"unit": "ratio", "description": "used_bytes / total_bytes"},
+    "memory.swap_total_bytes": {"unit": "bytes", "description": "SwapTotal"},
+    "memory.swap_used_bytes": {"unit": "bytes", "description": "SwapTotal - SwapFree"},
+    "disk.used_ratio": {"unit": "ratio", "description": "Usage of the first reported filesystem"},
+    "disk.partitions.*.size_bytes": {"unit": "bytes", "description": "Filesystem size (df; rounded when the collector reports only -h sizes)"},
+    "disk.partitions.*.used_bytes": {"unit": "bytes", "description": "Used space"},
+    "disk.partitions.*.avail_bytes": {"unit": "bytes", "description": "Space available to unprivileged users"},
+    "disk.partitions.*.used_ratio": {"unit": "ratio", "description": "df Use%"},
+    "disk.devices.*.read_bytes_per_s": {"unit": "bytes/s", "description": "Read throughput of a disk or partition"},
+    "disk.devices.*.write_bytes_per_s": {"unit": "bytes/s", "description": "Write throughput of a disk or partition"},
+    "disk.devices.*.read_iops": {"unit": "1/s", "description": "Completed reads per second"},
+    "disk.devices.*.write_iops": {"unit": "1/s", "description": "Completed writes per second"},
+    "disk.devices.*.await_s": {"unit": "seconds", "description": "Average time per completed I/O, queueing included (disks only)"},
+    "disk.devices.*.queue_depth": {"unit": "count", "description": "Average I/O requests in flight (disks only)"},
+    "disk.devices.*.util_ratio": {"unit": "ratio", "description": "Share of time with I/O in flight (disks only)"},
+    "network.lan_rx_bytes_per_s": {"unit": "bytes/s", "description": "Received on wired interfaces"},
+    "network.lan_tx_bytes_per_s": {"unit": "bytes/s", "description": "Sent on wired interfaces"},
+    "network.wifi_rx_bytes_per_s": {"unit": "bytes/s", "description": "Received on wireless interfaces"},
+    "network.wifi_tx_bytes_per_s": {"unit": "bytes/s", "description": "Sent on wireless interfaces"},
+    "network.tcp_connections": {"unit": "count", "description": "TCP sockets"},
+    "network.interfaces.*.rx_bytes": {"unit": "bytes", "description": "Received since boot"},
+    "network.interfaces.*.tx_bytes": {"unit": "bytes", "description": "Sent since boot"},
+    "network.interfaces.*.rx_bytes_per_s": {"unit": "bytes/s", "description": "Receive rate"},
+    "network.interfaces.*.tx_bytes_per_s": {"unit": "bytes/s", "description": "Send rate"},
+    "network.interfaces.*.errors": {"unit": "count", "description": "rx + tx errors since boot"},
+    "network.interfaces.*.drops": {"unit": "count", "description": "rx + tx drops since boot"},
+    "gpu.*.utilization_ratio": {"unit": "ratio", "description": "GPU busy time"},
+    "gpu.*.memory_used_bytes": {"unit": "bytes", "description": "Device memory in use"},
+    "gpu.*.memory_total_bytes": {"unit": "bytes", "description": "Device memory"},
+    "gpu.*.temperature_c": {"unit": "celsius", "description": "GPU temperature"},
+    "gpu.*.power_w": {"unit": "watts", "description": "Power draw"},
+    "gpu.*.energy_j": {"unit": "joules", "description": "Energy since the GPU stream started"},
+    "system.uptime_s": {"unit": "seconds", "description": "Host uptime (minute resolution)"},
+    "system.process_count": {"unit": "count", "description": "Processes"},
+    "pressure.*.some_avg10_ratio": {"unit": "ratio", "description": "Share of time some tasks stalled (10 s average)"},
+    "pressure.*.some_avg60_ratio": {"unit": "ratio", "description": "Share of time some tasks stalled (60 s average)"},
+    "pressure.*.full_avg10_ratio": {"unit": "ratio", "description": "Share of time all tasks stalled (10 s average)"},
+    "pressure.*.some_total_s": {"unit": "seconds", "description": "Total stall time since boot"},
+    "smart.*.healthy": {"unit": "bool", "description": "1 if the drive passed its SMART self-assessment, 0 if it failed"},
+    "smart.*.temperature_c": {"unit": "celsius", "description": "Drive temperature"},
+    "smart.*.wear_ratio": {"unit": "ratio", "description": "Rated life used"},
+    "smart.*.power_on_s": {"unit": "seconds", "description": "Power-on time"},
+    "smart.*.reallocated_sectors": {"unit": "count", "description": "Reallocated sectors"},
+    "power.*.power_w": {"unit": "watts", "description": "RAPL domain power over the sample interval"},
+    "power.*.energy_j": {"unit": "joules", "description": "RAPL domain energy over the sample interval"},
+    "processes.*.command": {"unit": "text", "description": "Command of a top process"},
+    "processes.*.memory_ratio": {"unit": "ratio", "description": "Resident memory share of a top process"},
+    "alerts_active": {"unit": "count", "description": "Active threshold alerts"},
+}
+
+
+def number(value: Any) -> Optional[float]:
+    """First number in a value ("45.5°C" -> 45.5, 37 -> 37.0), None if there is none."""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _NUMBER.search(str(value).replace(",", "."))
+    return float(match.group()) if match else None
+
+
+def count(value: Any) -> Optional[int]:
+    """Whole-number count, None if the value is missing (not 0)."""
+    value = number(value)
+    return None if value is None else int(value)
+
+
+def ratio(percent: Any) -> Optional[float]:
+    """Percentage (number or "37%") as a 0-1 ratio."""
+    value = number(percent)
+    return None if value is None else round(value / 100, 4)
+
+
+def size_bytes(value: Any) -> Optional[int]:
+    """df -h style size ("50G", "1.5T", "512K") in bytes."""
+    if value is None:
+        return None
+    match = _SIZE.match(str(value))
+    if not match:
+        return None
+    amount = float(match.group(1).replace(",", "."))
+    return int(amount * SIZE_SUFFIXES[match.group(2).upper()])
+
+
+def uptime_seconds(value: Any) -> Optional[int]:
+    """Uptime string ("2d 3h 4m") in seconds."""
+    parts = _UPTIME.findall(str(value or ""))
+    if not parts:
+        return None
+    scale = {"d": 86400, "h": 3600, "m": 60, "s": 1}
+    return sum(int(amount) * scale[unit] for amount, unit in parts)
+
+
+def _get(data: Any, *keys: str) -> Any:
+    for key in keys:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+def _cpu(cpu: Dict[str, Any]) -> Dict[str, Any]:
+    burst = cpu.get("burst")
+    return {
+        "usage_ratio": ratio(cpu.get("usage")),
+        "cores": count(cpu.get("cores")),
+        "load_1m": number(cpu.get("load_avg")),
+        "temperature_c": number(cpu.get("temperature")),
+        "burst": None if not burst else {
+            "min_ratio": ratio(burst.get("min")),
+            "max_ratio": ratio(burst.get("max")),
+            "p50_ratio": ratio(burst.get("p50")),
+            "p95_ratio": ratio(burst.get("p95")),
+            "p99_ratio": ratio(burst.get("p99")),
+            "above_threshold_s": burst.get("above_threshold_s"),
+            "window_s": burst.get("window_s"),
+        },
+    }
+
+
+def _memory(memory: Dict[str, Any]) -> Dict[str, Any]:
+    detail = memory.get("detail") or {}
+    # Exact byte counts from the native collector, else the rounded GiB fields
+    total = detail.get("total")
+    if total is None and number(memory.get("total_gb")) is not None:
+        total = int(number(memory["total_gb"]) * GIB)
+    used = detail.get("used")
+    if used is None and number(memory.get("used_gb")) is not None:
+        used = int(number(memory["used_gb"]) * GIB)
+    available = detail.get("available")
+    if available is None and number(memory.get("available_gb")) is not None:
+        available = int(number(memory["available_gb"]) * GIB)
+    free = detail.get("free")
+    if free is None and number(memory.get("free_gb")) is not None:
+        free = int(number(memory["free_gb"]) * GIB)
+    swap_total = detail.get("swap_total")
+    swap_free = detail.get("swap_free")
+    return {
+        "total_bytes": total,
+        "used_bytes": used,
+        "free_bytes": free,
+        "available_bytes": available,
+        "used_ratio": ratio(memory.get("percent")),
+        "swap_total_bytes": swap_total,
+        "swap_used_bytes": None if swap_total is None or swap_free is None else swap_total - swap_free,
+    }
+
+
+def _disk(disk: Dict[str, Any]) -> Dict[str, Any]:
+    partitions = {}
+    for part in disk.get("partitions") or []:
+        path = part.get("path")
+        if not path:
+            continue
+        exact = part.get("used_bytes") is not None
+        partitions[path] = {
+            "size_bytes": part.get("size_bytes") if exact else size_bytes(part.get("size")),
+            "used_bytes": part.get("used_bytes") if exact else size_bytes(part.get("used")),
+            "avail_bytes": part.get("avail_bytes") if exact else size_bytes(part.get("avail")),
+            "used_ratio": ratio(part.get("percent")),
+        }
+    devices = {}
+    for dev in _get(disk, "io", "devices") or []:
+        for entry in [dev, *(dev.get("partitions") or [])]:
+            devices[entry["name"]] = {
+                "read_bytes_per_s": entry.get("read_bytes_per_s"),
+                "write_bytes_per_s": entry.get("write_bytes_per_s"),
+                "read_iops": entry.get("read_iops"),
+                "write_iops": entry.get("write_iops"),
+                "await_s": None if entry.get("await_ms") is None else entry["await_ms"] / 1000,
+                "queue_depth": entry.get("queue_depth"),
+                "util_ratio": ratio(entry.get("util_percent")),
+            }
+    return {"used_ratio": ratio(disk.get("percent")), "partitions": partitions, "devices": devices}
+
+
+def _network(network: Dict[str, Any]) -> Dict[str, Any]:
+    stats = network.get("stats") or {}
+    interfaces = {}
+    for iface in stats.get("interfaces") or []:
+        interfaces[iface["name"]] = {
+            "rx_bytes": iface.get("rx_bytes"),
+            "tx_bytes": iface.get("tx_bytes"),
+            "rx_bytes_per_s": iface.get("rx_rate"),
+            "tx_bytes_per_s": iface.get("tx_rate"),
+            "errors": (iface.get("rx_errors") or 0) + (iface.get("tx_errors") or 0),
+            "drops": (iface.get("rx_drops") or 0) + (iface.get("tx_drops") or 0),
+        }
+    return {
+        "lan_rx_bytes_per_s": number(_get(stats, "lan", "rx")),
+        "lan_tx_bytes_per_s": number(_get(stats, "lan", "tx")),
+        "wifi_rx_bytes_per_s": number(_get(stats, "wifi", "rx")),
+        "wifi_tx_bytes_per_s": number(_get(stats, "wifi", "tx")),
+        "tcp_connections": count(stats.get("tcp")),
+        "interfaces": interfaces,
+    }
+
+
+def _gpu(gpu: Dict[str, Any]) -> Dict[str, Any]:
+    devices = gpu.get("devices")
+    if devices:
+        return {
+            str(dev["index"]): {
+                "utilization_ratio": ratio(dev.get("utilization_percent")),
+                "memory_used_bytes": None if dev.get("memory_used_mib") is None else int(dev["memory_used_mib"] * MIB),
+                "memory_total_bytes": None if dev.get("memory_total_mib") is None else int(dev["memory_total_mib"] * MIB),
+                "temperature_c": dev.get("temperature_c"),
+                "power_w": dev.get("power_draw_w"),
+                "energy_j": dev.get("energy_j"),
+            }
+            for dev in devices
+        }
+    if number(gpu.get("utilization")) is None and number(gpu.get("memory")) is None:
+        return {}
+    # Script output: one GPU, memory in MB (nvidia-smi MiB)
+    memory = number(gpu.get("memory"))
+    return {
+        "0": {
+            "utilization_ratio": ratio(gpu.get("utilization")),
+            "memory_used_bytes": None,
+            "memory_total_bytes": None if memory is None else int(memory * MIB),
+            "temperature_c": number(gpu.get("temperature")),
+            "power_w": None,
+            "energy_j": None,
+        }
+    }
+
+
+def _pressure(pressure: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    result = {}
+    for resource, stats in (pressure or {}).items():
+        some = (stats or {}).get("some") or {}
+        full = (stats or {}).get("full") or {}
+        result[resource] = {
+            "some_avg10_ratio": ratio(some.get("avg10")),
+            "some_avg60_ratio": ratio(some.get("avg60")),
+            "full_avg10_ratio": ratio(full.get("avg10")),
+            "some_total_s": None if some.get("total") is None else some["total"] / 1e6,
+        }
+    return result
+
+
+def _smart(smart: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    result = {}
+    for dev in (smart or {}).get("devices") or []:
+        health = dev.get("health")
+        result[dev["device"]] = {
+            "healthy": {"PASSED": 1, "FAILED": 0}.get(health),
+            "temperature_c": dev.get("temperature_c"),
+            "wear_ratio": ratio(dev.get("wear_percent")),
+            "power_on_s": None if dev.get("power_on_hours") is None else dev["power_on_hours"] * 3600,
+            "reallocated_sectors": dev.get("reallocated_sectors"),
+        }
+    return result
+
+
+def _power(power: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if not power or not power.get("available"):
+        return {}
+    return {
+        dom["zone"]: {"power_w": dom.get("power_w"), "energy_j": dom.get("energy_j")}
+        for dom in power.get("domains") or []
+    }
+
+
+def _processes(processes: Any) -> Dict[str, Any]:
+    result = {}
+    for proc in processes or []:
+        pid = str(proc.get("pid") or "").strip()
+        if pid:
+            # Top processes change every sample, so their command stays in it
+            result[pid] = {"command": proc.get("command"), "memory_ratio": ratio(proc.get("memory_percent"))}
+    return result
+
+
+def to_v2(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert the data of a v1 snapshot into the v2 layout."""
+    system = data.get("system") or {}
+    alerts = data.get("alerts")
+    return {
+        "cpu": _cpu(data.get("cpu") or {}),
+        "memory": _memory(data.get("memory") or {}),
+        "disk": _disk(data.get("disk") or {}),
+        "network": _network(data.get("network") or {}),
+        "gpu": _gpu(data.get("gpu") or {}),
+        "system": {
+            "uptime_s": uptime_seconds(system.get("uptime")),
+            "process_count": count(system.get("process_count")),
+        },
+        "pressure": _pressure(data.get("pressure")),
+        "smart": _smart(data.get("smart")),
+        "power": _power(data.get("power")),
+        "processes": _processes(data.get("top_processes")),
+        "alerts_active": 0 if not alerts or alerts == "No alerts." else len(alerts.split("; ")),
+    }
+
+
+def describe(data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    The one-time descriptor: schema version, field units and the text
+    metadata of the host (from the latest v1 snapshot).
+    """
+    data = data or {}
+    gpu = data.get("gpu") or {}
+    gpus = {str(d["index"]): d.get("name") for d in gpu.get("devices") or []}
+    if not gpus and gpu.get("name") not in (None, "N/A"):
+        gpus = {"0": gpu.get("name")}
+    return {
+        "schema": SCHEMA_VERSION,
+        "units": UNITS,
+        "host": {
+            "cpu_model": _get(data, "cpu", "model"),
+            "rom_info": _get(data, "system", "rom_info"),
+            "gpus": gpus,
+            "power_domains": {
+                d["zone"]: f"{d['package']}/{d['name']}" if d["package"] != d["name"] else d["name"]
+                for d in _get(data, "power", "domains") or []
+            },
+            "power_unavailable": _get(data, "power", "reason"),
+            "drives": {
+                d["device"]: {"model": d.get("model"), "serial": d.get("serial")}
+                for d in _get(data, "smart", "devices") or []
+            },
+        },
+    }
+
+
+class V2Cache:
+    """v2 conversion of the latest snapshot, redone when its sequence number changes."""
+
+    def __init__(self):
+        self._seq: Optional[int] = None
+        self._value: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+
+    def get(self, snapshot: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        data = snapshot.get("data")
+        if data is None:
+            return None
+        seq = snapshot.get("seq")
+        with self._lock:
+            if seq is not None and seq == self._seq and self._value is not None:
+                return self._value
+            value = to_v2(data)
+            self._seq, self._value = seq, value
+            return value
+
+
+CACHE = V2Cache()
@@ -0,0 +1,197 @@
+"""
+Shared-memory snapshot segment for multi-worker deployments.
+
+With `uvicorn --workers N` every worker imports the app, but only one of
+them should poll the host API and write history. That worker is elected by
+an exclusive flock() on a lock file; it publishes each serialized snapshot
+into a multiprocessing.shared_memory segment. All other workers read the
+segment without taking any lock.
+
+The segment is guarded by a seqlock:
+
+    offset 0   u64  sequence (odd while a write is in progress)
+    offset 8   u32  payload length
+    offset 12  u32  last viewer request (unix seconds, any worker)
+    offset 16  ...  payload (UTF-8 JSON)
+
+The viewer stamp is outside the seqlock: every worker overwrites it with
+the time of its latest /api/metrics/current request so the collector knows
+someone is watching even when the requests land on other workers.
+
+The writer bumps the sequence to odd, writes length and payload, then bumps
+it to even. A reader copies the payload and accepts it only if the sequence
+was even and unchanged across the copy. Readers keep the decoded snapshot
+for the last sequence they saw, so a request that finds the sequence
+unchanged costs one 8-byte read and no copy or JSON parsing.
+
+If the lock holder exits, the lock is released by the kernel and the next
+worker that retries takes over collection.
+"""
+import fcntl
+import json
+import logging
+import os
+import struct
+import time
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SEQ = struct.Struct("=Q")
+LENGTH = struct.Struct("=I")
+VIEWER = struct.Struct("=I")
+HEADER_SIZE = 16
+
+# Give up on a read after this many torn attempts (writer is mid-update)
+MAX_READ_RETRIES = 100
+
+
+class SnapshotSegment:
+    """
+    Single-writer, many-reader snapshot buffer in shared memory.
+
+    Use SnapshotSegment.create() in the collector process and
+    SnapshotSegment.attach() in the serving workers.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self._shm = shm
+        self._buf = shm.buf
+        self.owner = owner
+        self.capacity = shm.size - HEADER_SIZE
+
+        self._cached_seq = -1
+        self._cached: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def create(cls, name: str, size: int) -> "SnapshotSegment":
+        """Create (or take over) the segment as its writer."""
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            _untrack(shm)
+            SEQ.pack_into(shm.buf, 0, 0)
+            LENGTH.pack_into(shm.buf, 8, 0)
+            VIEWER.pack_into(shm.buf, 12, 0)
+        except FileExistsError:
+            # Left behind by a previous collector; readers are still attached
+            # to it, so keep using it (and its last snapshot)
+            shm = shared_memory.SharedMemory(name=name)
+            _untrack(shm)
+            seq = SEQ.unpack_from(shm.buf, 0)[0]
+            if seq % 2:
+                # Previous writer died mid-update
+                SEQ.pack_into(shm.buf, 0, seq + 1)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> Optional["SnapshotSegment"]:
+        """Attach to an existing segment as a reader, or None if it does not exist yet."""
+        try:
+            shm = shared_memory.SharedMemory(name=name)
+        except FileNotFoundError:
+            return None
+        _untrack(shm)
+        return cls(shm, owner=False)
+
+    @property
+    def sequence(self) -> int:
+        """Current sequence number (even when no write is in progress)."""
+        return SEQ.unpack_from(self._buf, 0)[0]
+
+    def touch_viewer(self, when: float) -> None:
+        """Record a viewer request (any worker may call this)."""
+        VIEWER.pack_into(self._buf, 12, int(when) & 0xFFFFFFFF)
+
+    def last_viewer(self) -> int:
+        """Unix time of the latest viewer request in any worker, 0 if none."""
+        return VIEWER.unpack_from(self._buf, 12)[0]
+
+    def write(self, snapshot: Dict[str, Any]) -> bool:
+        """
+        Publish a snapshot. Only the collector process may call this.
+
+        Returns:
+            False if the serialized snapshot does not fit the segment
+        """
+        payload = json.dumps(snapshot, separators=(",", ":")).encode("utf-8")
+        if len(payload) > self.capacity:
+            logger.error(f"Snapshot of {len(payload)} bytes exceeds shared segment capacity {self.capacity}")
+            return False
+
+        seq = SEQ.unpack_from(self._buf, 0)[0]
+        SEQ.pack_into(self._buf, 0, seq + 1)
+        LENGTH.pack_into(self._buf, 8, len(payload))
+        self._buf[HEADER_SIZE:HEADER_SIZE + len(payload)] = payload
+        SEQ.pack_into(self._buf, 0, seq + 2)
+        return True
+
+    def read(self) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """
+        Read the latest snapshot without locking.
+
+        Returns:
+            (sequence, snapshot); snapshot is None if nothing was published
+            yet or every attempt raced with the writer
+        """
+        for _ in range(MAX_READ_RETRIES):
+            seq_before = SEQ.unpack_from(self._buf, 0)[0]
+            if seq_before == self._cached_seq:
+                return seq_before, self._cached
+            if seq_before % 2:
+                time.sleep(0)
+                continue
+            length = LENGTH.unpack_from(self._buf, 8)[0]
+            payload = bytes(self._buf[HEADER_SIZE:HEADER_SIZE + length])
+            if SEQ.unpack_from(self._buf, 0)[0] != seq_before:
+                continue
+            if seq_before == 0 or length == 0:
+                return seq_before, None
+            self._cached = json.loads(payload)
+            self._cached_seq = seq_before
+            return seq_before, self._cached
+        return self._cached_seq, self._cached
+
+    def close(self) -> None:
+        """Detach from the segment (the segment itself stays for the next collector)."""
+        self._buf = None
+        self._shm.close()
+
+
+def _untrack(shm: shared_memory.SharedMemory) -> None:
+    # The resource tracker would unlink the segment when this process exits,
+    # pulling it from under every other worker (bpo-39959). The segment is
+    # meant to outlive any single collector and goes away with the container.
+    try:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+
+
+class CollectorLock:
+    """Non-blocking exclusive flock() electing the single collector process."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._fd: Optional[int] = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def try_acquire(self) -> bool:
+        """Take the lock if nobody holds it. Returns True if this process holds it."""
+        if self._fd is not None:
+            return True
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
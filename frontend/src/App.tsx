@@ -1,11 +1,12 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { Container, Box, Alert, CircularProgress, Typography, Tabs, Tab } from '@mui/material';
 import { ThemeProvider, createTheme } from '@mui/material/styles';
 import CssBaseline from '@mui/material/CssBaseline';
 
-import { fetchCurrentMetrics, MetricsSnapshot } from './api/client';
+import { fetchCurrentMetrics, fetchHistorySeries, snapshotAgeMs, MetricsSnapshot, TraceReport } from './api/client';
 import OverviewTab from './components/OverviewTab';
 import StatisticsTab from './components/StatisticsTab';
+import { HISTORY_VIEWS, SeriesRing, pointFromSnapshot } from './seriesRing';
 
 // Dark theme for the dashboard
 const darkTheme = createTheme({
@@ -22,21 +23,34 @@ const darkTheme = createTheme({
 });
 
 const POLL_INTERVAL_MS = 5000; // Poll every 5 seconds
-const MAX_HISTORY_POINTS = 60; // Keep last 5 minutes (60 * 5s = 300s)
 
 function App() {
   const [metrics, setMetrics] = useState<MetricsSnapshot | null>(null);
-  const [history, setHistory] = useState<MetricsSnapshot[]>([]);
+  // One fixed-size ring per graph view, appended in place on every poll;
+  // bumping the counter re-renders the graphs after a change
+  const rings = useRef<SeriesRing[]>(HISTORY_VIEWS.map(v => new SeriesRing(v.seconds, POLL_INTERVAL_MS)));
+  const backfilled = useRef<boolean[]>(HISTORY_VIEWS.map(() => false));
+  const [, setHistoryVersion] = useState(0);
+  const [view, setView] = useState(0);
   const [error, setError] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
   const [currentTab, setCurrentTab] = useState(0);
+  // Age of the displayed snapshot when it arrived (ms), and the measurements
+  // of the previous poll, reported to the backend with the next one
+  const [ageMs, setAgeMs] = useState<number | null>(null);
+  const lastReport = useRef<TraceReport | undefined>(undefined);
 
   useEffect(() => {
     // Fetch metrics immediately
     const fetchMetrics = async () => {
       try {
         setError(null);
-        const response = await fetchCurrentMetrics();
+        const sent = performance.now();
+        const response = await fetchCurrentMetrics(lastReport.current);
+        const rttMs = performance.now() - sent;
+        const e2eMs = snapshotAgeMs(response.trace, rttMs);
+        lastReport.current = { rttMs, e2eMs };
+        setAgeMs(e2eMs);
 
         if (response.error) {
           setError(response.error);
@@ -46,13 +60,10 @@ function App() {
           setError(null);
 
           // Update history
-          setHistory(prev => {
-            const newHistory = [...prev, response.data!];
-            if (newHistory.length > MAX_HISTORY_POINTS) {
-              return newHistory.slice(newHistory.length - MAX_HISTORY_POINTS);
-            }
-            return newHistory;
-          });
+          const point = pointFromSnapshot(response.data);
+          const takenMs = Date.parse(response.data.timestamp) || Date.now();
+          rings.current.forEach(ring => ring.add(takenMs, point));
+          setHistoryVersion(v => v + 1);
         } else {
           // No error but also no data
           setError('No metrics data available');
@@ -76,6 +87,22 @@ function App() {
     return () => clearInterval(interval);
   }, []);
 
+  // Backfill the visible graph view from stored history (once per view)
+  useEffect(() => {
+    if (backfilled.current[view]) return;
+    backfilled.current[view] = true;
+    const ring = rings.current[view];
+    fetchHistorySeries(HISTORY_VIEWS[view].seconds, ring.capacity)
+      .then(series => {
+        ring.backfill(series);
+        setHistoryVersion(v => v + 1);
+      })
+      .catch(err => {
+        console.error('Error fetching history:', err);
+        backfilled.current[view] = false;
+      });
+  }, [view]);
+
   const handleTabChange = (_event: React.SyntheticEvent, newValue: number) => {
     setCurrentTab(newValue);
   };
@@ -91,6 +118,11 @@ function App() {
           <Typography variant="subtitle1" color="text.secondary">
             Real-time system metrics from host
           </Typography>
+          {ageMs !== null && (
+            <Typography variant="caption" color={ageMs > 3 * POLL_INTERVAL_MS ? 'warning.main' : 'text.secondary'}>
+              Data age on arrival: {(ageMs / 1000).toFixed(1)}s
+            </Typography>
+          )}
         </Box>
 
         <Box sx={{ borderBottom: 1, borderColor: 'divider', mb: 3 }}>
@@ -113,7 +145,14 @@ function App() {
         )}
 
         {metrics && currentTab === 0 && <OverviewTab metrics={metrics} />}
-        {currentTab === 1 && <StatisticsTab history={history} />}
+        {currentTab === 1 && (
+          <StatisticsTab
+            ring={rings.current[view]}
+            version={rings.current[view].version}
+            view={view}
+            onViewChange={setView}
+          />
+        )}
       </Container>
     </ThemeProvider>
   );
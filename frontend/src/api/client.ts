@@ -7,10 +7,98 @@
 // API base URL from environment variable (set in docker-compose)
 const API_BASE = import.meta.env.VITE_API_BASE_URL || "http://localhost:8000";
 
+export interface TracePoint {
+  wall: number; // Unix seconds
+  mono: number; // Monotonic seconds of the stamping process
+}
+
+/** Freshness trace of a snapshot through host API, backend and request. */
+export interface Trace {
+  host_seq?: number;
+  requested?: TracePoint;
+  collect_start?: TracePoint;
+  collect_end?: TracePoint;
+  responded?: TracePoint;
+  received?: TracePoint;
+  published?: TracePoint;
+  served?: TracePoint;
+  sections?: Record<string, { start_ms: number; end_ms: number }>;
+}
+
 export interface MetricsResponse {
   timestamp: string;
+  seq?: number | null;
   data: MetricsSnapshot | null;
   error: string | null;
+  trace?: Trace | null;
+}
+
+/** What the dashboard measured for its previous poll, reported on the next. */
+export interface TraceReport {
+  rttMs: number;
+  e2eMs: number | null;
+}
+
+export interface CpuBurst {
+  interval_ms: number;
+  samples: number;
+  window_s: number;
+  dropped: number;
+  min: number;
+  max: number;
+  mean?: number | null;
+  p50: number;
+  p95: number;
+  p99: number;
+  threshold: number;
+  above_threshold_s: number;
+  above_threshold_percent: number;
+  stall_max_percent?: number | null;
+}
+
+export interface DiskIoDevice {
+  name: string;
+  read_bytes_per_s: number;
+  write_bytes_per_s: number;
+  read_iops: number;
+  write_iops: number;
+  read_await_ms?: number | null;
+  write_await_ms?: number | null;
+  await_ms?: number | null;
+  queue_depth: number;
+  util_percent: number;
+  in_flight: number;
+  partitions: Array<{
+    name: string;
+    read_bytes_per_s: number;
+    write_bytes_per_s: number;
+    read_iops: number;
+    write_iops: number;
+  }>;
+}
+
+export interface DiskIo {
+  devices: DiskIoDevice[];
+  total: {
+    read_bytes_per_s: number;
+    write_bytes_per_s: number;
+    read_iops: number;
+    write_iops: number;
+  };
+}
+
+export interface PowerMetrics {
+  available: boolean;
+  reason?: string | null;
+  interval_s?: number | null;
+  package_w?: number | null;
+  domains?: Array<{
+    zone: string;
+    name: string;
+    package: string;
+    power_w?: number | null;
+    energy_j?: number | null;
+  }>;
 }
 
 export interface MetricsSnapshot {
@@ -21,12 +109,19 @@ export interface MetricsSnapshot {
     usage: number;
     load_avg?: string;
     temperature?: string;
+    burst?: CpuBurst;
   };
   memory: {
     total_gb: number;
     used_gb: number;
     free_gb: number;
     percent: number;
+    available_gb?: number;
+    detail?: Record<string, number>;
+    vmstat?: {
+      counters: Record<string, number>;
+      rates: Record<string, number>;
+    };
   };
   disk: {
     display?: string;
@@ -38,6 +133,7 @@ export interface MetricsSnapshot {
       avail: string;
       percent: number;
     }>;
+    io?: DiskIo;
   };
   network: {
     data?: string;
@@ -45,6 +141,26 @@ export interface MetricsSnapshot {
       lan: { rx: number; tx: number };
       wifi: { rx: number; tx: number };
       tcp: number;
+      interfaces?: Array<{
+        name: string;
+        link: string;
+        rx_bytes: number;
+        tx_bytes: number;
+        rx_packets: number;
+        tx_packets: number;
+        rx_errors: number;
+        tx_errors: number;
+        rx_drops: number;
+        tx_drops: number;
+        rx_rate: number;
+        tx_rate: number;
+      }>;
+    };
+    sockets?: {
+      source: string;
+      tcp: { total: number; ipv4: number; ipv6: number; states: Record<string, number> };
+      udp: { total: number; ipv4: number; ipv6: number };
+      top_listen_ports: Array<{ port: number; connections: number }>;
     };
   };
   gpu: {
@@ -52,6 +168,7 @@ export interface MetricsSnapshot {
     memory?: string;
     temperature?: string;
     utilization?: string;
+    devices?: GpuDevice[];
   };
   system: {
     uptime?: string;
@@ -66,17 +183,86 @@ export interface MetricsSnapshot {
     memory_percent?: string;
     command?: string;
   }>;
+  pressure?: { cpu?: PressureResource; memory?: PressureResource; io?: PressureResource } | null;
+  cgroups?: {
+    root: string;
+    groups: Array<{
+      path: string;
+      container_id?: string | null;
+      cpu_percent: number;
+      cpu_usage_usec: number;
+      cpu_throttled_usec: number;
+      memory_current?: number | null;
+      io_read_rate: number;
+      io_write_rate: number;
+      cpu_pressure?: PressureResource | null;
+    }>;
+  };
+  power?: PowerMetrics;
+  smart?: {
+    devices: SmartDevice[];
+    age_seconds: number;
+  } | null;
   alerts?: string;
 }
 
+export interface SmartDevice {
+  device: string;
+  model?: string | null;
+  serial?: string | null;
+  health: string;
+  temperature_c?: number | null;
+  reallocated_sectors?: number | null;
+  wear_percent?: number | null;
+  power_on_hours?: number | null;
+  media_errors?: number | null;
+  error?: string | null;
+}
+
+export interface GpuDevice {
+  index: number;
+  uuid: string;
+  name: string;
+  utilization_percent: number | null;
+  memory_utilization_percent: number | null;
+  memory_used_mib: number | null;
+  memory_total_mib: number | null;
+  temperature_c: number | null;
+  power_draw_w: number | null;
+  power_limit_w: number | null;
+  clock_sm_mhz: number | null;
+  clock_mem_mhz: number | null;
+  energy_j: number;
+  memory_used_rate_mib_s: number | null;
+  age_seconds: number;
+}
+
+export interface PressureStats {
+  avg10: number;
+  avg60: number;
+  avg300: number;
+  total: number;
+}
+
+export interface PressureResource {
+  some?: PressureStats;
+  full?: PressureStats;
+}
+
 /**
  * Fetch the current metrics from the backend API.
  * 
  * @returns Promise resolving to the current metrics snapshot
  * @throws Error if the request fails
  */
-export async function fetchCurrentMetrics(): Promise<MetricsResponse> {
-  const response = await fetch(`${API_BASE}/api/metrics/current`);
+export async function fetchCurrentMetrics(report?: TraceReport): Promise<MetricsResponse> {
+  const params = new URLSearchParams();
+  if (report) {
+    params.set('trace_rtt_ms', report.rttMs.toFixed(1));
+    if (report.e2eMs !== null) params.set('trace_e2e_ms', report.e2eMs.toFixed(1));
+  }
+  const query = params.toString();
+  const response = await fetch(`${API_BASE}/api/metrics/current${query ? `?${query}` : ''}`);
 
   if (!response.ok) {
     throw new Error(`Failed to fetch metrics: ${response.statusText}`);
@@ -85,6 +271,41 @@ export async function fetchCurrentMetrics(): Promise<MetricsResponse> {
   return response.json();
 }
 
+/** Chart series averaged into equal time buckets (/api/metrics/history). */
+export interface HistorySeries {
+  start: number;  // Unix seconds
+  bucket_s: number;
+  t: number[];  // Bucket start, Unix seconds
+  series: Record<string, (number | null)[]>;  // cpu, memory, disk, gpu, lan_rx, ...
+  last_seq: number | null;
+}
+
+/**
+ * Fetch the graph series of the last windowS seconds of history, averaged
+ * into `points` buckets (backfill after a page reload).
+ * 
+ * @throws Error if the request fails
+ */
+export async function fetchHistorySeries(windowS: number, points: number): Promise<HistorySeries> {
+  const params = new URLSearchParams({ window_s: String(windowS), points: String(points) });
+  const response = await fetch(`${API_BASE}/api/metrics/history?${params}`);
+
+  if (!response.ok) {
+    throw new Error(`Failed to fetch history: ${response.statusText}`);
+  }
+
+  return response.json();
+}
+
+/**
+ * End-to-end age of a snapshot on receipt, in ms: its age when the backend
+ * served it (server clocks only) plus half the fetch round trip.
+ */
+export function snapshotAgeMs(trace: Trace | null | undefined, rttMs: number): number | null {
+  if (!trace?.served || !trace.collect_start) return null;
+  return (trace.served.wall - trace.collect_start.wall) * 1000 + rttMs / 2;
+}
+
 /**
  * Parse temperature string (e.g., "45.5°C" or "N/A") to number or null.
  */
@@ -1,5 +1,5 @@
 import { Card, CardContent, Typography, Box, LinearProgress, Chip } from '@mui/material';
-import { parseTemperature, getTemperatureColor } from '../api/client';
+import { parseTemperature, getTemperatureColor, CpuBurst, PowerMetrics } from '../api/client';
 
 interface CpuMetrics {
   model: string;
@@ -7,13 +7,15 @@ interface CpuMetrics {
   usage: number;
   load_avg?: string;
   temperature?: string;
+  burst?: CpuBurst;
 }
 
 interface CpuCardProps {
   metrics: CpuMetrics;
+  power?: PowerMetrics;
 }
 
-export default function CpuCard({ metrics }: CpuCardProps) {
+export default function CpuCard({ metrics, power }: CpuCardProps) {
   const temp = parseTemperature(metrics.temperature);
   const tempColor = getTemperatureColor(temp);
 
@@ -59,6 +61,44 @@ export default function CpuCard({ metrics }: CpuCardProps) {
           />
         </Box>
 
+        {metrics.burst && (
+          <Box sx={{ mb: 2 }}>
+            <Typography variant="body2" color="text.secondary">
+              Sub-second ({metrics.burst.interval_ms} ms): p95 {metrics.burst.p95.toFixed(0)}% · p99{' '}
+              {metrics.burst.p99.toFixed(0)}% · max {metrics.burst.max.toFixed(0)}%
+            </Typography>
+            {metrics.burst.above_threshold_s > 0 && (
+              <Typography variant="body2" sx={{ color: '#f44336' }}>
+                {metrics.burst.above_threshold_s.toFixed(1)}s above {metrics.burst.threshold}% (
+                {metrics.burst.above_threshold_percent.toFixed(0)}% of {metrics.burst.window_s.toFixed(0)}s)
+              </Typography>
+            )}
+          </Box>
+        )}
+
+        {power && (
+          <Box sx={{ mb: 2 }}>
+            <Typography variant="body2" color="text.secondary" gutterBottom>
+              Power
+            </Typography>
+            {power.available ? (
+              <Box sx={{ display: 'flex', gap: 1, flexWrap: 'wrap' }}>
+                {(power.domains || []).map((domain) => (
+                  <Chip
+                    key={domain.zone}
+                    size="small"
+                    label={`${domain.name}: ${domain.power_w != null ? `${domain.power_w.toFixed(1)} W` : '…'}`}
+                  />
+                ))}
+              </Box>
+            ) : (
+              <Typography variant="body2" color="text.secondary">
+                Unavailable{power.reason ? ` (${power.reason})` : ''}
+              </Typography>
+            )}
+          </Box>
+        )}
+
         {metrics.temperature && (
           <Box>
             <Typography variant="body2" color="text.secondary" gutterBottom>
@@ -1,4 +1,5 @@
-import { Card, CardContent, Typography, Box, LinearProgress } from '@mui/material';
+import { Card, CardContent, Typography, Box, LinearProgress, Chip } from '@mui/material';
+import { DiskIo } from '../api/client';
 
 interface DiskMetrics {
   display?: string;
@@ -10,6 +11,7 @@ interface DiskMetrics {
     avail: string;
     percent: number;
   }>;
+  io?: DiskIo;
 }
 
 interface DiskCardProps {
@@ -19,6 +21,13 @@ interface DiskCardProps {
 export default function DiskCard({ metrics }: DiskCardProps) {
   // Use structured partitions if available, otherwise fallback to basic usage
   const partitions = metrics.partitions || [];
+  const devices = metrics.io?.devices || [];
+
+  const formatSpeed = (bytes: number): string => {
+    if (bytes < 1024) return `${Math.round(bytes)} B/s`;
+    if (bytes < 1024 * 1024) return `${(bytes / 1024).toFixed(2)} KB/s`;
+    return `${(bytes / (1024 * 1024)).toFixed(2)} MB/s`;
+  };
 
   return (
     <Card>
@@ -80,6 +89,25 @@ export default function DiskCard({ metrics }: DiskCardProps) {
             No disk information available
           </Typography>
         )}
+
+        {devices.map((dev) => (
+          <Box key={dev.name} sx={{ mt: 2 }}>
+            <Box sx={{ display: 'flex', justifyContent: 'space-between', mb: 1 }}>
+              <Typography variant="body2" fontWeight="bold">
+                {dev.name}
+              </Typography>
+              <Typography variant="body2" color={dev.util_percent > 90 ? 'error' : 'text.secondary'}>
+                {dev.util_percent.toFixed(0)}% busy
+                {dev.await_ms != null && ` · ${dev.await_ms.toFixed(1)} ms await`}
+                {` · queue ${dev.queue_depth.toFixed(1)}`}
+              </Typography>
+            </Box>
+            <Box sx={{ display: 'flex', gap: 1, flexWrap: 'wrap' }}>
+              <Chip label={`R ${formatSpeed(dev.read_bytes_per_s)} (${dev.read_iops.toFixed(0)} IOPS)`} color="primary" size="small" />
+              <Chip label={`W ${formatSpeed(dev.write_bytes_per_s)} (${dev.write_iops.toFixed(0)} IOPS)`} color="secondary" size="small" />
+            </Box>
+          </Box>
+        ))}
       </CardContent>
     </Card>
   );
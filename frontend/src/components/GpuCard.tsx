@@ -1,11 +1,16 @@
 import { Card, CardContent, Typography, Box, Chip } from '@mui/material';
-import { parseTemperature, getTemperatureColor } from '../api/client';
+import { parseTemperature, getTemperatureColor, GpuDevice } from '../api/client';
 
 interface GPUMetrics {
   name: string;
   memory?: string;
   temperature?: string;
   utilization?: string;
+  devices?: GpuDevice[];
+}
+
+function formatNumber(value: number | null, unit: string): string {
+  return value === null ? 'N/A' : `${Math.round(value)}${unit}`;
 }
 
 interface GpuCardProps {
@@ -79,6 +84,21 @@ export default function GpuCard({ metrics }: GpuCardProps) {
               <Chip label={metrics.utilization} />
             </Box>
           )}
+
+          {metrics.devices && metrics.devices.length > 1 && (
+            <Box>
+              <Typography variant="body2" color="text.secondary" gutterBottom>
+                All GPUs ({metrics.devices.length})
+              </Typography>
+              {metrics.devices.map((gpu) => (
+                <Typography key={gpu.uuid || gpu.index} variant="body2" sx={{ fontFamily: 'monospace' }}>
+                  #{gpu.index} {formatNumber(gpu.utilization_percent, '%')} ·{' '}
+                  {formatNumber(gpu.memory_used_mib, '')}/{formatNumber(gpu.memory_total_mib, ' MB')} ·{' '}
+                  {formatNumber(gpu.power_draw_w, ' W')} · {formatNumber(gpu.temperature_c, '°C')}
+                </Typography>
+              ))}
+            </Box>
+          )}
         </Box>
       </CardContent>
     </Card>
@@ -6,6 +6,7 @@ interface MemoryMetrics {
   used_gb: number;
   free_gb: number;
   percent: number;
+  available_gb?: number;
 }
 
 interface MemoryCardProps {
@@ -15,9 +16,11 @@ interface MemoryCardProps {
 const COLORS = ['#4caf50', '#2196f3'];
 
 export default function MemoryCard({ metrics }: MemoryCardProps) {
+  // Older hosts report MemAvailable as free_gb and no available_gb
+  const availableGb = metrics.available_gb ?? metrics.free_gb;
   const data = [
     { name: 'Used', value: metrics.used_gb },
-    { name: 'Free', value: metrics.free_gb },
+    { name: 'Available', value: availableGb },
   ];
 
   return (
@@ -58,8 +61,13 @@ export default function MemoryCard({ metrics }: MemoryCardProps) {
               Used: {metrics.used_gb.toFixed(2)} GB
             </Typography>
             <Typography variant="body1" gutterBottom>
-              Free: {metrics.free_gb.toFixed(2)} GB
+              Available: {availableGb.toFixed(2)} GB
             </Typography>
+            {metrics.available_gb !== undefined && (
+              <Typography variant="body1" gutterBottom>
+                Free: {metrics.free_gb.toFixed(2)} GB
+              </Typography>
+            )}
             <Typography variant="h6" sx={{ mt: 2 }} color="primary">
               Usage: {metrics.percent.toFixed(1)}%
             </Typography>
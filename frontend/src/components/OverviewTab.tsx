@@ -14,22 +14,37 @@ interface OverviewTabProps {
 }
 
 export default function OverviewTab({ metrics }: OverviewTabProps) {
-    const handleDownloadReport = () => {
+    const handleDownloadReport = (path: string) => {
         // Direct link to the backend report endpoint
         // Using localhost:8000 because we are in browser
-        window.location.href = 'http://localhost:8000/api/reports/all';
+        window.location.href = `http://localhost:8000${path}`;
     };
 
     return (
         <Grid container spacing={3}>
             {/* Download Report Button */}
             <Grid item xs={12}>
-                <Box display="flex" justifyContent="flex-end">
+                <Box display="flex" justifyContent="flex-end" gap={1}>
+                    <Button
+                        variant="outlined"
+                        color="primary"
+                        startIcon={<DownloadIcon />}
+                        onClick={() => handleDownloadReport('/api/reports/csv')}
+                    >
+                        CSV
+                    </Button>
+                    <Button
+                        variant="outlined"
+                        color="primary"
+                        onClick={() => window.open('http://localhost:8000/api/reports/html', '_blank')}
+                    >
+                        HTML Report
+                    </Button>
                     <Button
                         variant="contained"
                         color="primary"
                         startIcon={<DownloadIcon />}
-                        onClick={handleDownloadReport}
+                        onClick={() => handleDownloadReport('/api/reports/all')}
                     >
                         Download Report (JSONL)
                     </Button>
@@ -38,7 +53,7 @@ export default function OverviewTab({ metrics }: OverviewTabProps) {
 
             {/* CPU Card */}
             <Grid item xs={12} md={6}>
-                <CpuCard metrics={metrics.cpu} />
+                <CpuCard metrics={metrics.cpu} power={metrics.power} />
             </Grid>
 
             {/* Memory Card */}
@@ -66,6 +81,7 @@ export default function OverviewTab({ metrics }: OverviewTabProps) {
                 <SystemInfoCard
                     system={metrics.system}
                     alerts={metrics.alerts}
+                    drives={metrics.smart?.devices}
                 />
             </Grid>
 
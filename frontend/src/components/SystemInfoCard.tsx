@@ -1,4 +1,5 @@
 import { Card, CardContent, Typography, Box, Alert, Divider } from '@mui/material';
+import { SmartDevice } from '../api/client';
 
 interface SystemInfo {
   uptime?: string;
@@ -11,9 +12,21 @@ interface SystemInfo {
 interface SystemInfoCardProps {
   system: SystemInfo;
   alerts?: string;
+  drives?: SmartDevice[];
 }
 
-export default function SystemInfoCard({ system, alerts }: SystemInfoCardProps) {
+function describeDrive(drive: SmartDevice): string {
+  if (drive.error && drive.health === 'Unknown') {
+    return drive.error;
+  }
+  const parts = [drive.health];
+  if (drive.temperature_c != null) parts.push(`${drive.temperature_c}°C`);
+  if (drive.reallocated_sectors != null) parts.push(`realloc ${drive.reallocated_sectors}`);
+  if (drive.wear_percent != null) parts.push(`wear ${drive.wear_percent}%`);
+  return parts.join(' · ');
+}
+
+export default function SystemInfoCard({ system, alerts, drives }: SystemInfoCardProps) {
   return (
     <Card>
       <CardContent>
@@ -51,6 +64,16 @@ export default function SystemInfoCard({ system, alerts }: SystemInfoCardProps)
               >
                 {system.smart_health}
               </Typography>
+              {drives && drives.map((drive) => (
+                <Typography
+                  key={drive.device}
+                  variant="body2"
+                  sx={{ fontFamily: 'monospace', fontSize: '0.85rem' }}
+                  color={drive.health === 'FAILED' ? 'error.main' : 'text.primary'}
+                >
+                  {drive.device}: {describeDrive(drive)}
+                </Typography>
+              ))}
             </Box>
           )}
 
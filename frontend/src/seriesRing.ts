@@ -0,0 +1,195 @@
+/**
+ * Fixed-capacity chart history.
+ *
+ * Each graph view keeps one SeriesRing: a typed array per series holding
+ * sums and counts per time bucket, written in place. The slot of a bucket
+ * follows from its time, so samples are averaged into their bucket, a new
+ * bucket overwrites the one a view span older, and buckets without samples
+ * (an outage, a laptop sleep) stay empty and chart as gaps. Chart rows are
+ * built once per bucket and cached, so a poll rebuilds only the row of the
+ * bucket it touched and rows() returns the cached objects in order.
+ */
+import { HistorySeries, MetricsSnapshot } from './api/client';
+
+export const SERIES_KEYS = ['cpu', 'memory', 'disk', 'gpu', 'lanRx', 'lanTx', 'wifiRx', 'wifiTx'] as const;
+export type SeriesKey = typeof SERIES_KEYS[number];
+export type SeriesPoint = Record<SeriesKey, number | null>;
+export type ChartRow = { time: string } & Record<SeriesKey, number | null>;
+
+// Name of each series in /api/metrics/history
+const SERVER_NAMES: Record<SeriesKey, string> = {
+  cpu: 'cpu',
+  memory: 'memory',
+  disk: 'disk',
+  gpu: 'gpu',
+  lanRx: 'lan_rx',
+  lanTx: 'lan_tx',
+  wifiRx: 'wifi_rx',
+  wifiTx: 'wifi_tx',
+};
+
+// Network rates are stored in bytes/s and charted in KB/s
+const KB_SERIES: ReadonlySet<SeriesKey> = new Set<SeriesKey>(['lanRx', 'lanTx', 'wifiRx', 'wifiTx']);
+
+// Points per chart; longer views average more time into each point
+export const CHART_POINTS = 720;
+
+export interface HistoryView {
+  label: string;
+  seconds: number;
+}
+
+export const HISTORY_VIEWS: HistoryView[] = [
+  { label: '5 min', seconds: 300 },
+  { label: '1 hour', seconds: 3600 },
+  { label: '24 hours', seconds: 86400 },
+];
+
+// Helper to parse GPU utilization string "45%" -> 45
+const parseGpuUtil = (utilStr?: string): number | null => {
+  if (!utilStr || utilStr === 'N/A') return null;
+  const match = utilStr.match(/(\d+)/);
+  return match ? parseFloat(match[1]) : null;
+};
+
+/** The charted values of one snapshot. */
+export function pointFromSnapshot(snapshot: MetricsSnapshot): SeriesPoint {
+  const lan = snapshot.network.stats?.lan;
+  const wifi = snapshot.network.stats?.wifi;
+  return {
+    cpu: snapshot.cpu.usage,
+    memory: snapshot.memory.percent,
+    disk: snapshot.disk.percent ?? null,
+    gpu: parseGpuUtil(snapshot.gpu.utilization),
+    lanRx: lan?.rx ?? null,
+    lanTx: lan?.tx ?? null,
+    wifiRx: wifi?.rx ?? null,
+    wifiTx: wifi?.tx ?? null,
+  };
+}
+
+export class SeriesRing {
+  readonly capacity: number;
+  readonly bucketMs: number;
+  // Bumped on every change; use as the memo key of rows()
+  version = 0;
+
+  // Bucket number (epoch ms / bucketMs) held by each slot; a slot whose
+  // number is outside the window of the newest bucket is empty
+  private buckets: Float64Array;
+  private sums: Record<SeriesKey, Float64Array>;
+  private counts: Record<SeriesKey, Uint32Array>;
+  private rowCache: (ChartRow | null)[];
+  // Bucket number each cached row was built for
+  private rowBuckets: Float64Array;
+  private newest = -Infinity;
+
+  /**
+   * @param seconds Time span of the view
+   * @param minBucketMs Shortest bucket (the poll interval)
+   */
+  constructor(seconds: number, minBucketMs: number) {
+    this.bucketMs = Math.max(minBucketMs, (seconds * 1000) / CHART_POINTS);
+    this.capacity = Math.ceil((seconds * 1000) / this.bucketMs);
+    this.buckets = new Float64Array(this.capacity).fill(-1);
+    this.sums = {} as Record<SeriesKey, Float64Array>;
+    this.counts = {} as Record<SeriesKey, Uint32Array>;
+    for (const key of SERIES_KEYS) {
+      this.sums[key] = new Float64Array(this.capacity);
+      this.counts[key] = new Uint32Array(this.capacity);
+    }
+    this.rowCache = new Array(this.capacity).fill(null);
+    this.rowBuckets = new Float64Array(this.capacity).fill(-1);
+  }
+
+  /**
+   * Add a sample taken at tMs (epoch ms). Buckets are slotted by time, so a
+   * newer bucket evicts whatever the ring held a full view span earlier;
+   * samples older than the view span are dropped.
+   */
+  add(tMs: number, point: SeriesPoint): void {
+    const bucket = Math.floor(tMs / this.bucketMs);
+    if (bucket <= this.newest - this.capacity) return;
+    const slot = bucket % this.capacity;
+    if (this.buckets[slot] !== bucket) {
+      this.buckets[slot] = bucket;
+      for (const key of SERIES_KEYS) {
+        this.sums[key][slot] = 0;
+        this.counts[key][slot] = 0;
+      }
+    }
+    for (const key of SERIES_KEYS) {
+      const value = point[key];
+      if (value !== null && Number.isFinite(value)) {
+        this.sums[key][slot] += value;
+        this.counts[key][slot] += 1;
+      }
+    }
+    this.newest = Math.max(this.newest, bucket);
+    this.rowCache[slot] = null;
+    this.version += 1;
+  }
+
+  /**
+   * Fill the ring from a server-side downsampled series. Buckets already
+   * holding live samples are kept.
+   */
+  backfill(history: HistorySeries): void {
+    history.t.forEach((t, i) => {
+      const tMs = t * 1000;
+      const bucket = Math.floor(tMs / this.bucketMs);
+      if (this.buckets[bucket % this.capacity] === bucket) return;
+      const point = {} as SeriesPoint;
+      let any = false;
+      for (const key of SERIES_KEYS) {
+        const value = history.series[SERVER_NAMES[key]]?.[i] ?? null;
+        point[key] = value;
+        any = any || value !== null;
+      }
+      if (any) this.add(tMs, point);
+    });
+    this.version += 1;
+  }
+
+  private mean(slot: number): SeriesPoint {
+    const point = {} as SeriesPoint;
+    for (const key of SERIES_KEYS) {
+      const n = this.counts[key][slot];
+      point[key] = n ? this.sums[key][slot] / n : null;
+    }
+    return point;
+  }
+
+  /**
+   * Chart rows oldest first, one per bucket of the view up to the newest
+   * sample; buckets without samples are rows of nulls, so the charts show
+   * the gap. Unchanged buckets return the same objects.
+   */
+  rows(): ChartRow[] {
+    if (this.newest === -Infinity) return [];
+    const rows: ChartRow[] = new Array(this.capacity);
+    const withSeconds = this.bucketMs < 60000;
+    const first = this.newest - this.capacity + 1;
+    for (let i = 0; i < this.capacity; i++) {
+      const bucket = first + i;
+      const slot = bucket % this.capacity;
+      let row = this.rowBuckets[slot] === bucket ? this.rowCache[slot] : null;
+      if (row === null) {
+        const date = new Date(bucket * this.bucketMs);
+        row = {
+          time: withSeconds ? date.toLocaleTimeString() : date.toLocaleTimeString([], { hour: '2-digit', minute: '2-digit' }),
+        } as ChartRow;
+        const held = this.buckets[slot] === bucket;
+        const mean = held ? this.mean(slot) : null;
+        for (const key of SERIES_KEYS) {
+          const value = mean ? mean[key] : null;
+          row[key] = value !== null && KB_SERIES.has(key) ? value / 1024 : value;
+        }
+        this.rowCache[slot] = row;
+        this.rowBuckets[slot] = bucket;
+      }
+      rows[i] = row;
+    }
+    return rows;
+  }
+}
@@ -55,6 +55,14 @@ PREV_NET_TIME=0
 declare -A PREV_NET_RX
 declare -A PREV_NET_TX
 
+# Kernel boot id: state saved during a different boot holds counters that
+# were reset by the reboot and must not be used for deltas
+CURRENT_BOOT_ID=$(cat /proc/sys/kernel/random/boot_id 2>/dev/null)
+if [ -z "$CURRENT_BOOT_ID" ]; then
+    CURRENT_BOOT_ID="btime:$(awk '/^btime/{print $2}' /proc/stat 2>/dev/null)"
+fi
+SAVED_BOOT_ID=""
+
 # Load previous state if it exists (for CPU and network delta calculations)
 if [ -f "$STATE_FILE" ]; then
     # Read state file line by line and restore values
@@ -63,7 +71,9 @@ if [ -f "$STATE_FILE" ]; then
         [[ -z "$line" || "$line" =~ ^# ]] && continue
         
         # Parse key=value or key[index]=value
-        if [[ "$line" =~ ^PREV_CPU_TOTAL=(.+)$ ]]; then
+        if [[ "$line" =~ ^BOOT_ID=(.+)$ ]]; then
+            SAVED_BOOT_ID="${BASH_REMATCH[1]}"
+        elif [[ "$line" =~ ^PREV_CPU_TOTAL=(.+)$ ]]; then
             PREV_CPU_TOTAL="${BASH_REMATCH[1]}"
         elif [[ "$line" =~ ^PREV_CPU_IDLE=(.+)$ ]]; then
             PREV_CPU_IDLE="${BASH_REMATCH[1]}"
@@ -79,6 +89,17 @@ if [ -f "$STATE_FILE" ]; then
             PREV_NET_TX["$interface"]="$value"
         fi
     done < "$STATE_FILE" 2>/dev/null || true
+
+    # Discard state from a previous boot, or whose CPU counters went backwards
+    current_cpu_total=$(awk '/^cpu /{print $2 + $3 + $4 + $5}' /proc/stat 2>/dev/null)
+    if [ "$SAVED_BOOT_ID" != "$CURRENT_BOOT_ID" ] || \
+       { [ -n "$current_cpu_total" ] && [ "$current_cpu_total" -lt "$PREV_CPU_TOTAL" ]; }; then
+        PREV_CPU_TOTAL=0
+        PREV_CPU_IDLE=0
+        PREV_NET_TIME=0
+        PREV_NET_RX=()
+        PREV_NET_TX=()
+    fi
 fi
 
 # Initialize METRICS array
@@ -87,150 +108,47 @@ declare -A METRICS
 # Run one collection cycle (mimics what main() does but only once)
 TIMESTAMP=$(date +%Y%m%d_%H%M%S)
 
-# Collect all metrics
-collect_rom_metrics 2>/dev/null
-collect_cpu_metrics 2>/dev/null
-collect_memory_metrics 2>/dev/null
-collect_network_metrics 2>/dev/null
-collect_load_metrics 2>/dev/null
-collect_top_processes 2>/dev/null
-collect_gpu_metrics 2>/dev/null
-collect_disk_metrics 2>/dev/null
-collect_smart_status 2>/dev/null
-check_alerts 2>/dev/null
-
-# Output JSON format
-# Escape JSON strings properly
-escape_json() {
-    echo "$1" | sed 's/\\/\\\\/g' | sed 's/"/\\"/g' | sed ':a;N;$!ba;s/\n/\\n/g' | sed 's/\r/\\r/g'
-}
-
-# Parse top processes
-parse_top_processes() {
-    local procs="${METRICS[TOP_PROCS]}"
-    echo "["
-    if [ -n "$procs" ]; then
-        IFS=';' read -ra PROC_ARRAY <<< "$procs"
-        local first=1
-        for proc in "${PROC_ARRAY[@]}"; do
-            [ -z "$proc" ] && continue
-            [ "$first" -eq 1 ] && first=0 || echo ","
-            
-            # Parse: "PID USER MEM% CMD"
-            local pid=$(echo "$proc" | awk '{print $1}')
-            local user=$(echo "$proc" | awk '{print $2}')
-            local mem=$(echo "$proc" | awk '{print $3}')
-            local cmd=$(echo "$proc" | cut -d' ' -f4-)
-            
-            echo -n "  {"
-            echo -n "\"pid\": \"$(escape_json "$pid")\","
-            echo -n "\"user\": \"$(escape_json "$user")\","
-            echo -n "\"memory_percent\": \"$(escape_json "$mem")\","
-            echo -n "\"command\": \"$(escape_json "$cmd")\""
-            echo -n "}"
-        done
-    fi
-    echo ""
-    echo "]"
-}
-
-# Output JSON
-echo "{"
-echo "  \"timestamp\": \"$(date -u +"%Y-%m-%dT%H:%M:%SZ" 2>/dev/null || date +"%Y-%m-%dT%H:%M:%S%z")\","
-echo "  \"cpu\": {"
-echo "    \"model\": \"$(escape_json "${METRICS[CPU_MODEL]:-Unknown}")\","
-echo "    \"cores\": ${METRICS[CPU_CORES]:-0},"
-echo "    \"usage\": ${METRICS[CPU_USAGE]:-0},"
-echo "    \"load_avg\": \"$(escape_json "${METRICS[LOAD_AVG]:-N/A}")\","
-echo "    \"temperature\": \"$(escape_json "${METRICS[TEMP]:-N/A}")\""
-echo "  },"
-echo "  \"memory\": {"
-echo "    \"total_gb\": ${METRICS[MEM_TOTAL]:-0},"
-echo "    \"used_gb\": ${METRICS[MEM_USED]:-0},"
-echo "    \"free_gb\": ${METRICS[MEM_FREE]:-0},"
-echo "    \"percent\": ${METRICS[MEM_PERCENT]:-0}"
-echo "  },"
-# Parse disk partitions from raw string
-parse_disk_partitions() {
-    local raw="${METRICS[DISK_RAW]}"
-    echo "["
-    if [ -n "$raw" ]; then
-        IFS=';' read -ra DISK_ARRAY <<< "$raw"
-        local first=1
-        for disk in "${DISK_ARRAY[@]}"; do
-            [ -z "$disk" ] && continue
-            [ "$first" -eq 1 ] && first=0 || echo ","
-            
-            # Format: path|size|used|avail|pcent
-            local path=$(echo "$disk" | cut -d'|' -f1)
-            local size=$(echo "$disk" | cut -d'|' -f2)
-            local used=$(echo "$disk" | cut -d'|' -f3)
-            local avail=$(echo "$disk" | cut -d'|' -f4)
-            local pcent=$(echo "$disk" | cut -d'|' -f5)
-            
-            echo -n "  {"
-            echo -n "\"path\": \"$(escape_json "$path")\","
-            echo -n "\"size\": \"$(escape_json "$size")\","
-            echo -n "\"used\": \"$(escape_json "$used")\","
-            echo -n "\"avail\": \"$(escape_json "$avail")\","
-            echo -n "\"percent\": ${pcent:-0}"
-            echo -n "}"
-        done
-    fi
-    echo ""
-    echo "]"
-}
-
-echo "  \"disk\": {"
-echo "    \"display\": \"$(escape_json "${METRICS[DISK_DISPLAY]:-N/A}")\","
-echo "    \"percent\": ${METRICS[DISK_PERCENT]:-0},"
-echo "    \"partitions\": $(parse_disk_partitions)"
-echo "  },"
-# Parse raw network metrics
-parse_network_raw() {
-    local raw="${METRICS[NET_RAW]}"
-    # Format: lan_rx|lan_tx|wifi_rx|wifi_tx|tcp
-    if [ -n "$raw" ]; then
-        local lan_rx=$(echo "$raw" | cut -d'|' -f1)
-        local lan_tx=$(echo "$raw" | cut -d'|' -f2)
-        local wifi_rx=$(echo "$raw" | cut -d'|' -f3)
-        local wifi_tx=$(echo "$raw" | cut -d'|' -f4)
-        local tcp=$(echo "$raw" | cut -d'|' -f5)
-        
-        echo "{"
-        echo "    \"lan\": { \"rx\": ${lan_rx:-0}, \"tx\": ${lan_tx:-0} },"
-        echo "    \"wifi\": { \"rx\": ${wifi_rx:-0}, \"tx\": ${wifi_tx:-0} },"
-        echo "    \"tcp\": ${tcp:-0}"
-        echo "}"
-    else
-        echo "null"
-    fi
+# Sections the host API collects natively are skipped here
+# (NATIVE_COLLECTORS, see is_native in system_monitor.sh)
+# The host API runs independent collectors as separate, concurrent
+# invocations and lists the ones wanted from this run in SCRIPT_COLLECTORS
+# (space-separated: rom cpu memory network load processes gpu disk smart
+# alerts). Everything runs when it is unset.
+wants() {
+    [ -z "${SCRIPT_COLLECTORS+x}" ] || [[ " ${SCRIPT_COLLECTORS} " == *" $1 "* ]]
 }
 
-echo "  \"network\": {"
-echo "    \"data\": \"$(escape_json "${METRICS[NET_DATA]:-N/A}")\","
-echo "    \"stats\": $(parse_network_raw)"
-echo "  },"
-echo "  \"gpu\": {"
-echo "    \"name\": \"$(escape_json "${METRICS[GPU_NAME]:-N/A}")\","
-echo "    \"memory\": \"$(escape_json "${METRICS[GPU_MEM]:-N/A}")\","
-echo "    \"temperature\": \"$(escape_json "${METRICS[GPU_TEMP]:-N/A}")\","
-echo "    \"utilization\": \"$(escape_json "${METRICS[GPU_UTIL]:-N/A}")\""
-echo "  },"
-echo "  \"system\": {"
-echo "    \"uptime\": \"$(escape_json "${METRICS[UPTIME]:-N/A}")\","
-echo "    \"process_count\": ${METRICS[PROC_COUNT]:-0},"
-echo "    \"smart_status\": \"$(escape_json "${METRICS[SMART_STATUS]:-N/A}")\","
-echo "    \"smart_health\": \"$(escape_json "${METRICS[SMART_HEALTH]:-N/A}")\","
-echo "    \"rom_info\": \"$(escape_json "${METRICS[ROM_INFO]:-N/A}")\""
-echo "  },"
-echo "  \"top_processes\": $(parse_top_processes),"
-echo "  \"alerts\": \"$(escape_json "${METRICS[ALERTS]:-No alerts.}")\""
-echo "}"
+# Collect the requested metrics
+wants rom && collect_rom_metrics 2>/dev/null
+wants cpu && collect_cpu_metrics 2>/dev/null
+if is_native memory; then
+    # Percent computed by the host API; check_alerts still needs it
+    METRICS[MEM_PERCENT]="${NATIVE_MEM_PERCENT:-0}"
+elif wants memory; then
+    collect_memory_metrics 2>/dev/null
+fi
+wants network && ! is_native network && collect_network_metrics 2>/dev/null
+wants load && collect_load_metrics 2>/dev/null
+wants processes && collect_top_processes 2>/dev/null
+wants gpu && collect_gpu_metrics 2>/dev/null
+wants disk && collect_disk_metrics 2>/dev/null
+wants smart && collect_smart_status 2>/dev/null
+wants alerts && check_alerts 2>/dev/null
+
+# Output JSON (print_metrics_json lives in system_monitor.sh so that
+# `system_monitor.sh --json-stream` emits the same document every tick)
+print_metrics_json
 
 # Save state for next call (for CPU and network delta calculations)
-# This allows CPU usage and network speed to be calculated correctly
+# This allows CPU usage and network speed to be calculated correctly.
+# Written to a temp file and renamed so a crash never leaves a torn state file.
+# Only the run that collected CPU or network owns the state; concurrent runs
+# for other collectors must not overwrite it with what they loaded.
+if ! wants cpu && ! wants network; then
+    exit 0
+fi
 {
+    echo "BOOT_ID=${CURRENT_BOOT_ID}"
     echo "PREV_CPU_TOTAL=${PREV_CPU_TOTAL}"
     echo "PREV_CPU_IDLE=${PREV_CPU_IDLE}"
     echo "PREV_NET_TIME=${PREV_NET_TIME}"
@@ -241,5 +159,5 @@ echo "}"
     for key in "${!PREV_NET_TX[@]}"; do
         echo "PREV_NET_TX[${key}]=${PREV_NET_TX[$key]}"
     done
-} > "$STATE_FILE" 2>/dev/null || true
+} > "${STATE_FILE}.tmp" 2>/dev/null && mv -f "${STATE_FILE}.tmp" "$STATE_FILE" 2>/dev/null || true
 
@@ -0,0 +1 @@
+# Native collectors that read /proc and /sys directly in the host API process
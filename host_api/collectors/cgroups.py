@@ -0,0 +1,246 @@
+"""
+Native cgroup v2 collector for per-container resource usage.
+
+Walks the unified hierarchy under /sys/fs/cgroup and reads cpu.stat,
+memory.current, memory.stat, io.stat and cpu.pressure for every slice,
+scope and container cgroup down to a configured depth. CPU usage is turned
+into a percentage of one core from usage_usec deltas, and I/O byte counters
+into rates, so a noisy neighbour shows up by name without calling the Docker
+API. Docker, containerd and podman cgroup names are mapped to short
+container ids.
+
+The directory walk is incremental: the list of cgroups is only rebuilt when
+nr_descendants in the root cgroup.stat changes (or after rescan_seconds as
+a safety net), so a steady host pays for the per-cgroup file reads only.
+"""
+import logging
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from collectors.memory import parse_pressure
+
+logger = logging.getLogger(__name__)
+
+SYS_FS_CGROUP = Path("/sys/fs/cgroup")
+
+# Container runtimes embed the 64-hex container id in the cgroup name:
+#   system.slice/docker-<id>.scope    (systemd cgroup driver)
+#   docker/<id>                       (cgroupfs driver)
+#   .../cri-containerd-<id>.scope     (Kubernetes / containerd)
+#   machine.slice/libpod-<id>.scope   (podman)
+CONTAINER_ID_RE = re.compile(r"(?:docker|cri-containerd|crio|libpod)[-/]([0-9a-f]{64})(?:\.scope)?$")
+
+MEMORY_STAT_FIELDS = ("anon", "file", "kernel", "shmem", "sock", "file_dirty", "file_writeback", "pgmajfault")
+
+
+def container_id(rel_path: str) -> Optional[str]:
+    """Map a cgroup path relative to the root to a short container id."""
+    match = CONTAINER_ID_RE.search(rel_path)
+    if not match:
+        return None
+    return match.group(1)[:12]
+
+
+def _read_kv(path: Path) -> Dict[str, int]:
+    """Parse a flat "key value" cgroup file (cpu.stat, memory.stat)."""
+    values: Dict[str, int] = {}
+    with open(path, "r") as f:
+        for line in f:
+            key, _, value = line.partition(" ")
+            try:
+                values[key] = int(value)
+            except ValueError:
+                continue
+    return values
+
+
+def _read_io_stat(path: Path) -> Dict[str, int]:
+    """Sum the per-device counters of io.stat across devices."""
+    totals = {"rbytes": 0, "wbytes": 0, "rios": 0, "wios": 0}
+    with open(path, "r") as f:
+        for line in f:
+            for item in line.split()[1:]:
+                key, _, value = item.partition("=")
+                if key in totals:
+                    totals[key] += int(value)
+    return totals
+
+
+def find_unified_root(root: Path = SYS_FS_CGROUP) -> Optional[Path]:
+    """
+    Locate the cgroup v2 hierarchy.
+
+    Returns:
+        /sys/fs/cgroup on pure v2 hosts, /sys/fs/cgroup/unified in hybrid
+        mode, or None on v1-only hosts
+    """
+    for candidate in (root, root / "unified"):
+        if (candidate / "cgroup.controllers").exists():
+            return candidate
+    return None
+
+
+class CgroupCollector:
+    """
+    Per-cgroup CPU, memory, I/O and CPU pressure with rates.
+
+    Args:
+        root: Mount point of the cgroup filesystem
+        max_depth: How many levels below the root to report
+        rescan_seconds: Force a directory re-walk at least this often
+    """
+
+    def __init__(self, root: Path = SYS_FS_CGROUP, max_depth: int = 4, rescan_seconds: float = 60.0):
+        self.root = find_unified_root(Path(root))
+        self.max_depth = max_depth
+        self.rescan_seconds = rescan_seconds
+
+        self._paths: List[str] = []
+        self._tree_version: Optional[tuple] = None
+        self._last_scan = 0.0
+
+        self._prev_time: Optional[float] = None
+        self._prev: Dict[str, Dict[str, int]] = {}
+
+    def available(self) -> bool:
+        """True if a cgroup v2 hierarchy is mounted."""
+        return self.root is not None
+
+    def _current_tree_version(self) -> Optional[tuple]:
+        """Cheap fingerprint of the tree: descendant counts and root mtime."""
+        try:
+            stat = _read_kv(self.root / "cgroup.stat")
+            mtime = os.stat(self.root).st_mtime_ns
+        except OSError:
+            return None
+        return (stat.get("nr_descendants", 0), stat.get("nr_dying_descendants", 0), mtime)
+
+    def _scan(self) -> None:
+        """Re-walk the hierarchy down to max_depth."""
+        paths: List[str] = []
+        root_str = str(self.root)
+        root_depth = root_str.rstrip(os.sep).count(os.sep)
+        for dirpath, dirnames, _ in os.walk(root_str):
+            depth = dirpath.rstrip(os.sep).count(os.sep) - root_depth
+            if depth >= self.max_depth:
+                dirnames[:] = []
+            if depth > 0:
+                paths.append(os.path.relpath(dirpath, root_str))
+        self._paths = paths
+        self._last_scan = time.monotonic()
+        logger.debug(f"Rescanned cgroup tree: {len(paths)} groups")
+
+    def cgroup_paths(self) -> List[str]:
+        """Cgroup paths relative to the root, re-listed only when the tree changed."""
+        version = self._current_tree_version()
+        stale = time.monotonic() - self._last_scan > self.rescan_seconds
+        if version != self._tree_version or stale or not self._paths:
+            self._tree_version = version
+            self._scan()
+        return self._paths
+
+    def _read_group(self, rel_path: str) -> Optional[Dict[str, Any]]:
+        group_dir = self.root / rel_path
+        try:
+            cpu = _read_kv(group_dir / "cpu.stat")
+        except OSError:
+            # Removed between scan and read
+            return None
+
+        entry: Dict[str, Any] = {
+            "path": rel_path,
+            "container_id": container_id(rel_path),
+            "cpu_usage_usec": cpu.get("usage_usec", 0),
+            "cpu_user_usec": cpu.get("user_usec", 0),
+            "cpu_system_usec": cpu.get("system_usec", 0),
+            "cpu_throttled_usec": cpu.get("throttled_usec", 0),
+            "memory_current": None,
+            "memory": None,
+            "io": None,
+            "cpu_pressure": None,
+        }
+
+        # memory/io controllers may not be enabled for every subtree
+        try:
+            entry["memory_current"] = int((group_dir / "memory.current").read_text())
+            stat = _read_kv(group_dir / "memory.stat")
+            entry["memory"] = {name: stat[name] for name in MEMORY_STAT_FIELDS if name in stat}
+        except (OSError, ValueError):
+            pass
+        try:
+            entry["io"] = _read_io_stat(group_dir / "io.stat")
+        except (OSError, ValueError):
+            pass
+        try:
+            entry["cpu_pressure"] = parse_pressure((group_dir / "cpu.pressure").read_text())
+        except (OSError, ValueError):
+            pass
+        return entry
+
+    def collect(self) -> Dict[str, Any]:
+        """
+        Sample every cgroup and compute rates since the previous sample.
+
+        Returns:
+            Dictionary with "groups" sorted by CPU usage; each group has raw
+            counters, "cpu_percent" (100 = one full core) and I/O byte rates
+        """
+        now = time.monotonic()
+        elapsed = None
+        if self._prev_time is not None and now - self._prev_time > 0.1:
+            elapsed = now - self._prev_time
+
+        groups: List[Dict[str, Any]] = []
+        current: Dict[str, Dict[str, int]] = {}
+        for rel_path in self.cgroup_paths():
+            entry = self._read_group(rel_path)
+            if entry is None:
+                continue
+
+            io = entry["io"] or {}
+            counters = {
+                "usage_usec": entry["cpu_usage_usec"],
+                "rbytes": io.get("rbytes", 0),
+                "wbytes": io.get("wbytes", 0),
+            }
+            current[rel_path] = counters
+
+            prev = self._prev.get(rel_path)
+            cpu_percent = read_rate = write_rate = 0.0
+            if elapsed is not None and prev is not None:
+                cpu_percent = max(counters["usage_usec"] - prev["usage_usec"], 0) / (elapsed * 1e6) * 100
+                read_rate = max(counters["rbytes"] - prev["rbytes"], 0) / elapsed
+                write_rate = max(counters["wbytes"] - prev["wbytes"], 0) / elapsed
+            entry["cpu_percent"] = round(cpu_percent, 2)
+            entry["io_read_rate"] = round(read_rate)
+            entry["io_write_rate"] = round(write_rate)
+            groups.append(entry)
+
+        self._prev = current
+        self._prev_time = now
+
+        groups.sort(key=lambda g: (g["cpu_percent"], g["memory_current"] or 0), reverse=True)
+        return {"root": str(self.root), "groups": groups}
+
+    def export_state(self) -> Dict[str, Any]:
+        """Counter state for the warm-start checkpoint."""
+        return {"time": self._prev_time, "counters": self._prev}
+
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        """Restore per-cgroup counters; groups recreated since are dropped on first use."""
+        if not self.available():
+            return
+        saved = state.get("counters") or {}
+        kept = {}
+        for rel_path, counters in saved.items():
+            try:
+                usage = _read_kv(self.root / rel_path / "cpu.stat").get("usage_usec", 0)
+            except OSError:
+                continue
+            if usage >= counters.get("usage_usec", 0):
+                kept[rel_path] = counters
+        self._prev = kept
+        self._prev_time = state.get("time") if kept else None
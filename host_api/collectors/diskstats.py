@@ -0,0 +1,276 @@
+"""
+Native block device I/O collector.
+
+`df` only reports capacity; a disk can be nearly empty and still be the
+bottleneck. This collector reads /proc/diskstats (one pread() on a file
+descriptor kept open across ticks, whatever the number of devices) and
+turns the deltas of its cumulative counters into per-device rates:
+
+    read/write bytes/s and IOPS, average await (ms per completed I/O),
+    average queue depth and %util (share of wall time with I/O in flight)
+
+Loop, ram and zram devices are skipped by default. Partitions are reported
+under their disk (from /sys/block/<disk>/<partition>, cached per name) with
+throughput and IOPS only: the kernel's busy-time counters are kept per
+disk, so await, queue depth and %util are disk-level values.
+
+The "total" rollup counts only the bottom of each device stack: dm-* and
+md* devices built on other disks (LVM, dm-crypt, software RAID; those with
+entries in /sys/block/<dev>/slaves) are reported but not added, so their
+I/O is not counted twice.
+"""
+import fnmatch
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+PROC_DISKSTATS = Path("/proc/diskstats")
+SYS_BLOCK = Path("/sys/block")
+
+DEFAULT_EXCLUDE = ("loop*", "ram*", "zram*")
+
+# /proc/diskstats sizes are in 512-byte sectors regardless of the device
+SECTOR_BYTES = 512
+
+# Initial pread() size; doubled while the file does not fit
+READ_SIZE = 16384
+
+# Upper bound on remembered device names before the caches are rebuilt
+MAX_CACHED_NAMES = 4096
+
+# Counter columns after "major minor name" (Documentation/admin-guide/iostats.rst)
+READS, READS_MERGED, SECTORS_READ, READ_MS = 0, 1, 2, 3
+WRITES, WRITES_MERGED, SECTORS_WRITTEN, WRITE_MS = 4, 5, 6, 7
+IN_FLIGHT, IO_MS, WEIGHTED_MS = 8, 9, 10
+
+
+def _rate(delta: int, elapsed: float) -> float:
+    # Negative deltas mean the counter wrapped (32-bit on old kernels) or the
+    # device was re-created; report 0 rather than a bogus spike
+    return max(delta, 0) / elapsed
+
+
+class DiskStatsCollector:
+    """
+    Per-disk throughput, IOPS, latency, queue depth and utilisation.
+
+    Args:
+        include: Device name globs to report
+        exclude: Device name globs to skip (applied after include)
+        proc_path: Path of /proc/diskstats
+        sys_block: Path of /sys/block (disk/partition layout)
+    """
+
+    def __init__(
+        self,
+        include: Sequence[str] = ("*",),
+        exclude: Sequence[str] = DEFAULT_EXCLUDE,
+        proc_path: Path = PROC_DISKSTATS,
+        sys_block: Path = SYS_BLOCK,
+    ):
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+        self.proc_path = Path(proc_path)
+        self.sys_block = Path(sys_block)
+
+        self._fd: Optional[int] = None
+        self._read_size = READ_SIZE
+        # Filter decisions, partition -> disk names and whether a disk is
+        # stacked on others are cached per device
+        self._wanted: Dict[str, bool] = {}
+        self._parents: Dict[str, Optional[str]] = {}
+        self._stacked: Dict[str, bool] = {}
+
+        self._prev_time: Optional[float] = None
+        self._prev: Dict[str, List[int]] = {}
+
+    def available(self) -> bool:
+        """True if /proc/diskstats can be read on this host."""
+        return self.proc_path.exists()
+
+    def _is_wanted(self, name: str) -> bool:
+        wanted = self._wanted.get(name)
+        if wanted is None:
+            wanted = (
+                any(fnmatch.fnmatchcase(name, pattern) for pattern in self.include)
+                and not any(fnmatch.fnmatchcase(name, pattern) for pattern in self.exclude)
+            )
+            self._wanted[name] = wanted
+        return wanted
+
+    def _parent(self, name: str) -> Optional[str]:
+        """Disk holding a partition, None for a whole disk."""
+        if name in self._parents:
+            return self._parents[name]
+        parent = None
+        # /sys/block lists whole disks; "/" in names (cciss!c0d0) becomes "!"
+        sys_name = name.replace("/", "!")
+        if not (self.sys_block / sys_name).exists():
+            try:
+                resolved = (self.sys_block.parent / "class" / "block" / sys_name).resolve()
+                if (resolved / "partition").exists():
+                    parent = resolved.parent.name.replace("!", "/")
+            except OSError:
+                pass
+        self._parents[name] = parent
+        return parent
+
+    def _is_stacked(self, name: str) -> bool:
+        """True for a disk built on other block devices (dm, md)."""
+        stacked = self._stacked.get(name)
+        if stacked is None:
+            try:
+                stacked = any(os.scandir(self.sys_block / name.replace("/", "!") / "slaves"))
+            except OSError:
+                stacked = False
+            self._stacked[name] = stacked
+        return stacked
+
+    def _read(self) -> bytes:
+        if self._fd is None:
+            self._fd = os.open(self.proc_path, os.O_RDONLY)
+        while True:
+            raw = os.pread(self._fd, self._read_size, 0)
+            if len(raw) < self._read_size:
+                return raw
+            # Did not fit: grow once and re-read (rare, many devices)
+            self._read_size *= 2
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def read_counters(self) -> Dict[str, List[int]]:
+        """
+        Read the cumulative counters of every wanted device.
+
+        Returns:
+            Mapping of device name to its first 11 /proc/diskstats counters
+        """
+        counters: Dict[str, List[int]] = {}
+        try:
+            raw = self._read()
+        except OSError:
+            # Stale descriptor (e.g. procfs remounted): reopen on the next call
+            self.close()
+            raise
+        for line in raw.split(b"\n"):
+            parts = line.split(None, 3)
+            if len(parts) < 4:
+                continue
+            name = parts[2].decode()
+            if not self._is_wanted(name):
+                continue
+            values = parts[3].split(None, 11)
+            if len(values) < 11:
+                continue
+            counters[name] = [int(v) for v in values[:11]]
+        return counters
+
+    def collect(self) -> Dict[str, Any]:
+        """
+        Sample /proc/diskstats and compute rates since the previous sample.
+
+        Returns:
+            Dictionary with a "devices" list (one entry per disk, its
+            partitions nested) and a "total" read/write rollup over disks
+            that are not stacked on other disks
+        """
+        now = time.monotonic()
+        counters = self.read_counters()
+
+        elapsed = None
+        if self._prev_time is not None and now - self._prev_time > 0.1:
+            elapsed = now - self._prev_time
+
+        disks: Dict[str, Dict[str, Any]] = {}
+        partitions: List[tuple] = []
+        total = {"read_bytes_per_s": 0.0, "write_bytes_per_s": 0.0, "read_iops": 0.0, "write_iops": 0.0}
+
+        for name, values in counters.items():
+            prev = self._prev.get(name) if elapsed is not None else None
+            entry: Dict[str, Any] = {"name": name}
+            if prev is None:
+                entry.update(read_bytes_per_s=0, write_bytes_per_s=0, read_iops=0.0, write_iops=0.0)
+            else:
+                entry.update(
+                    read_bytes_per_s=round(_rate(values[SECTORS_READ] - prev[SECTORS_READ], elapsed) * SECTOR_BYTES),
+                    write_bytes_per_s=round(_rate(values[SECTORS_WRITTEN] - prev[SECTORS_WRITTEN], elapsed) * SECTOR_BYTES),
+                    read_iops=round(_rate(values[READS] - prev[READS], elapsed), 1),
+                    write_iops=round(_rate(values[WRITES] - prev[WRITES], elapsed), 1),
+                )
+
+            parent = self._parent(name)
+            if parent is not None:
+                partitions.append((parent, entry))
+                continue
+
+            entry.update(read_await_ms=None, write_await_ms=None, await_ms=None, queue_depth=0.0, util_percent=0.0)
+            entry["in_flight"] = values[IN_FLIGHT]
+            if prev is not None:
+                reads = max(values[READS] - prev[READS], 0)
+                writes = max(values[WRITES] - prev[WRITES], 0)
+                read_ms = max(values[READ_MS] - prev[READ_MS], 0)
+                write_ms = max(values[WRITE_MS] - prev[WRITE_MS], 0)
+                if reads:
+                    entry["read_await_ms"] = round(read_ms / reads, 2)
+                if writes:
+                    entry["write_await_ms"] = round(write_ms / writes, 2)
+                if reads + writes:
+                    entry["await_ms"] = round((read_ms + write_ms) / (reads + writes), 2)
+                entry["queue_depth"] = round(_rate(values[WEIGHTED_MS] - prev[WEIGHTED_MS], elapsed) / 1000, 2)
+                entry["util_percent"] = round(min(_rate(values[IO_MS] - prev[IO_MS], elapsed) / 10, 100.0), 1)
+            entry["partitions"] = []
+            disks[name] = entry
+            if not self._is_stacked(name):
+                for key in total:
+                    total[key] += entry[key]
+
+        for parent, entry in partitions:
+            disk = disks.get(parent)
+            if disk is not None:
+                disk["partitions"].append(entry)
+
+        # Device-mapper/LVM churn creates new names; bound the caches
+        if len(self._wanted) > MAX_CACHED_NAMES:
+            self._wanted.clear()
+            self._parents = {n: p for n, p in self._parents.items() if n in counters}
+            self._stacked = {n: s for n, s in self._stacked.items() if n in counters}
+
+        self._prev = counters
+        self._prev_time = now
+
+        return {
+            "devices": list(disks.values()),
+            "total": {key: round(value, 1) for key, value in total.items()},
+        }
+
+    def export_state(self) -> Dict[str, Any]:
+        """Counter state for the warm-start checkpoint."""
+        return {"time": self._prev_time, "counters": self._prev}
+
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        """
+        Restore counters from a checkpoint written during this boot.
+
+        Like the network collector, relies on CLOCK_MONOTONIC continuing
+        across restarts; devices whose counters went backwards are dropped.
+        """
+        saved = state.get("counters") or {}
+        try:
+            current = self.read_counters()
+        except OSError:
+            return
+
+        self._prev = {
+            name: values
+            for name, values in saved.items()
+            if name in current and len(values) == len(current[name])
+            and all(current[name][i] >= values[i] for i in range(len(values)) if i != IN_FLIGHT)
+        }
+        self._prev_time = state.get("time") if self._prev else None
@@ -0,0 +1,317 @@
+"""
+Streaming NVIDIA GPU collector.
+
+Runs `nvidia-smi --query-gpu=... --format=csv,noheader,nounits -lms <ms>`
+once as a long-lived child process and parses its CSV stream on a reader
+thread. nvidia-smi initialises NVML once and then prints one line per GPU
+every interval, so a sample only reads the latest values from memory
+instead of paying hundreds of milliseconds for a fresh nvidia-smi per
+request. Every GPU on the host is reported, not only the first line.
+
+If the child exits (driver reload, GPU reset, killed) it is restarted with
+exponential backoff; a child that hangs and stops printing lines is killed
+by a watchdog, and values older than the stall limit are not served. The command is configurable (NVIDIA_SMI), so a
+stand-in script printing the same CSV lines can replace the real binary.
+"""
+import logging
+import os
+import shutil
+import signal
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Queried fields, in output column order
+QUERY_FIELDS = (
+    "index",
+    "uuid",
+    "name",
+    "utilization.gpu",
+    "utilization.memory",
+    "memory.used",
+    "memory.total",
+    "temperature.gpu",
+    "power.draw",
+    "power.limit",
+    "clocks.sm",
+    "clocks.mem",
+)
+
+# Column name -> output key; all numeric columns are floats (nounits)
+FIELD_KEYS = {
+    "index": "index",
+    "uuid": "uuid",
+    "name": "name",
+    "utilization.gpu": "utilization_percent",
+    "utilization.memory": "memory_utilization_percent",
+    "memory.used": "memory_used_mib",
+    "memory.total": "memory_total_mib",
+    "temperature.gpu": "temperature_c",
+    "power.draw": "power_draw_w",
+    "power.limit": "power_limit_w",
+    "clocks.sm": "clock_sm_mhz",
+    "clocks.mem": "clock_mem_mhz",
+}
+TEXT_FIELDS = {"uuid", "name"}
+
+WINDOWS_NVIDIA_SMI = Path("/mnt/c/Windows/System32/nvidia-smi.exe")
+
+MAX_RESTART_BACKOFF_SECONDS = 60.0
+
+
+def find_nvidia_smi(configured: str = "") -> Optional[str]:
+    """Locate nvidia-smi (Linux, WSL interop or an explicit command)."""
+    if configured:
+        return configured
+    for name in ("nvidia-smi", "nvidia-smi.exe"):
+        path = shutil.which(name)
+        if path:
+            return path
+    if WINDOWS_NVIDIA_SMI.exists():
+        return str(WINDOWS_NVIDIA_SMI)
+    return None
+
+
+def parse_csv_line(line: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse one line of the query CSV.
+
+    Returns:
+        Mapping of output key to value ("[N/A]" / "[Not Supported]" become
+        None), or None if the line does not have the expected columns
+    """
+    parts = [p.strip() for p in line.strip().split(",")]
+    if len(parts) != len(QUERY_FIELDS):
+        return None
+    gpu: Dict[str, Any] = {}
+    for field, raw in zip(QUERY_FIELDS, parts):
+        key = FIELD_KEYS[field]
+        if field in TEXT_FIELDS:
+            gpu[key] = raw
+            continue
+        try:
+            value = float(raw)
+        except ValueError:
+            value = None
+        gpu[key] = value
+    if gpu["index"] is None:
+        return None
+    gpu["index"] = int(gpu["index"])
+    return gpu
+
+
+class NvidiaSmiStream:
+    """
+    Persistent nvidia-smi child with the latest values per GPU.
+
+    Args:
+        command: nvidia-smi executable (or stand-in); autodetected when empty
+        interval_ms: Loop interval passed to -lms
+        stall_seconds: Restart the child if no line arrives for this long
+            (at least three loop intervals are always allowed)
+    """
+
+    def __init__(self, command: str = "", interval_ms: int = 1000, stall_seconds: float = 30.0):
+        self.command = find_nvidia_smi(command)
+        self.interval_ms = interval_ms
+        self.stall_seconds = stall_seconds
+
+        self._gpus: Dict[int, Dict[str, Any]] = {}
+        # Last line of the current child, or its start
+        self._updated = 0.0
+        self._lock = threading.Lock()
+        self._proc: Optional[subprocess.Popen] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        # Set while the child is restarted for a new interval
+        self._reconfigure = threading.Event()
+        self.restarts = 0
+
+    def available(self) -> bool:
+        """True if an nvidia-smi command was found."""
+        return self.command is not None
+
+    def argv(self) -> List[str]:
+        return [
+            self.command,
+            f"--query-gpu={','.join(QUERY_FIELDS)}",
+            "--format=csv,noheader,nounits",
+            "-lms",
+            str(self.interval_ms),
+        ]
+
+    def start(self) -> None:
+        """Start the supervisor thread (idempotent)."""
+        if not self.available() or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._supervise, name="nvidia-smi", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the child and the supervisor."""
+        self._stop.set()
+        self._terminate()
+
+    def _terminate(self) -> None:
+        # A stand-in script's children share its process group and stdout;
+        # signal them all so the pipe closes
+        proc = self._proc
+        if proc and proc.poll() is None:
+            self._signal(proc, signal.SIGTERM)
+            try:
+                proc.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self._signal(proc, signal.SIGKILL if os.name == "posix" else signal.SIGTERM)
+
+    @staticmethod
+    def _signal(proc: subprocess.Popen, sig: int) -> None:
+        try:
+            if os.name == "posix":
+                os.killpg(proc.pid, sig)
+            else:
+                proc.terminate()
+        except OSError:
+            pass
+
+    def pid(self) -> Optional[int]:
+        """Pid of the running child, None while it is down."""
+        proc = self._proc
+        return proc.pid if proc is not None and proc.poll() is None else None
+
+    def stall_limit(self) -> float:
+        """Silence after which the child counts as hung; a stretched -lms loop is not a stall."""
+        return max(self.stall_seconds, 3 * self.interval_ms / 1000)
+
+    def set_interval_ms(self, interval_ms: int) -> None:
+        """
+        Change the -lms loop interval; nvidia-smi cannot change it while
+        running, so the child is restarted (keeping the latest values).
+        """
+        if interval_ms == self.interval_ms:
+            return
+        self.interval_ms = interval_ms
+        if self.pid() is not None:
+            self._reconfigure.set()
+            self._terminate()
+
+    def _supervise(self) -> None:
+        backoff = 1.0
+        watchdog = threading.Thread(target=self._watch, name="nvidia-smi-watchdog", daemon=True)
+        watchdog.start()
+        while not self._stop.is_set():
+            started = time.monotonic()
+            with self._lock:
+                self._updated = started
+            try:
+                self._proc = subprocess.Popen(
+                    self.argv(),
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    encoding="utf-8",
+                    errors="replace",
+                    bufsize=1,
+                    start_new_session=os.name == "posix",
+                )
+            except OSError as e:
+                logger.warning(f"Cannot start {self.command}: {e}")
+            else:
+                for line in self._proc.stdout:
+                    self._handle_line(line)
+                code = self._proc.wait()
+                if self._stop.is_set():
+                    return
+                if self._reconfigure.is_set():
+                    # Restarted for a new interval: no backoff, values stay
+                    self._reconfigure.clear()
+                    logger.info(f"Restarting nvidia-smi with -lms {self.interval_ms}")
+                    continue
+                # Do not keep serving values of a child that is gone
+                with self._lock:
+                    self._gpus.clear()
+                logger.warning(f"nvidia-smi exited with code {code}, restarting")
+
+            self.restarts += 1
+            # A child that ran for a while gets restarted quickly again
+            if time.monotonic() - started > MAX_RESTART_BACKOFF_SECONDS:
+                backoff = 1.0
+            self._stop.wait(backoff)
+            backoff = min(backoff * 2, MAX_RESTART_BACKOFF_SECONDS)
+
+    def _watch(self) -> None:
+        """Kill a child that stopped printing lines (hung NVML call); the supervisor restarts it."""
+        while not self._stop.wait(min(self.stall_seconds / 4, 5.0)):
+            proc = self._proc
+            with self._lock:
+                silent = time.monotonic() - self._updated
+            if proc and proc.poll() is None and silent > self.stall_limit():
+                logger.warning(f"nvidia-smi silent for {silent:.0f}s, restarting")
+                self._terminate()
+
+    def _handle_line(self, line: str) -> None:
+        gpu = parse_csv_line(line)
+        if gpu is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._updated = now
+            prev = self._gpus.get(gpu["index"])
+            energy = 0.0
+            mem_rate = None
+            if prev is not None:
+                elapsed = now - prev["_time"]
+                energy = prev["energy_j"]
+                if elapsed > 0:
+                    # Trapezoidal integration of the power draw
+                    if gpu["power_draw_w"] is not None and prev["power_draw_w"] is not None:
+                        energy += (gpu["power_draw_w"] + prev["power_draw_w"]) / 2 * elapsed
+                    if gpu["memory_used_mib"] is not None and prev["memory_used_mib"] is not None:
+                        mem_rate = round((gpu["memory_used_mib"] - prev["memory_used_mib"]) / elapsed, 2)
+            gpu["energy_j"] = energy
+            gpu["memory_used_rate_mib_s"] = mem_rate
+            gpu["_time"] = now
+            self._gpus[gpu["index"]] = gpu
+
+    def devices(self) -> List[Dict[str, Any]]:
+        """
+        Latest values for every GPU, ordered by index, with their age; GPUs
+        without a line within the stall limit are left out as stale.
+        """
+        now = time.monotonic()
+        limit = self.stall_limit()
+        with self._lock:
+            gpus = [dict(g) for _, g in sorted(self._gpus.items()) if now - g["_time"] <= limit]
+        for gpu in gpus:
+            gpu["age_seconds"] = round(now - gpu.pop("_time"), 2)
+            gpu["energy_j"] = round(gpu["energy_j"], 1)
+        return gpus
+
+    def collect(self) -> Optional[Dict[str, Any]]:
+        """
+        Latest GPU section.
+
+        Returns:
+            The legacy fields (name, memory, temperature, utilization) for
+            the first GPU plus "devices" for all GPUs, or None before the
+            first line arrived or while every value is stale
+        """
+        self.start()
+        devices = self.devices()
+        if not devices:
+            return None
+        first = devices[0]
+
+        def fmt(value: Optional[float], unit: str) -> str:
+            return "N/A" if value is None else f"{value:g}{unit}"
+
+        return {
+            "name": first["name"],
+            "memory": fmt(first["memory_total_mib"], " MB"),
+            "temperature": fmt(first["temperature_c"], "°C"),
+            "utilization": fmt(first["utilization_percent"], "%"),
+            "devices": devices,
+        }
@@ -0,0 +1,232 @@
+"""
+Native memory and pressure collector.
+
+Reads /proc/meminfo once per sample into a full set of byte counts (swap,
+cache, buffers, dirty, writeback, slab, hugepages) instead of running a
+grep | awk pipeline per field. Adds Pressure Stall Information from
+/proc/pressure/{cpu,memory,io} and paging/OOM counters from /proc/vmstat
+with per-second rates.
+
+PSI needs Linux 4.20+ with CONFIG_PSI (and psi=1 on some distributions);
+when /proc/pressure is missing the pressure section is reported as
+unavailable and everything else still works.
+"""
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from state import counters_monotonic
+
+logger = logging.getLogger(__name__)
+
+PROC_MEMINFO = Path("/proc/meminfo")
+PROC_VMSTAT = Path("/proc/vmstat")
+PROC_PRESSURE = Path("/proc/pressure")
+
+GIB = 1024 ** 3
+
+# /proc/meminfo keys published in the snapshot, mapped to output names
+MEMINFO_FIELDS = {
+    "MemTotal": "total",
+    "MemFree": "free",
+    "MemAvailable": "available",
+    "Buffers": "buffers",
+    "Cached": "cached",
+    "SwapCached": "swap_cached",
+    "Active": "active",
+    "Inactive": "inactive",
+    "SwapTotal": "swap_total",
+    "SwapFree": "swap_free",
+    "Dirty": "dirty",
+    "Writeback": "writeback",
+    "AnonPages": "anon",
+    "Mapped": "mapped",
+    "Shmem": "shmem",
+    "Slab": "slab",
+    "SReclaimable": "slab_reclaimable",
+    "SUnreclaim": "slab_unreclaimable",
+    "PageTables": "page_tables",
+    "CommitLimit": "commit_limit",
+    "Committed_AS": "committed",
+    "HugePages_Total": "hugepages_total",
+    "HugePages_Free": "hugepages_free",
+    "Hugepagesize": "hugepage_size",
+}
+
+# Unit-less meminfo fields (page counts, not kB)
+MEMINFO_COUNTS = {"HugePages_Total", "HugePages_Free", "HugePages_Rsvd", "HugePages_Surp"}
+
+# Cumulative /proc/vmstat counters reported with rates
+VMSTAT_FIELDS = (
+    "pgpgin",
+    "pgpgout",
+    "pswpin",
+    "pswpout",
+    "pgfault",
+    "pgmajfault",
+    "pgscan_kswapd",
+    "pgscan_direct",
+    "pgsteal_kswapd",
+    "pgsteal_direct",
+    "oom_kill",
+)
+
+PSI_RESOURCES = ("cpu", "memory", "io")
+
+
+def parse_meminfo(text: str) -> Dict[str, int]:
+    """
+    Parse /proc/meminfo content.
+
+    Returns:
+        Mapping of meminfo key to bytes (page counts for HugePages_*)
+    """
+    values: Dict[str, int] = {}
+    for line in text.splitlines():
+        key, sep, rest = line.partition(":")
+        if not sep:
+            continue
+        parts = rest.split()
+        if not parts:
+            continue
+        value = int(parts[0])
+        if key not in MEMINFO_COUNTS:
+            value *= 1024
+        values[key] = value
+    return values
+
+
+def parse_pressure(text: str) -> Dict[str, Dict[str, float]]:
+    """
+    Parse one /proc/pressure/<resource> file.
+
+    Returns:
+        {"some": {"avg10", "avg60", "avg300", "total"}, "full": {...}};
+        "total" is cumulative stall time in microseconds
+    """
+    result: Dict[str, Dict[str, float]] = {}
+    for line in text.splitlines():
+        kind, _, rest = line.partition(" ")
+        entry: Dict[str, float] = {}
+        for item in rest.split():
+            name, _, value = item.partition("=")
+            entry[name] = int(value) if name == "total" else float(value)
+        result[kind] = entry
+    return result
+
+
+class MemoryCollector:
+    """
+    Memory usage, pressure stall information and paging counters.
+
+    Keeps the previous vmstat counters to compute rates.
+    """
+
+    def __init__(
+        self,
+        meminfo_path: Path = PROC_MEMINFO,
+        vmstat_path: Path = PROC_VMSTAT,
+        pressure_dir: Path = PROC_PRESSURE,
+    ):
+        self.meminfo_path = Path(meminfo_path)
+        self.vmstat_path = Path(vmstat_path)
+        self.pressure_dir = Path(pressure_dir)
+
+        self._prev_time: Optional[float] = None
+        self._prev_vmstat: Dict[str, int] = {}
+
+    def available(self) -> bool:
+        """True if /proc/meminfo can be read on this host."""
+        return self.meminfo_path.exists()
+
+    def read_vmstat(self) -> Dict[str, int]:
+        """Read the tracked cumulative counters from /proc/vmstat."""
+        wanted = set(VMSTAT_FIELDS)
+        counters: Dict[str, int] = {}
+        try:
+            with open(self.vmstat_path, "r") as f:
+                for line in f:
+                    name, _, value = line.partition(" ")
+                    if name in wanted:
+                        counters[name] = int(value)
+        except OSError:
+            pass
+        return counters
+
+    def read_pressure(self) -> Optional[Dict[str, Any]]:
+        """
+        Read PSI for cpu, memory and io.
+
+        Returns:
+            Mapping of resource to parsed PSI, or None if the kernel has no PSI
+        """
+        if not self.pressure_dir.is_dir():
+            return None
+
+        pressure: Dict[str, Any] = {}
+        for resource in PSI_RESOURCES:
+            try:
+                pressure[resource] = parse_pressure((self.pressure_dir / resource).read_text())
+            except OSError:
+                # Present but disabled (psi=0) reads fail with EOPNOTSUPP
+                continue
+        return pressure or None
+
+    def collect(self) -> Dict[str, Any]:
+        """
+        Sample memory, pressure and vmstat.
+
+        Returns:
+            Dictionary with the legacy GB fields (total_gb, used_gb, free_gb,
+            percent), available_gb, "detail" (bytes) and "vmstat" (counters
+            and per-second rates). PSI is read separately by read_pressure().
+        """
+        now = time.monotonic()
+        meminfo = parse_meminfo(self.meminfo_path.read_text())
+
+        total = meminfo.get("MemTotal", 0)
+        free = meminfo.get("MemFree", 0)
+        # MemAvailable appeared in 3.14; approximate it on older kernels
+        available = meminfo.get(
+            "MemAvailable",
+            free + meminfo.get("Buffers", 0) + meminfo.get("Cached", 0),
+        )
+        used = max(total - available, 0)
+
+        detail = {name: meminfo[key] for key, name in MEMINFO_FIELDS.items() if key in meminfo}
+        detail["used"] = used
+        detail["swap_used"] = max(meminfo.get("SwapTotal", 0) - meminfo.get("SwapFree", 0), 0)
+
+        vmstat = self.read_vmstat()
+        rates: Dict[str, float] = {}
+        if self._prev_time is not None and now - self._prev_time > 0.1:
+            elapsed = now - self._prev_time
+            for name, value in vmstat.items():
+                prev = self._prev_vmstat.get(name)
+                if prev is not None:
+                    rates[name] = round(max(value - prev, 0) / elapsed, 2)
+        self._prev_time = now
+        self._prev_vmstat = vmstat
+
+        return {
+            "total_gb": round(total / GIB, 2),
+            "used_gb": round(used / GIB, 2),
+            "free_gb": round(free / GIB, 2),
+            "available_gb": round(available / GIB, 2),
+            "percent": round(used * 100 / total, 2) if total else 0.0,
+            "detail": detail,
+            "vmstat": {"counters": vmstat, "rates": rates},
+        }
+
+    def export_state(self) -> Dict[str, Any]:
+        """Counter state for the warm-start checkpoint."""
+        return {"time": self._prev_time, "vmstat": self._prev_vmstat}
+
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        """Restore vmstat counters unless any of them went backwards."""
+        saved = state.get("vmstat") or {}
+        if not counters_monotonic(saved, self.read_vmstat()):
+            return
+        self._prev_vmstat = saved
+        self._prev_time = state.get("time")
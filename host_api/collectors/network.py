@@ -0,0 +1,249 @@
+"""
+Native network interface collector.
+
+Parses /proc/net/dev in a single pass instead of forking sed/cut/awk per
+interface. Interfaces are filtered by include/exclude globs before any of
+their counters are split, so hosts with hundreds of veth/docker interfaces
+pay only a dictionary lookup for each of them. Link type (wifi vs lan) is
+taken from /sys/class/net/<if>/wireless and /sys/class/net/<if>/type rather
+than guessed from the interface name.
+"""
+import fnmatch
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+PROC_NET_DEV = Path("/proc/net/dev")
+SYS_CLASS_NET = Path("/sys/class/net")
+
+# Virtual and container interfaces that would double-count host traffic
+DEFAULT_EXCLUDE = ("lo", "veth*", "docker*", "br-*", "virbr*", "cni*", "flannel*", "cali*", "ifb*")
+
+# Upper bound on remembered interface names before the caches are rebuilt
+MAX_CACHED_NAMES = 4096
+
+# ARPHRD_* values from include/uapi/linux/if_arp.h
+ARPHRD_LOOPBACK = 772
+ARPHRD_IEEE80211 = 801
+ARPHRD_IEEE80211_RADIOTAP = 803
+
+# Column order of the 16 counters following "iface:" in /proc/net/dev
+RX_BYTES, RX_PACKETS, RX_ERRORS, RX_DROPS = 0, 1, 2, 3
+TX_BYTES, TX_PACKETS, TX_ERRORS, TX_DROPS = 8, 9, 10, 11
+
+COUNTER_FIELDS = (
+    ("rx_bytes", RX_BYTES),
+    ("rx_packets", RX_PACKETS),
+    ("rx_errors", RX_ERRORS),
+    ("rx_drops", RX_DROPS),
+    ("tx_bytes", TX_BYTES),
+    ("tx_packets", TX_PACKETS),
+    ("tx_errors", TX_ERRORS),
+    ("tx_drops", TX_DROPS),
+)
+
+
+def format_speed(bytes_per_sec: float) -> str:
+    """Format a byte rate the same way system_monitor.sh does."""
+    if bytes_per_sec < 1024:
+        return f"{bytes_per_sec:.0f} B/s"
+    if bytes_per_sec < 1048576:
+        return f"{bytes_per_sec / 1024:.2f} KB/s"
+    return f"{bytes_per_sec / 1048576:.2f} MB/s"
+
+
+def build_network_section(stats: Dict[str, Any], tcp: int) -> Dict[str, Any]:
+    """
+    Shape collector output like the "network" section of collect_metrics.sh.
+
+    Args:
+        stats: Output of NetworkCollector.collect()
+        tcp: TCP connection count
+
+    Returns:
+        Dictionary with the legacy "data" display string and "stats"
+    """
+    lan, wifi = stats["lan"], stats["wifi"]
+    data = (
+        f"  LAN: ↓ {format_speed(lan['rx'])} ↑ {format_speed(lan['tx'])}"
+        f" | WiFi: ↓ {format_speed(wifi['rx'])} ↑ {format_speed(wifi['tx'])}"
+        f" | TCP: {tcp}"
+    )
+    return {"data": data, "stats": {**stats, "tcp": tcp}}
+
+
+def parse_globs(value: str) -> List[str]:
+    """Split a comma-separated glob list from the environment."""
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+
+class NetworkCollector:
+    """
+    Per-interface byte/packet/error/drop counters and rates.
+
+    Keeps the previous counters in memory (and in the warm-start checkpoint)
+    so rates are available from the first call after a restart.
+    """
+
+    def __init__(
+        self,
+        include: Sequence[str] = ("*",),
+        exclude: Sequence[str] = DEFAULT_EXCLUDE,
+        proc_path: Path = PROC_NET_DEV,
+        sys_class_net: Path = SYS_CLASS_NET,
+    ):
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+        self.proc_path = Path(proc_path)
+        self.sys_class_net = Path(sys_class_net)
+
+        # Filter decisions and link types are cached per interface name
+        self._wanted: Dict[str, bool] = {}
+        self._link_types: Dict[str, str] = {}
+
+        self._prev_time: Optional[float] = None
+        self._prev: Dict[str, List[int]] = {}
+
+    def available(self) -> bool:
+        """True if /proc/net/dev can be read on this host."""
+        return self.proc_path.exists()
+
+    def _is_wanted(self, name: str) -> bool:
+        wanted = self._wanted.get(name)
+        if wanted is None:
+            wanted = (
+                any(fnmatch.fnmatchcase(name, pattern) for pattern in self.include)
+                and not any(fnmatch.fnmatchcase(name, pattern) for pattern in self.exclude)
+            )
+            self._wanted[name] = wanted
+        return wanted
+
+    def _link_type(self, name: str) -> str:
+        link = self._link_types.get(name)
+        if link is not None:
+            return link
+
+        iface_dir = self.sys_class_net / name
+        link = "lan"
+        if (iface_dir / "wireless").exists() or (iface_dir / "phy80211").exists():
+            link = "wifi"
+        else:
+            try:
+                arphrd = int((iface_dir / "type").read_text().strip())
+                if arphrd in (ARPHRD_IEEE80211, ARPHRD_IEEE80211_RADIOTAP):
+                    link = "wifi"
+                elif arphrd == ARPHRD_LOOPBACK:
+                    link = "loopback"
+            except (OSError, ValueError):
+                pass
+
+        self._link_types[name] = link
+        return link
+
+    def read_counters(self) -> Dict[str, List[int]]:
+        """
+        Read cumulative counters for every wanted interface in one pass.
+
+        Returns:
+            Mapping of interface name to the 16 /proc/net/dev counters
+        """
+        counters: Dict[str, List[int]] = {}
+        with open(self.proc_path, "r") as f:
+            # Two header lines
+            next(f, None)
+            next(f, None)
+            for line in f:
+                name, sep, rest = line.partition(":")
+                if not sep:
+                    continue
+                name = name.strip()
+                if not self._is_wanted(name):
+                    continue
+                counters[name] = [int(v) for v in rest.split()]
+        return counters
+
+    def collect(self) -> Dict[str, Any]:
+        """
+        Sample interface counters and compute rates since the previous sample.
+
+        Returns:
+            Dictionary with "lan" and "wifi" rx/tx rollups (bytes/s) and an
+            "interfaces" list with counters and per-interface rates
+        """
+        now = time.monotonic()
+        counters = self.read_counters()
+
+        elapsed = None
+        if self._prev_time is not None and now - self._prev_time > 0.1:
+            elapsed = now - self._prev_time
+
+        rollup = {"lan": {"rx": 0.0, "tx": 0.0}, "wifi": {"rx": 0.0, "tx": 0.0}}
+        interfaces: List[Dict[str, Any]] = []
+
+        for name, values in counters.items():
+            link = self._link_type(name)
+            entry: Dict[str, Any] = {"name": name, "link": link}
+            for field, index in COUNTER_FIELDS:
+                entry[field] = values[index]
+
+            rx_rate = tx_rate = 0.0
+            prev = self._prev.get(name)
+            if elapsed is not None and prev is not None:
+                # Negative deltas mean the counter was reset; report 0
+                rx_rate = max(values[RX_BYTES] - prev[RX_BYTES], 0) / elapsed
+                tx_rate = max(values[TX_BYTES] - prev[TX_BYTES], 0) / elapsed
+            entry["rx_rate"] = round(rx_rate)
+            entry["tx_rate"] = round(tx_rate)
+            interfaces.append(entry)
+
+            bucket = rollup.get(link)
+            if bucket is not None:
+                bucket["rx"] += rx_rate
+                bucket["tx"] += tx_rate
+
+        # Container churn creates endless new veth names; bound the caches
+        if len(self._wanted) > MAX_CACHED_NAMES:
+            self._wanted.clear()
+            self._link_types = {n: t for n, t in self._link_types.items() if n in counters}
+
+        self._prev = counters
+        self._prev_time = now
+
+        for bucket in rollup.values():
+            bucket["rx"] = round(bucket["rx"])
+            bucket["tx"] = round(bucket["tx"])
+
+        return {
+            "lan": rollup["lan"],
+            "wifi": rollup["wifi"],
+            "interfaces": interfaces,
+        }
+
+    def export_state(self) -> Dict[str, Any]:
+        """Counter state for the warm-start checkpoint."""
+        return {"time": self._prev_time, "counters": self._prev}
+
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        """
+        Restore counters from a checkpoint written during this boot.
+
+        time.monotonic() is CLOCK_MONOTONIC on Linux, which keeps counting
+        across process restarts within one boot, so the saved timestamp
+        stays comparable. Counters that went backwards are dropped.
+        """
+        saved = state.get("counters") or {}
+        try:
+            current = self.read_counters()
+        except OSError:
+            return
+
+        self._prev = {
+            name: values
+            for name, values in saved.items()
+            if name in current and current[name][RX_BYTES] >= values[RX_BYTES]
+            and current[name][TX_BYTES] >= values[TX_BYTES]
+        }
+        self._prev_time = state.get("time") if self._prev else None
@@ -0,0 +1,186 @@
+"""
+Native per-process table from /proc/<pid>/stat.
+
+`ps` reports CPU as an average over each process's lifetime, so a process
+that just started spinning barely shows. This table keeps the previous
+utime+stime of every pid and reports CPU % over the interval since the
+previous scan (100 = one full core), plus resident memory, in one pass
+over /proc with a single read per process. User names are resolved from
+the owner of /proc/<pid> and cached per uid.
+
+CommandUsage sums the same scan per command name: CPU seconds used since
+the previous scan and resident memory. That feeds the backend's heavy-hitter
+leaderboard, which then never sees pids, so pid churn does not matter.
+"""
+import logging
+import os
+import pwd
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROC = Path("/proc")
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+# Fields of /proc/<pid>/stat after "(comm)", counted from state = 0
+UTIME, STIME, CUTIME, CSTIME, RSS = 11, 12, 13, 14, 21
+
+
+def parse_stat(raw: bytes) -> Optional[Tuple[str, int, int]]:
+    """
+    (comm, utime+stime ticks, rss pages) from /proc/<pid>/stat.
+
+    comm may contain spaces and parentheses, so it is taken up to the last ")".
+    """
+    start = raw.find(b"(")
+    end = raw.rfind(b")")
+    if start < 0 or end < 0:
+        return None
+    fields = raw[end + 2:].split()
+    if len(fields) <= RSS:
+        return None
+    comm = raw[start + 1:end].decode("utf-8", "replace")
+    return comm, int(fields[UTIME]) + int(fields[STIME]), int(fields[RSS])
+
+
+class ProcessTable:
+    """
+    CPU % (over the interval between scans) and RSS of every process.
+
+    Args:
+        proc: Path of /proc
+    """
+
+    def __init__(self, proc: Path = PROC):
+        self.proc = Path(proc)
+        self._users: Dict[int, str] = {}
+        self._prev: Dict[int, int] = {}
+        self._prev_time: Optional[float] = None
+        # Seconds covered by the latest scan (None on the first)
+        self.elapsed: Optional[float] = None
+
+    def available(self) -> bool:
+        return (self.proc / "self" / "stat").exists()
+
+    def _user(self, uid: int) -> str:
+        name = self._users.get(uid)
+        if name is None:
+            try:
+                name = pwd.getpwuid(uid).pw_name
+            except KeyError:
+                name = str(uid)
+            self._users[uid] = name
+        return name
+
+    def scan(self) -> List[Dict[str, Any]]:
+        """
+        Read every process once.
+
+        Returns:
+            [{pid, user, command, cpu_percent, cpu_seconds, rss_bytes}] in
+            /proc order; cpu_percent is 0.0 for pids not seen by the previous
+            scan, while cpu_seconds counts their whole CPU time (they started
+            after it)
+        """
+        now = time.monotonic()
+        elapsed = None
+        if self._prev_time is not None and now - self._prev_time > 0.05:
+            elapsed = now - self._prev_time
+
+        processes = []
+        ticks_now: Dict[int, int] = {}
+        for entry in os.scandir(self.proc):
+            if not entry.name.isdigit():
+                continue
+            pid = int(entry.name)
+            try:
+                with open(f"{entry.path}/stat", "rb") as f:
+                    parsed = parse_stat(f.read())
+                uid = entry.stat().st_uid
+            except OSError:
+                # Exited between listing and reading
+                continue
+            if parsed is None:
+                continue
+            comm, ticks, rss = parsed
+            ticks_now[pid] = ticks
+            cpu = 0.0
+            used = 0
+            prev = self._prev.get(pid)
+            if elapsed is not None and prev is not None and ticks >= prev:
+                used = ticks - prev
+                cpu = used / CLOCK_TICKS / elapsed * 100
+            elif elapsed is not None and prev is None:
+                used = ticks
+            processes.append({
+                "pid": pid,
+                "user": self._user(uid),
+                "command": comm,
+                "cpu_percent": round(cpu, 1),
+                "cpu_seconds": used / CLOCK_TICKS,
+                "rss_bytes": rss * PAGE_SIZE,
+            })
+
+        self._prev = ticks_now
+        self._prev_time = now
+        self.elapsed = elapsed
+        return processes
+
+    def top(self, limit: int, key: str = "cpu_percent") -> List[Dict[str, Any]]:
+        """Scan and return the `limit` processes with the highest `key`."""
+        processes = self.scan()
+        processes.sort(key=lambda p: (p[key], p["rss_bytes"]), reverse=True)
+        return processes[:limit]
+
+
+class CommandUsage:
+    """
+    CPU seconds and RSS per command name between samples.
+
+    Args:
+        proc: Path of /proc
+        limit: Commands reported per sample (most CPU first, then most RSS)
+    """
+
+    def __init__(self, proc: Path = PROC, limit: int = 25):
+        self.table = ProcessTable(proc)
+        self.limit = limit
+        self._sample = 0
+
+    def available(self) -> bool:
+        return self.table.available()
+
+    def collect(self) -> Dict[str, Any]:
+        """
+        Returns:
+            {"sample", "interval_s", "commands": [{command, cpu_seconds,
+            rss_bytes, processes}]}; "sample" increases by one per scan so
+            a consumer can skip a section it has already counted
+        """
+        commands: Dict[str, Dict[str, Any]] = {}
+        for p in self.table.scan():
+            entry = commands.get(p["command"])
+            if entry is None:
+                entry = commands[p["command"]] = {"command": p["command"], "cpu_seconds": 0.0, "rss_bytes": 0, "processes": 0}
+            entry["cpu_seconds"] += p["cpu_seconds"]
+            entry["rss_bytes"] += p["rss_bytes"]
+            entry["processes"] += 1
+        ranked = sorted(commands.values(), key=lambda c: (c["cpu_seconds"], c["rss_bytes"]), reverse=True)
+        # Idle commands only make the list through their memory
+        busy = [c for c in ranked if c["cpu_seconds"] > 0][:self.limit]
+        names = {c["command"] for c in busy}
+        by_rss = sorted((c for c in ranked if c["command"] not in names), key=lambda c: c["rss_bytes"], reverse=True)
+        selected = busy + by_rss[:self.limit - len(busy)]
+        for c in selected:
+            c["cpu_seconds"] = round(c["cpu_seconds"], 2)
+        self._sample += 1
+        elapsed = self.table.elapsed
+        return {
+            "sample": self._sample,
+            "interval_s": None if elapsed is None else round(elapsed, 3),
+            "commands": selected,
+        }
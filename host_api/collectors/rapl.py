@@ -0,0 +1,178 @@
+"""
+RAPL energy collector (powercap sysfs).
+
+Intel and AMD CPUs expose Running Average Power Limit energy counters under
+/sys/class/powercap/intel-rapl:<package>[:<subzone>]: package, core,
+uncore and dram domains, each a cumulative `energy_uj` counter that wraps
+at `max_energy_range_uj`. Watts are the counter delta over the elapsed
+time between two samples.
+
+Zones are discovered once; their energy_uj files stay open and are re-read
+with pread() on every sample instead of re-globbing the tree. If a read
+fails (CPU hot-unplug, driver reload) the zones are discovered again on a
+later sample.
+
+VMs, containers without /sys/class/powercap and WSL have no RAPL zones, and
+kernels since 5.10 restrict energy_uj to root (CVE-2020-8694). In these
+cases the section reports {"available": false, "reason": ...} instead of
+failing.
+"""
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+POWERCAP = Path("/sys/class/powercap")
+
+# Zones are looked for again this long after discovery found nothing usable
+REDISCOVER_SECONDS = 300.0
+
+READ_SIZE = 32
+
+
+class _Zone:
+    """One RAPL domain with its open energy_uj descriptor."""
+
+    def __init__(self, zone: str, name: str, package: str, max_range: int, fd: int):
+        self.zone = zone
+        self.name = name
+        self.package = package
+        self.max_range = max_range
+        self.fd = fd
+
+    def read(self) -> int:
+        return int(os.pread(self.fd, READ_SIZE, 0))
+
+
+class RaplCollector:
+    """
+    Per-domain power (W) and energy per interval (J) from RAPL counters.
+
+    Args:
+        root: Path of /sys/class/powercap
+    """
+
+    def __init__(self, root: Path = POWERCAP):
+        self.root = Path(root)
+        self._zones: List[_Zone] = []
+        self._reason: Optional[str] = None
+        self._discovered_at: Optional[float] = None
+
+        self._prev_time: Optional[float] = None
+        self._prev: Dict[str, int] = {}
+
+    def _close(self) -> None:
+        for zone in self._zones:
+            try:
+                os.close(zone.fd)
+            except OSError:
+                pass
+        self._zones = []
+
+    def _discover(self) -> None:
+        self._close()
+        self._discovered_at = time.monotonic()
+        self._prev = {}
+        self._prev_time = None
+
+        paths = sorted(self.root.glob("intel-rapl:*")) if self.root.is_dir() else []
+        if not paths:
+            self._reason = "No RAPL zones (virtual machine, WSL or unsupported CPU)"
+            return
+
+        denied = False
+        names: Dict[str, str] = {}
+        for path in paths:
+            try:
+                name = (path / "name").read_text().strip()
+                max_range = int((path / "max_energy_range_uj").read_text())
+                fd = os.open(path / "energy_uj", os.O_RDONLY)
+            except PermissionError:
+                denied = True
+                continue
+            except (OSError, ValueError):
+                continue
+            zone = path.name
+            names[zone] = name
+            # intel-rapl:0:1 belongs to package zone intel-rapl:0
+            package = names.get(":".join(zone.split(":")[:2]), name)
+            self._zones.append(_Zone(zone, name, package, max_range, fd))
+
+        if self._zones:
+            self._reason = None
+        elif denied:
+            self._reason = "RAPL energy counters are readable by root only"
+        else:
+            self._reason = "RAPL zones present but unreadable"
+        if self._reason:
+            logger.info(f"RAPL power unavailable: {self._reason}")
+
+    def read_counters(self) -> Dict[str, int]:
+        """Current energy_uj of every open zone."""
+        if self._discovered_at is None or (
+            not self._zones and time.monotonic() - self._discovered_at > REDISCOVER_SECONDS
+        ):
+            self._discover()
+        counters = {}
+        try:
+            for zone in self._zones:
+                counters[zone.zone] = zone.read()
+        except (OSError, ValueError) as e:
+            logger.warning(f"RAPL read failed, rediscovering zones: {e}")
+            self._discover()
+            return {}
+        return counters
+
+    def collect(self) -> Dict[str, Any]:
+        """
+        Sample the energy counters and compute power since the previous sample.
+
+        Returns:
+            {"available": True, "interval_s", "package_w", "domains": [...]}
+            with power_w/energy_j per domain (None on the first sample), or
+            {"available": False, "reason": ...}
+        """
+        now = time.monotonic()
+        counters = self.read_counters()
+        if not self._zones:
+            return {"available": False, "reason": self._reason}
+
+        elapsed = None
+        if self._prev_time is not None and now - self._prev_time > 0.1:
+            elapsed = now - self._prev_time
+
+        domains = []
+        package_w: Optional[float] = None
+        for zone in self._zones:
+            value = counters.get(zone.zone)
+            prev = self._prev.get(zone.zone)
+            power = energy = None
+            if elapsed is not None and value is not None and prev is not None:
+                delta = value - prev
+                if delta < 0:
+                    # Wrapped at max_energy_range_uj (about every 20 minutes
+                    # at 200 W); samples are far more frequent than that
+                    delta += zone.max_range + 1
+                energy = delta / 1e6
+                power = energy / elapsed
+                if zone.zone.count(":") == 1 and zone.name.startswith("package"):
+                    package_w = (package_w or 0.0) + power
+            domains.append({
+                "zone": zone.zone,
+                "name": zone.name,
+                "package": zone.package,
+                "power_w": None if power is None else round(power, 2),
+                "energy_j": None if energy is None else round(energy, 3),
+            })
+
+        self._prev = counters
+        self._prev_time = now
+        return {
+            "available": True,
+            "interval_s": None if elapsed is None else round(elapsed, 3),
+            "package_w": None if package_w is None else round(package_w, 2),
+            "domains": domains,
+        }
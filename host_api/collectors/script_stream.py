@@ -0,0 +1,259 @@
+"""
+Supervised `system_monitor.sh --json-stream` child.
+
+For hosts that keep the bash collectors, running collect_metrics.sh per
+request re-sources system_monitor.sh and reloads metrics_state.txt every
+time. In stream mode the script runs once as a long-lived child whose tick
+loop prints one JSON object per line and keeps CPU/network delta state in
+memory. A reader thread parses the lines as they arrive, so a sample only
+copies the latest document and never waits on bash.
+
+The child is restarted with exponential backoff if it exits, and killed
+and restarted if it stops producing lines (a hung collector inside the
+tick loop). Meanwhile the last tick keeps being served, reported as stale
+by status(), until the new child prints one.
+
+The tick interval can be changed while the child runs: set_interval()
+rewrites the file named by STREAM_INTERVAL_FILE, which the script reads
+before every sleep, and signals SIGUSR1 when the interval gets shorter so
+the current sleep ends early. The host API drives it from the adaptive
+interval of the script.stream collector, so backing off and the overhead
+governor slow the child itself down.
+"""
+import glob
+import json
+import logging
+import os
+import signal
+import subprocess
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MAX_RESTART_BACKOFF_SECONDS = 60.0
+
+# Per-process files of the script's background jobs (see main() in
+# system_monitor.sh); removed by its TERM trap, or here if it was killed
+STREAM_TMP_GLOB = "/tmp/sysmon_stream_{pid}_*"
+
+
+class ScriptStream:
+    """
+    Persistent system_monitor.sh child with the latest tick.
+
+    Args:
+        argv: Command line starting the script in --json-stream mode
+        cwd: Working directory of the child
+        env: Extra environment variables (NATIVE_COLLECTORS, ...)
+        interval_seconds: Tick interval passed as STREAM_INTERVAL_SECONDS
+        stall_seconds: Restart the child if no line arrives for this long
+            (at least twice the tick interval is always allowed)
+        interval_file: File the child re-reads its tick interval from
+            (STREAM_INTERVAL_FILE); None fixes the interval at start
+    """
+
+    def __init__(
+        self,
+        argv: List[str],
+        cwd: str,
+        env: Optional[Dict[str, str]] = None,
+        interval_seconds: float = 1.0,
+        stall_seconds: float = 60.0,
+        interval_file: Optional[str] = None,
+    ):
+        self.argv = list(argv)
+        self.cwd = cwd
+        self.env = dict(env or {})
+        self.interval_seconds = interval_seconds
+        self.stall_seconds = stall_seconds
+        self.interval_file = interval_file
+
+        self._latest: Optional[Dict[str, Any]] = None
+        self._updated = 0.0
+        self._lock = threading.Lock()
+        self._first = threading.Event()
+        # The current child printed a tick (its USR1 trap is installed)
+        self._child_ticked = False
+        self._proc: Optional[subprocess.Popen] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.restarts = 0
+
+    def start(self) -> None:
+        """Start the supervisor thread (idempotent)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._supervise, name="script-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the child and the supervisor."""
+        self._stop.set()
+        self._terminate()
+
+    def _terminate(self) -> None:
+        # The script's background jobs (df, smartctl, ...) share its process
+        # group and stdout; signal them all so the pipe closes
+        proc = self._proc
+        if proc and proc.poll() is None:
+            self._signal(proc, signal.SIGTERM)
+            try:
+                proc.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self._signal(proc, signal.SIGKILL if os.name == "posix" else signal.SIGTERM)
+
+    @staticmethod
+    def _signal(proc: subprocess.Popen, sig: int) -> None:
+        try:
+            if os.name == "posix":
+                os.killpg(proc.pid, sig)
+            else:
+                proc.terminate()
+        except OSError:
+            pass
+
+    def _write_interval(self) -> None:
+        path = self.interval_file
+        tmp_path = f"{path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(tmp_path, "w") as f:
+                f.write(f"{self.interval_seconds:g}\n")
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Cannot write stream interval file {path}: {e}")
+
+    def set_interval(self, seconds: float) -> None:
+        """Change the tick interval of the running child (and of later restarts)."""
+        if self.interval_file is None or abs(seconds - self.interval_seconds) < 1e-3:
+            return
+        shorter = seconds < self.interval_seconds
+        self.interval_seconds = seconds
+        self._write_interval()
+        proc = self._proc
+        # The script installs its USR1 trap before the first tick; until
+        # then the signal would kill it
+        if shorter and os.name == "posix" and proc and proc.poll() is None and self._child_ticked:
+            try:
+                os.kill(proc.pid, signal.SIGUSR1)
+            except OSError:
+                pass
+
+    def _supervise(self) -> None:
+        backoff = 1.0
+        watchdog = threading.Thread(target=self._watch, name="script-stream-watchdog", daemon=True)
+        watchdog.start()
+        while not self._stop.is_set():
+            started = time.monotonic()
+            env = {**os.environ, **self.env, "STREAM_INTERVAL_SECONDS": f"{self.interval_seconds:g}"}
+            if self.interval_file is not None:
+                self._write_interval()
+                # Relative to the working directory, so it also resolves under WSL
+                env["STREAM_INTERVAL_FILE"] = os.path.relpath(self.interval_file, self.cwd)
+            self._child_ticked = False
+            try:
+                self._proc = subprocess.Popen(
+                    self.argv,
+                    cwd=self.cwd,
+                    env=env,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    encoding="utf-8",
+                    errors="replace",
+                    bufsize=1,
+                    start_new_session=os.name == "posix",
+                )
+            except OSError as e:
+                logger.warning(f"Cannot start script stream {self.argv}: {e}")
+            else:
+                with self._lock:
+                    self._updated = time.monotonic()
+                for line in self._proc.stdout:
+                    self._handle_line(line)
+                code = self._proc.wait()
+                for path in glob.glob(STREAM_TMP_GLOB.format(pid=self._proc.pid)):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                if self._stop.is_set():
+                    return
+                logger.warning(f"Script stream exited with code {code}, restarting")
+
+            self.restarts += 1
+            if time.monotonic() - started > MAX_RESTART_BACKOFF_SECONDS:
+                backoff = 1.0
+            self._stop.wait(backoff)
+            backoff = min(backoff * 2, MAX_RESTART_BACKOFF_SECONDS)
+
+    def _watch(self) -> None:
+        """Kill a child that stopped producing lines; the supervisor restarts it."""
+        while not self._stop.wait(min(self.stall_seconds / 4, 5.0)):
+            proc = self._proc
+            with self._lock:
+                silent = time.monotonic() - self._updated
+            # A stretched tick interval is not a stall
+            if proc and proc.poll() is None and silent > max(self.stall_seconds, 2 * self.interval_seconds):
+                logger.warning(f"Script stream silent for {silent:.0f}s, restarting")
+                self._terminate()
+
+    def _handle_line(self, line: str) -> None:
+        line = line.strip()
+        if not line:
+            return
+        try:
+            doc = json.loads(line)
+        except json.JSONDecodeError as e:
+            logger.debug(f"Skipping malformed stream line: {e}")
+            return
+        if not isinstance(doc, dict):
+            return
+        with self._lock:
+            self._latest = doc
+            self._updated = time.monotonic()
+        self._child_ticked = True
+        self._first.set()
+
+    def pid(self) -> Optional[int]:
+        """Pid of the running child, None while it is down."""
+        proc = self._proc
+        return proc.pid if proc is not None and proc.poll() is None else None
+
+    def status(self) -> Dict[str, Any]:
+        """
+        {"running", "age_s" (since the last tick, None before the first),
+        "stale" (the child is not running or is overdue), "restarts"}
+        """
+        proc = self._proc
+        running = proc is not None and proc.poll() is None
+        with self._lock:
+            age = time.monotonic() - self._updated if self._latest is not None else None
+        overdue = age is not None and age > max(self.stall_seconds, 2 * self.interval_seconds)
+        return {
+            "running": running,
+            "age_s": None if age is None else round(age, 1),
+            "stale": not running or overdue,
+            "restarts": self.restarts,
+        }
+
+    def latest(self, wait_seconds: float = 0.0) -> Dict[str, Any]:
+        """
+        The most recent tick, also while the child is being restarted.
+
+        Args:
+            wait_seconds: How long to wait for the first tick after a start
+
+        Raises:
+            RuntimeError: If the child has not produced a tick (yet)
+        """
+        self.start()
+        if wait_seconds:
+            self._first.wait(wait_seconds)
+        with self._lock:
+            doc = self._latest
+        if doc is None:
+            raise RuntimeError("Script stream has not produced a tick yet")
+        return doc
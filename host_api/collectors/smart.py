@@ -0,0 +1,245 @@
+"""
+SMART health collector for every drive.
+
+Discovers physical block devices from /sys/block and runs
+`smartctl -j -H -A <device>` for all of them concurrently on a bounded
+thread pool, each with its own timeout, parsing the JSON output instead of
+grepping text. SMART data changes slowly and a sleeping or failing drive
+can take seconds to answer, so results are cached for ttl_seconds and
+refreshed in the background: a sample only waits for smartctl the very
+first time.
+
+The command is configurable (SMARTCTL), so a stand-in script printing
+canned smartctl JSON can replace the real binary.
+"""
+import json
+import logging
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SYS_BLOCK = Path("/sys/block")
+
+# Virtual and removable-media devices without SMART
+SKIP_PREFIXES = ("loop", "ram", "zram", "dm-", "md", "sr", "fd", "nbd", "rbd")
+
+# ATA attribute ids
+ATTR_REALLOCATED = 5
+ATTR_POWER_ON_HOURS = 9
+ATTR_TEMPERATURE = (194, 190)
+# Normalised value counts down from 100 as the SSD wears
+ATTR_WEAR = (177, 231, 233, 202, 169)
+
+# smartctl exit status bits 0-1: command line error / device open failed;
+# the other bits describe the drive and still come with valid JSON
+SMARTCTL_FATAL_BITS = 0x3
+
+
+def discover_devices(sys_block: Path = SYS_BLOCK) -> List[str]:
+    """Physical block devices as /dev paths (partitions are not listed in /sys/block)."""
+    devices = []
+    try:
+        entries = sorted(p.name for p in Path(sys_block).iterdir())
+    except OSError:
+        return devices
+    for name in entries:
+        if name.startswith(SKIP_PREFIXES):
+            continue
+        # Only devices backed by hardware have a device/ link
+        if not (Path(sys_block) / name / "device").exists():
+            continue
+        devices.append(f"/dev/{name}")
+    return devices
+
+
+def _attributes(doc: Dict[str, Any]) -> Dict[int, Dict[str, Any]]:
+    table = (doc.get("ata_smart_attributes") or {}).get("table") or []
+    return {attr.get("id"): attr for attr in table if "id" in attr}
+
+
+def parse_smartctl(device: str, doc: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reduce smartctl JSON to the fields the dashboard uses.
+
+    Returns:
+        {device, model, serial, health ("PASSED"/"FAILED"/"Unknown"),
+        temperature_c, reallocated_sectors, wear_percent (life used),
+        power_on_hours, media_errors, error}
+    """
+    attrs = _attributes(doc)
+    nvme = doc.get("nvme_smart_health_information_log") or {}
+
+    passed = (doc.get("smart_status") or {}).get("passed")
+    health = "Unknown" if passed is None else ("PASSED" if passed else "FAILED")
+
+    temperature = (doc.get("temperature") or {}).get("current")
+    if temperature is None:
+        temperature = nvme.get("temperature")
+    if temperature is None:
+        for attr_id in ATTR_TEMPERATURE:
+            if attr_id in attrs:
+                # Raw value packs min/max in the upper bytes
+                temperature = attrs[attr_id].get("raw", {}).get("value", 0) & 0xFF
+                break
+
+    reallocated = None
+    if ATTR_REALLOCATED in attrs:
+        reallocated = attrs[ATTR_REALLOCATED].get("raw", {}).get("value")
+
+    wear = nvme.get("percentage_used")
+    if wear is None:
+        for attr_id in ATTR_WEAR:
+            if attr_id in attrs and attrs[attr_id].get("value") is not None:
+                wear = max(100 - attrs[attr_id]["value"], 0)
+                break
+
+    hours = (doc.get("power_on_time") or {}).get("hours")
+    if hours is None and ATTR_POWER_ON_HOURS in attrs:
+        hours = attrs[ATTR_POWER_ON_HOURS].get("raw", {}).get("value")
+
+    errors = [
+        m.get("string", "")
+        for m in (doc.get("smartctl") or {}).get("messages") or []
+        if m.get("severity") == "error"
+    ]
+
+    return {
+        "device": device,
+        "model": doc.get("model_name") or doc.get("model_family"),
+        "serial": doc.get("serial_number"),
+        "health": health,
+        "temperature_c": temperature,
+        "reallocated_sectors": reallocated,
+        "wear_percent": wear,
+        "power_on_hours": hours,
+        "media_errors": nvme.get("media_errors"),
+        "error": "; ".join(errors) or None,
+    }
+
+
+class SmartCollector:
+    """
+    Cached, concurrent SMART health for all drives.
+
+    Args:
+        command: smartctl executable (or stand-in); autodetected when empty
+        ttl_seconds: How long results are served before a refresh
+        timeout_seconds: Per-device smartctl timeout
+        max_workers: Concurrent smartctl processes
+        sys_block: Directory listing block devices
+    """
+
+    def __init__(
+        self,
+        command: str = "",
+        ttl_seconds: float = 600.0,
+        timeout_seconds: float = 20.0,
+        max_workers: int = 4,
+        sys_block: Path = SYS_BLOCK,
+    ):
+        self.command = command or shutil.which("smartctl")
+        self.ttl_seconds = ttl_seconds
+        self.timeout_seconds = timeout_seconds
+        self.max_workers = max_workers
+        self.sys_block = Path(sys_block)
+
+        self._devices: Optional[List[Dict[str, Any]]] = None
+        self._updated = 0.0
+        self._refreshing = threading.Lock()
+
+    def available(self) -> bool:
+        """True if a smartctl command was found."""
+        return self.command is not None
+
+    def query(self, device: str) -> Dict[str, Any]:
+        """Run smartctl for one device."""
+        try:
+            result = subprocess.run(
+                [self.command, "-j", "-H", "-A", device],
+                capture_output=True,
+                encoding="utf-8",
+                timeout=self.timeout_seconds,
+            )
+        except subprocess.TimeoutExpired:
+            return {**parse_smartctl(device, {}), "error": f"timed out after {self.timeout_seconds:g}s"}
+        except OSError as e:
+            return {**parse_smartctl(device, {}), "error": str(e)}
+
+        try:
+            doc = json.loads(result.stdout) if result.stdout.strip() else {}
+        except json.JSONDecodeError:
+            doc = {}
+        entry = parse_smartctl(device, doc)
+        if result.returncode & SMARTCTL_FATAL_BITS and not entry["error"]:
+            entry["error"] = (result.stderr or "").strip() or f"smartctl exit status {result.returncode}"
+        return entry
+
+    def refresh(self) -> List[Dict[str, Any]]:
+        """Query every device concurrently and replace the cache."""
+        devices = discover_devices(self.sys_block)
+        if devices:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(devices))) as pool:
+                results = list(pool.map(self.query, devices))
+        else:
+            results = []
+        self._devices = results
+        self._updated = time.monotonic()
+        return results
+
+    def _refresh_in_background(self) -> None:
+        if not self._refreshing.acquire(blocking=False):
+            return
+
+        def run():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"SMART refresh failed: {e}", exc_info=True)
+            finally:
+                self._refreshing.release()
+
+        threading.Thread(target=run, name="smart-refresh", daemon=True).start()
+
+    def collect(self) -> Dict[str, Any]:
+        """
+        Cached SMART results, refreshed in the background once stale.
+
+        Returns:
+            {"devices": [...], "age_seconds"} plus the legacy summary
+            "status" / "health" (worst health across drives)
+        """
+        if self._devices is None:
+            with self._refreshing:
+                if self._devices is None:
+                    self.refresh()
+        elif time.monotonic() - self._updated > self.ttl_seconds:
+            self._refresh_in_background()
+
+        devices = self._devices or []
+        healths = [d["health"] for d in devices]
+        if "FAILED" in healths:
+            health = "FAILED"
+        elif healths and all(h == "PASSED" for h in healths):
+            health = "PASSED"
+        else:
+            health = "Unknown"
+
+        if not devices:
+            status = "No drives found"
+        elif all(d["error"] and "permission" in d["error"].lower() for d in devices):
+            status = "Permission Denied (Root req)"
+        else:
+            status = f"Available ({len(devices)} drive{'s' if len(devices) != 1 else ''})"
+
+        return {
+            "status": status,
+            "health": health,
+            "devices": devices,
+            "age_seconds": round(time.monotonic() - self._updated, 1),
+        }
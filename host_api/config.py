@@ -0,0 +1,103 @@
+"""
+Configuration management for the host metrics API.
+Handles environment variables and default settings.
+"""
+import os
+from pathlib import Path
+
+
+class Settings:
+    """Host API settings loaded from environment variables."""
+
+    # Concurrent collect_metrics.sh invocations per sample and their timeout
+    COLLECTOR_WORKERS: int = int(os.getenv("COLLECTOR_WORKERS", "4"))
+    SCRIPT_TIMEOUT_SECONDS: int = int(os.getenv("SCRIPT_TIMEOUT_SECONDS", "180"))
+
+    # How the bash collectors run: "oneshot" runs collect_metrics.sh per
+    # sample, "stream" keeps one `system_monitor.sh --json-stream` child
+    # emitting a JSON line per tick (its tick interval follows the adaptive
+    # interval of script.stream, starting at SCRIPT_STREAM_INTERVAL_SECONDS)
+    SCRIPT_MODE: str = os.getenv("SCRIPT_MODE", "oneshot").lower()
+    SCRIPT_STREAM_INTERVAL_SECONDS: float = float(os.getenv("SCRIPT_STREAM_INTERVAL_SECONDS", "1"))
+    # A stream child that prints nothing for this long is restarted
+    SCRIPT_STREAM_STALL_SECONDS: float = float(os.getenv("SCRIPT_STREAM_STALL_SECONDS", "60"))
+
+    # Directory holding the bash scripts; data/ lives next to them
+    SCRIPT_DIR: Path = Path(__file__).parent
+    DATA_DIR: Path = Path(os.getenv("HOST_API_DATA_DIR", str(SCRIPT_DIR / "data")))
+
+    # Warm-start checkpoint (counter state and rollups)
+    STATE_FILE: Path = Path(os.getenv("HOST_API_STATE_FILE", str(DATA_DIR / "host_state.json")))
+    CHECKPOINT_INTERVAL_SECONDS: int = int(os.getenv("CHECKPOINT_INTERVAL_SECONDS", "30"))
+    # Checkpoints older than this are not trusted for rate calculations
+    STATE_MAX_AGE_SECONDS: int = int(os.getenv("STATE_MAX_AGE_SECONDS", "3600"))
+
+    # Network interface filters (comma-separated globs, matched on the name)
+    NET_INCLUDE: str = os.getenv("NET_INCLUDE", "*")
+    NET_EXCLUDE: str = os.getenv("NET_EXCLUDE", "lo,veth*,docker*,br-*,virbr*,cni*,flannel*,cali*,ifb*")
+
+    # Block device filters for /proc/diskstats (comma-separated globs)
+    DISK_INCLUDE: str = os.getenv("DISK_INCLUDE", "*")
+    DISK_EXCLUDE: str = os.getenv("DISK_EXCLUDE", "loop*,ram*,zram*")
+
+    # Listening ports ranked by established connections (0 disables)
+    SOCKET_TOP_PORTS: int = int(os.getenv("SOCKET_TOP_PORTS", "5"))
+
+    # cgroup v2 walk: levels below the root to report, forced re-walk interval
+    CGROUP_MAX_DEPTH: int = int(os.getenv("CGROUP_MAX_DEPTH", "4"))
+    CGROUP_RESCAN_SECONDS: int = int(os.getenv("CGROUP_RESCAN_SECONDS", "60"))
+
+    # High-frequency CPU sampler: tick interval, ring buffer size (ticks)
+    # and the usage counted as a burst
+    CPU_SAMPLER_INTERVAL_MS: int = int(os.getenv("CPU_SAMPLER_INTERVAL_MS", "100"))
+    CPU_SAMPLER_CAPACITY: int = int(os.getenv("CPU_SAMPLER_CAPACITY", "2048"))
+    CPU_BURST_THRESHOLD_PERCENT: float = float(os.getenv("CPU_BURST_THRESHOLD_PERCENT", "90"))
+
+    # Streaming nvidia-smi child: command (autodetected when empty, or a
+    # stand-in script emitting the same CSV), its -lms loop interval and the
+    # silence after which a hung child is restarted
+    NVIDIA_SMI: str = os.getenv("NVIDIA_SMI", "")
+    GPU_STREAM_INTERVAL_MS: int = int(os.getenv("GPU_STREAM_INTERVAL_MS", "1000"))
+    GPU_STREAM_STALL_SECONDS: float = float(os.getenv("GPU_STREAM_STALL_SECONDS", "30"))
+
+    # SMART: smartctl command (autodetected when empty, or a stand-in script
+    # emitting smartctl JSON), cache lifetime, per-device timeout, parallelism
+    SMARTCTL: str = os.getenv("SMARTCTL", "")
+    SMART_TTL_SECONDS: int = int(os.getenv("SMART_TTL_SECONDS", "600"))
+    SMART_TIMEOUT_SECONDS: int = int(os.getenv("SMART_TIMEOUT_SECONDS", "20"))
+    SMART_MAX_WORKERS: int = int(os.getenv("SMART_MAX_WORKERS", "4"))
+
+    # Adaptive sampling: each collector group runs between its min and max
+    # interval, backing off while stable and unwatched. Overrides as
+    # "name=min:max,..." (seconds), e.g. "script.disk=10:600,memory=1:5"
+    ADAPTIVE_SAMPLING: bool = os.getenv("ADAPTIVE_SAMPLING", "true").lower() == "true"
+    SAMPLE_INTERVAL_BOUNDS: str = os.getenv("SAMPLE_INTERVAL_BOUNDS", "")
+    # Values within this many percentage points of an alert threshold are
+    # sampled at the minimum interval
+    ALERT_NEAR_MARGIN_PERCENT: float = float(os.getenv("ALERT_NEAR_MARGIN_PERCENT", "5"))
+
+
+    # Incident capture: a sample above these thresholds (percent, 0 disables
+    # a rule) starts a high-resolution capture of window seconds, written to
+    # INCIDENT_DIR; no new capture starts within the cooldown after one ends
+    INCIDENT_CPU_PERCENT: float = float(os.getenv("INCIDENT_CPU_PERCENT", "90"))
+    INCIDENT_MEMORY_PERCENT: float = float(os.getenv("INCIDENT_MEMORY_PERCENT", "90"))
+    INCIDENT_WINDOW_SECONDS: int = int(os.getenv("INCIDENT_WINDOW_SECONDS", "60"))
+    INCIDENT_INTERVAL_MS: int = int(os.getenv("INCIDENT_INTERVAL_MS", "250"))
+    INCIDENT_PROCESS_INTERVAL_MS: int = int(os.getenv("INCIDENT_PROCESS_INTERVAL_MS", "1000"))
+    INCIDENT_TOP_PROCESSES: int = int(os.getenv("INCIDENT_TOP_PROCESSES", "50"))
+    INCIDENT_COOLDOWN_SECONDS: int = int(os.getenv("INCIDENT_COOLDOWN_SECONDS", "300"))
+    INCIDENT_MAX_RECORDS: int = int(os.getenv("INCIDENT_MAX_RECORDS", "100"))
+    INCIDENT_DIR: Path = Path(os.getenv("INCIDENT_DIR", str(DATA_DIR / "incidents")))
+
+    # Monitoring cost budget: average CPU of the host API and its children
+    # (percent of one core, 0 only measures), averaging time constant and
+    # minimum time between interval changes by the governor
+    OVERHEAD_BUDGET_PERCENT: float = float(os.getenv("OVERHEAD_BUDGET_PERCENT", "1"))
+    OVERHEAD_WINDOW_SECONDS: float = float(os.getenv("OVERHEAD_WINDOW_SECONDS", "300"))
+    OVERHEAD_HOLD_SECONDS: float = float(os.getenv("OVERHEAD_HOLD_SECONDS", "60"))
+
+    # Commands per sample in the process_usage section (backend leaderboard)
+    PROCESS_USAGE_COMMANDS: int = int(os.getenv("PROCESS_USAGE_COMMANDS", "25"))
+
+settings = Settings()
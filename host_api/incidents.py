@@ -0,0 +1,296 @@
+"""
+High-resolution incident capture.
+
+Normal sampling runs every few seconds with five processes in the
+snapshot, so by the time anyone looks at a CPU or memory spike its cause
+has usually exited. When a sample crosses an incident threshold, the
+recorder starts a capture thread for a fixed window that samples CPU,
+memory and network every ~250 ms and the top processes (by CPU % over the
+last second, then RSS) every second. The registry is also held at its
+minimum intervals while a capture runs (see collect_once in main.py).
+
+Each capture is one compact JSON record in INCIDENT_DIR: the fast series
+are stored column-wise (one array per metric, time offsets in seconds from
+the start) and the process tables as rows under a shared column header.
+Records are served by /api/incidents/{id}; the oldest are deleted beyond
+INCIDENT_MAX_RECORDS. After a capture ends, no new one starts for a
+cooldown period, so a host that stays saturated does not capture forever.
+"""
+import copy
+import json
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from collectors.cpu_sampler import parse_cpu_line
+from collectors.memory import parse_meminfo
+from collectors.network import RX_BYTES, TX_BYTES
+from collectors.processes import ProcessTable
+from registry import get_path
+from state import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+PROC_STAT = Path("/proc/stat")
+PROC_MEMINFO = Path("/proc/meminfo")
+
+PROCESS_COLUMNS = ["pid", "user", "command", "cpu_percent", "rss_bytes"]
+
+INCIDENT_ID = re.compile(r"^\d{8}T\d{6}Z$")
+
+
+class IncidentRecorder:
+    """
+    Threshold-triggered burst capture written to one record per incident.
+
+    Args:
+        directory: Where incident records are written
+        rules: {snapshot path: threshold}; a sample above any starts a capture
+        window_seconds: Length of a capture
+        fast_ms: CPU/memory/network interval during a capture
+        process_ms: Process table interval during a capture
+        top_n: Processes kept per table
+        cooldown_seconds: Minimum gap between the end of a capture and the next
+        max_records: Records kept on disk (oldest deleted first)
+        network_counters: Returns {interface: /proc/net/dev counters} of the
+            interfaces to sum (the network collector's filtered read)
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        rules: Dict[str, float],
+        window_seconds: float = 60.0,
+        fast_ms: int = 250,
+        process_ms: int = 1000,
+        top_n: int = 50,
+        cooldown_seconds: float = 300.0,
+        max_records: int = 100,
+        network_counters: Optional[Callable[[], Dict[str, List[int]]]] = None,
+    ):
+        self.directory = Path(directory)
+        self.rules = dict(rules)
+        self.window_seconds = window_seconds
+        self.fast = fast_ms / 1000.0
+        self.process_interval = process_ms / 1000.0
+        self.top_n = top_n
+        self.cooldown_seconds = cooldown_seconds
+        self.max_records = max_records
+        self.network_counters = network_counters
+
+        self._lock = threading.Lock()
+        self._record: Optional[Dict[str, Any]] = None
+        self._ended_at: Optional[float] = None
+        self._summaries: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def active(self) -> bool:
+        return self._record is not None
+
+    def _breaches(self, data: Dict[str, Any]) -> List[str]:
+        breaches = []
+        for path, threshold in self.rules.items():
+            value = get_path(data, path)
+            try:
+                if value is not None and float(value) > threshold:
+                    breaches.append(f"{path} {float(value):g} > {threshold:g}")
+            except (TypeError, ValueError):
+                continue
+        return breaches
+
+    def check(self, data: Dict[str, Any]) -> Optional[str]:
+        """
+        Start a capture if the snapshot breaches a rule.
+
+        Returns:
+            Id of the capture started or already running, None otherwise
+        """
+        breaches = self._breaches(data)
+        with self._lock:
+            if self._record is not None:
+                if breaches:
+                    self._record["triggers"].append(breaches)
+                return self._record["id"]
+            if not breaches:
+                return None
+            if self._ended_at is not None and time.monotonic() - self._ended_at < self.cooldown_seconds:
+                return None
+            started = datetime.now(timezone.utc)
+            record = {
+                "id": started.strftime("%Y%m%dT%H%M%SZ"),
+                "reason": "; ".join(breaches),
+                "started": started.isoformat(),
+                "ended": None,
+                "window_s": self.window_seconds,
+                "interval_ms": round(self.fast * 1000),
+                "process_interval_ms": round(self.process_interval * 1000),
+                # Later samples that still breached, one entry per sample
+                "triggers": [],
+                "snapshot": copy.deepcopy(data),
+                "series": {"t": [], "cpu_percent": [], "memory_percent": [], "memory_used_bytes": [],
+                           "net_rx_bytes_per_s": [], "net_tx_bytes_per_s": []},
+                "process_columns": PROCESS_COLUMNS,
+                "processes": [],
+            }
+            self._record = record
+        logger.warning(f"Incident {record['id']}: {record['reason']}, capturing for {self.window_seconds:g}s")
+        threading.Thread(target=self._capture, args=(record,), name="incident-capture", daemon=True).start()
+        return record["id"]
+
+    def _read_net(self) -> Optional[List[int]]:
+        if self.network_counters is None:
+            return None
+        try:
+            counters = self.network_counters()
+        except OSError:
+            return None
+        return [sum(v[RX_BYTES] for v in counters.values()), sum(v[TX_BYTES] for v in counters.values())]
+
+    def _capture(self, record: Dict[str, Any]) -> None:
+        series = record["series"]
+        processes = ProcessTable()
+        start = time.monotonic()
+        end = start + self.window_seconds
+        try:
+            processes.scan()
+            stat_fd = os.open(PROC_STAT, os.O_RDONLY)
+            meminfo_fd = os.open(PROC_MEMINFO, os.O_RDONLY)
+            try:
+                prev_cpu = parse_cpu_line(os.pread(stat_fd, 256, 0))
+                prev_net = self._read_net()
+                prev_time = start
+                next_tick = start + self.fast
+                next_procs = start + self.process_interval
+                while True:
+                    delay = next_tick - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                    now = time.monotonic()
+                    if now >= end:
+                        break
+                    next_tick += self.fast
+                    if next_tick < now:
+                        next_tick = now + self.fast
+
+                    cpu = parse_cpu_line(os.pread(stat_fd, 256, 0))
+                    mem = parse_meminfo(os.pread(meminfo_fd, 8192, 0).decode())
+                    net = self._read_net()
+                    elapsed = now - prev_time
+
+                    cpu_percent = None
+                    if cpu and prev_cpu and cpu[1] > prev_cpu[1]:
+                        cpu_percent = round(100.0 * (cpu[0] - prev_cpu[0]) / (cpu[1] - prev_cpu[1]), 1)
+                    total = mem.get("MemTotal") or 0
+                    used = total - mem.get("MemAvailable", 0) if total else None
+                    rx = tx = None
+                    if net and prev_net and elapsed > 0:
+                        rx = round(max(net[0] - prev_net[0], 0) / elapsed)
+                        tx = round(max(net[1] - prev_net[1], 0) / elapsed)
+
+                    with self._lock:
+                        series["t"].append(round(now - start, 3))
+                        series["cpu_percent"].append(cpu_percent)
+                        series["memory_percent"].append(round(100.0 * used / total, 1) if total else None)
+                        series["memory_used_bytes"].append(used)
+                        series["net_rx_bytes_per_s"].append(rx)
+                        series["net_tx_bytes_per_s"].append(tx)
+                    prev_cpu, prev_net, prev_time = cpu, net, now
+
+                    if now >= next_procs:
+                        next_procs += self.process_interval
+                        top = processes.top(self.top_n)
+                        rows = [[p[c] for c in PROCESS_COLUMNS] for p in top]
+                        with self._lock:
+                            record["processes"].append({"t": round(now - start, 3), "rows": rows})
+            finally:
+                os.close(stat_fd)
+                os.close(meminfo_fd)
+        except Exception as e:
+            logger.error(f"Incident capture {record['id']} failed: {e}", exc_info=True)
+            with self._lock:
+                record["error"] = str(e)
+        finally:
+            with self._lock:
+                record["ended"] = datetime.now(timezone.utc).isoformat()
+            try:
+                self._save(record)
+            except OSError as e:
+                logger.error(f"Cannot write incident {record['id']}: {e}")
+                with self._lock:
+                    self._record = None
+                    self._ended_at = time.monotonic()
+            logger.info(f"Incident {record['id']} captured ({len(series['t'])} samples)")
+
+    def _path(self, incident_id: str) -> Path:
+        return self.directory / f"{incident_id}.json"
+
+    def _save(self, record: Dict[str, Any]) -> None:
+        """Write the finished record and replace the running capture by its summary."""
+        atomic_write_json(self._path(record["id"]), record)
+        summary = self._summary(record)
+        records = sorted(self.directory.glob("*.json"))
+        expired = records[:max(len(records) - self.max_records, 0)]
+        for old in expired:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+        with self._lock:
+            self._summaries[record["id"]] = summary
+            for old in expired:
+                self._summaries.pop(old.stem, None)
+            # In the same step, so list() never sees the capture both as
+            # running and as stored
+            self._record = None
+            self._ended_at = time.monotonic()
+
+    @staticmethod
+    def _summary(record: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": record["id"],
+            "reason": record["reason"],
+            "started": record["started"],
+            "ended": record["ended"],
+            "samples": len(record["series"]["t"]),
+        }
+
+    def get(self, incident_id: str) -> Optional[Dict[str, Any]]:
+        """
+        A record by id; a capture still running is returned as captured so
+        far (with "ended": null).
+        """
+        if not INCIDENT_ID.match(incident_id):
+            return None
+        with self._lock:
+            record = self._record
+            if record is not None and record["id"] == incident_id:
+                return json.loads(json.dumps(record))
+        try:
+            with open(self._path(incident_id), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Summaries of the stored records and the running capture, newest first."""
+        # Records written by an earlier process; read outside the lock
+        stored = [p.stem for p in self.directory.glob("*.json")] if self.directory.is_dir() else []
+        with self._lock:
+            missing = [incident_id for incident_id in stored if incident_id not in self._summaries]
+        loaded = {}
+        for incident_id in missing:
+            record = self.get(incident_id)
+            if record is not None:
+                loaded[incident_id] = self._summary(record)
+        with self._lock:
+            self._summaries.update(loaded)
+            summaries = dict(self._summaries)
+            if self._record is not None:
+                # The file may already be on disk while the capture finishes
+                summaries[self._record["id"]] = self._summary(self._record)
+        return sorted(summaries.values(), key=lambda s: s["id"], reverse=True)
@@ -11,15 +11,37 @@ Run this with:
     pip install -r requirements.txt
     uvicorn main:app --host 0.0.0.0 --port 9000
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+import copy
+import os
+import shutil
 import subprocess
 import logging
+import threading
+import time
 from datetime import datetime
+from itertools import count
 from pathlib import Path
-from typing import Dict, Any
+from typing import Any, Callable, Dict, List, Optional
 
+from collectors.cgroups import CgroupCollector
+from collectors.cpu_sampler import CpuBurstSampler
+from collectors.diskstats import DiskStatsCollector
+from collectors.gpu import NvidiaSmiStream
+from collectors.memory import MemoryCollector
+from collectors.network import NetworkCollector, build_network_section, parse_globs
+from collectors.processes import CommandUsage
+from collectors.rapl import RaplCollector
+from collectors.script_stream import ScriptStream
+from collectors.smart import SmartCollector
+from collectors.sockets import SocketCollector
+from config import settings
+from incidents import IncidentRecorder
+from overhead import BudgetGovernor, OverheadMeter
 from parse import parse_stdout
+from registry import PROCESS, AdaptiveInterval, Collector, CollectorRegistry, get_path, parse_fields, project
+from state import StateStore
 import json
 
 # Configure logging
@@ -50,6 +72,546 @@ SCRIPT_DIR = Path(__file__).parent
 COLLECT_SCRIPT = SCRIPT_DIR / "collect_metrics.sh"
 MONITOR_SCRIPT = SCRIPT_DIR / "system_monitor.sh"
 
+# Latest complete collection of this process (reported by /api/health)
+LATEST: Optional[Dict[str, Any]] = None
+
+# Warm-start checkpoint shared by everything that keeps state across polls
+STATE_STORE = StateStore(settings.STATE_FILE, settings.STATE_MAX_AGE_SECONDS)
+
+# Native collectors
+NETWORK = NetworkCollector(
+    include=parse_globs(settings.NET_INCLUDE),
+    exclude=parse_globs(settings.NET_EXCLUDE),
+)
+STATE_STORE.register("network", NETWORK.export_state, NETWORK.restore_state)
+DISKSTATS = DiskStatsCollector(
+    include=parse_globs(settings.DISK_INCLUDE),
+    exclude=parse_globs(settings.DISK_EXCLUDE),
+)
+STATE_STORE.register("diskstats", DISKSTATS.export_state, DISKSTATS.restore_state)
+SOCKETS = SocketCollector(top_ports=settings.SOCKET_TOP_PORTS)
+MEMORY = MemoryCollector()
+STATE_STORE.register("memory", MEMORY.export_state, MEMORY.restore_state)
+CGROUPS = CgroupCollector(max_depth=settings.CGROUP_MAX_DEPTH, rescan_seconds=settings.CGROUP_RESCAN_SECONDS)
+STATE_STORE.register("cgroups", CGROUPS.export_state, CGROUPS.restore_state)
+CPU_SAMPLER = CpuBurstSampler(
+    interval_ms=settings.CPU_SAMPLER_INTERVAL_MS,
+    capacity=settings.CPU_SAMPLER_CAPACITY,
+    threshold=settings.CPU_BURST_THRESHOLD_PERCENT,
+)
+RAPL = RaplCollector()
+PROCESS_USAGE = CommandUsage(limit=settings.PROCESS_USAGE_COMMANDS)
+GPU_STREAM = NvidiaSmiStream(
+    command=settings.NVIDIA_SMI,
+    interval_ms=settings.GPU_STREAM_INTERVAL_MS,
+    stall_seconds=settings.GPU_STREAM_STALL_SECONDS,
+)
+SMART = SmartCollector(
+    command=settings.SMARTCTL,
+    ttl_seconds=settings.SMART_TTL_SECONDS,
+    timeout_seconds=settings.SMART_TIMEOUT_SECONDS,
+    max_workers=settings.SMART_MAX_WORKERS,
+)
+
+
+def native_sections() -> list:
+    """
+    Snapshot sections collected in-process instead of by collect_metrics.sh.
+
+    The script skips the collectors listed here (NATIVE_COLLECTORS env var).
+    On WSL1 the Linux interface counters are frozen and system_monitor.sh
+    reads typeperf.exe instead, so the network section stays with the script.
+    """
+    sections = []
+    if NETWORK.available() and shutil.which("typeperf.exe") is None:
+        sections.append("network")
+    if MEMORY.available():
+        sections.append("memory")
+    return sections
+
+
+NATIVE_SECTIONS = native_sections()
+
+STREAM_MODE = settings.SCRIPT_MODE == "stream"
+
+# Values collect_metrics.sh prints for metrics it could not collect; every
+# sample starts from these so a failed collector leaves a valid snapshot
+SECTION_DEFAULTS: Dict[str, Any] = {
+    "cpu": {"model": "Unknown", "cores": 0, "usage": 0, "load_avg": "N/A", "temperature": "N/A"},
+    "memory": {"total_gb": 0, "used_gb": 0, "free_gb": 0, "percent": 0},
+    "disk": {"display": "N/A", "percent": 0, "partitions": []},
+    "network": {"data": "N/A", "stats": None},
+    "gpu": {"name": "N/A", "memory": "N/A", "temperature": "N/A", "utilization": "N/A"},
+    "system": {
+        "uptime": "N/A",
+        "process_count": 0,
+        "smart_status": "N/A",
+        "smart_health": "N/A",
+        "rom_info": "N/A",
+    },
+    "top_processes": [],
+    "alerts": "No alerts.",
+}
+
+# Alert thresholds (same as check_alerts in system_monitor.sh)
+MEMORY_ALERT_PERCENT = 90
+DISK_ALERT_PERCENT = 90
+
+REGISTRY = CollectorRegistry(max_workers=settings.COLLECTOR_WORKERS)
+REGISTRY.set_alert_rules(
+    {"memory.percent": MEMORY_ALERT_PERCENT, "disk.percent": DISK_ALERT_PERCENT},
+    margin=settings.ALERT_NEAR_MARGIN_PERCENT,
+)
+
+INCIDENTS = IncidentRecorder(
+    settings.INCIDENT_DIR,
+    rules={
+        path: threshold
+        for path, threshold in (
+            ("cpu.usage", settings.INCIDENT_CPU_PERCENT),
+            ("memory.percent", settings.INCIDENT_MEMORY_PERCENT),
+        )
+        if threshold > 0
+    },
+    window_seconds=settings.INCIDENT_WINDOW_SECONDS,
+    fast_ms=settings.INCIDENT_INTERVAL_MS,
+    process_ms=settings.INCIDENT_PROCESS_INTERVAL_MS,
+    top_n=settings.INCIDENT_TOP_PROCESSES,
+    cooldown_seconds=settings.INCIDENT_COOLDOWN_SECONDS,
+    max_records=settings.INCIDENT_MAX_RECORDS,
+    network_counters=NETWORK.read_counters if NETWORK.available() else None,
+)
+
+OVERHEAD = OverheadMeter()
+GOVERNOR = BudgetGovernor(
+    settings.OVERHEAD_BUDGET_PERCENT,
+    window_seconds=settings.OVERHEAD_WINDOW_SECONDS,
+    hold_seconds=settings.OVERHEAD_HOLD_SECONDS,
+)
+
+# Default sampling bounds (seconds) per collector group; collectors not
+# listed run on every sample
+INTERVAL_BOUNDS: Dict[str, tuple] = {
+    "script.base": (1, 15),
+    "script.processes": (2, 60),
+    "script.gpu": (2, 60),
+    "script.disk": (5, 300),
+    # Tick interval of the stream child; the overhead governor may need to
+    # stretch it far, since every tick re-runs the bash collectors
+    "script.stream": (settings.SCRIPT_STREAM_INTERVAL_SECONDS, 120),
+    "sockets": (1, 30),
+    "network": (1, 15),
+    "memory": (1, 15),
+    "diskio": (1, 15),
+    "power": (1, 15),
+    "process_usage": (2, 60),
+    "gpu": (1, 15),
+    "cgroups": (2, 60),
+}
+
+
+def parse_interval_bounds(value: str) -> Dict[str, tuple]:
+    """Parse SAMPLE_INTERVAL_BOUNDS ("name=min:max,...") over the defaults."""
+    bounds = dict(INTERVAL_BOUNDS)
+    for part in value.split(","):
+        if not part.strip():
+            continue
+        try:
+            name, spec = part.split("=", 1)
+            low, high = spec.split(":", 1)
+            bounds[name.strip()] = (float(low), float(high))
+        except ValueError:
+            logger.warning(f"Ignoring malformed SAMPLE_INTERVAL_BOUNDS entry {part!r}")
+    return bounds
+
+
+SAMPLE_BOUNDS = parse_interval_bounds(settings.SAMPLE_INTERVAL_BOUNDS)
+
+
+def sampling_interval(name: str) -> Optional[AdaptiveInterval]:
+    """Adaptive interval for a collector group, None to run on every sample."""
+    if not settings.ADAPTIVE_SAMPLING or name not in SAMPLE_BOUNDS:
+        return None
+    return AdaptiveInterval(*SAMPLE_BOUNDS[name])
+
+# Serialises samples: collectors keep counter state between calls
+SAMPLE_LOCK = threading.Lock()
+
+# False while a field projection is sampled (set under SAMPLE_LOCK); window
+# collectors such as cpu.burst then peek instead of consuming their window
+FULL_SAMPLE = True
+
+# Numbers the traced samples of this process (see trace_stamp)
+TRACE_SEQ = count(1)
+
+
+def trace_stamp() -> Dict[str, float]:
+    """
+    A point of the freshness trace: wall time (comparable with the backend
+    on the same host) and monotonic time (for durations within this process).
+    """
+    return {"wall": time.time(), "mono": time.monotonic()}
+
+
+def script_command(script: Path = COLLECT_SCRIPT) -> list:
+    """Command line running a bash script (collect_metrics.sh) on this platform."""
+    import platform
+    if platform.system() == "Windows":
+        # On Windows, run via WSL
+        # Use relative path since we set cwd
+        # wsl.exe will inherit the cwd
+        return ["wsl", "bash", script.name]
+    # On Linux/WSL internal, run directly
+    return ["/bin/bash", str(script)]
+
+
+def run_script(collectors: List[str], native: List[str]) -> Dict[str, Any]:
+    """
+    Run collect_metrics.sh for a subset of its collectors.
+
+    Args:
+        collectors: Script collector names (SCRIPT_COLLECTORS)
+        native: Sections the script must skip (NATIVE_COLLECTORS)
+
+    Returns:
+        Parsed JSON output of the script
+
+    Raises:
+        RuntimeError: If the script exits non-zero
+        ValueError: If the output is empty or not JSON
+        subprocess.TimeoutExpired: If the script hangs
+    """
+    env = {
+        **os.environ,
+        "SCRIPT_COLLECTORS": " ".join(collectors),
+        "NATIVE_COLLECTORS": " ".join(native),
+    }
+    result = subprocess.run(
+        script_command(),
+        capture_output=True,
+        encoding='utf-8', # Force UTF-8 for WSL output
+        timeout=settings.SCRIPT_TIMEOUT_SECONDS,
+        cwd=str(SCRIPT_DIR),  # Run from script directory
+        env=env,
+    )
+    if result.returncode != 0:
+        logger.debug(f"Script stdout: {result.stdout[:500]}")
+        raise RuntimeError(f"Script failed with return code {result.returncode}: {result.stderr}")
+    if not result.stdout.strip():
+        raise ValueError("Script returned empty output")
+    try:
+        return parse_stdout(result.stdout)
+    except json.JSONDecodeError as e:
+        logger.debug(f"Raw output (first 500 chars): {result.stdout[:500]}")
+        raise ValueError(f"Failed to parse script output: {e}")
+
+
+def register_script_collector(
+    name: str,
+    collectors: List[str],
+    provides: List[str],
+    inputs: List[str],
+    available: Optional[Callable[[], bool]] = None,
+    watch: List[str] = (),
+) -> None:
+    """
+    Register one collect_metrics.sh invocation as a PROCESS collector.
+
+    Args:
+        name: Registry name
+        collectors: Script collectors it runs (SCRIPT_COLLECTORS)
+        provides: Snapshot sections taken from its output
+        inputs: Commands/files the script collectors use
+        available: Optional check deciding whether it runs on this host
+        watch: Numeric paths driving its adaptive interval
+    """
+    def collect(data: Dict[str, Any]) -> Dict[str, Any]:
+        output = run_script(collectors, NATIVE_SECTIONS)
+        return {path: get_path(output, path) for path in provides}
+
+    REGISTRY.add(Collector(
+        name,
+        collect,
+        provides=provides,
+        cost=PROCESS,
+        inputs=inputs,
+        available=available,
+        interval=sampling_interval(name),
+        watch=watch,
+    ))
+
+
+# --- Script collectors (external processes, run concurrently) --------------
+#
+# Used in SCRIPT_MODE=oneshot; in stream mode script.stream below replaces
+# all of them.
+
+def oneshot() -> bool:
+    return not STREAM_MODE
+
+
+# CPU and network deltas share the script's state file, so they stay in one
+# invocation
+register_script_collector(
+    "script.base",
+    ["rom", "cpu", "load"] + [s for s in ("memory", "network") if s not in NATIVE_SECTIONS],
+    ["timestamp", "cpu", "system.rom_info", "system.uptime", "system.process_count"]
+    + [s for s in ("memory", "network") if s not in NATIVE_SECTIONS],
+    inputs=["/proc/stat", "/proc/cpuinfo", "/proc/uptime", "dmidecode", "powershell.exe"],
+    available=oneshot,
+    watch=["cpu.usage"] + (["memory.percent"] if "memory" not in NATIVE_SECTIONS else []),
+)
+register_script_collector("script.processes", ["processes"], ["top_processes"], inputs=["ps"], available=oneshot)
+# Without nvidia-smi the script still covers other vendors (macOS system_profiler)
+register_script_collector(
+    "script.gpu",
+    ["gpu"],
+    ["gpu"],
+    inputs=["system_profiler"],
+    available=lambda: oneshot() and not GPU_STREAM.available(),
+    watch=["gpu.utilization"],
+)
+register_script_collector("script.disk", ["disk"], ["disk"], inputs=["df"], available=oneshot, watch=["disk.percent"])
+# Windows drives via wmic when smartctl is not installed
+register_script_collector(
+    "script.smart",
+    ["smart"],
+    ["system.smart_status", "system.smart_health"],
+    inputs=["wmic.exe"],
+    available=lambda: oneshot() and not SMART.available(),
+)
+
+
+def stream_native_sections() -> List[str]:
+    """Sections the stream child skips because they are collected natively."""
+    sections = list(NATIVE_SECTIONS)
+    if GPU_STREAM.available():
+        sections.append("gpu")
+    if SMART.available():
+        sections.append("smart")
+    return sections
+
+
+SCRIPT_STREAM = ScriptStream(
+    script_command(MONITOR_SCRIPT) + ["--json-stream"],
+    cwd=str(SCRIPT_DIR),
+    env={"NATIVE_COLLECTORS": " ".join(stream_native_sections())},
+    interval_seconds=settings.SCRIPT_STREAM_INTERVAL_SECONDS,
+    stall_seconds=settings.SCRIPT_STREAM_STALL_SECONDS,
+    interval_file=str(settings.DATA_DIR / "stream_interval"),
+)
+# Drives the child's tick interval (see collect_once)
+STREAM_INTERVAL = sampling_interval("script.stream")
+
+# The budget governor charges the long-lived children to their collectors
+OVERHEAD.track("script.stream", SCRIPT_STREAM.pid)
+OVERHEAD.track("gpu", GPU_STREAM.pid)
+STREAM_PROVIDES = (
+    ["timestamp", "cpu", "system.rom_info", "system.uptime", "system.process_count", "top_processes", "disk"]
+    + [s for s in ("memory", "network") if s not in NATIVE_SECTIONS]
+    + ([] if GPU_STREAM.available() else ["gpu"])
+    + ([] if SMART.available() else ["system.smart_status", "system.smart_health"])
+)
+
+
+@REGISTRY.register(
+    "script.stream",
+    provides=STREAM_PROVIDES + ["script_stream"],
+    inputs=["system_monitor.sh --json-stream"],
+    available=lambda: STREAM_MODE,
+    interval=STREAM_INTERVAL,
+    watch=["cpu.usage"] + (["memory.percent"] if "memory" not in NATIVE_SECTIONS else []),
+)
+def collect_script_stream(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Latest tick of the long-lived script child (waits only for the first
+    one); while the child restarts the last tick is served with
+    script_stream.stale set.
+    """
+    output = SCRIPT_STREAM.latest(wait_seconds=settings.SCRIPT_STREAM_STALL_SECONDS)
+    values = {path: get_path(output, path) for path in STREAM_PROVIDES}
+    values["script_stream"] = SCRIPT_STREAM.status()
+    return values
+
+
+# --- Native collectors (cheap /proc and /sys reads, run inline) -------------
+
+@REGISTRY.register(
+    "sockets",
+    provides=["network.sockets"],
+    inputs=["NETLINK_SOCK_DIAG", "/proc/net/tcp*", "/proc/net/udp*"],
+    available=SOCKETS.available,
+    interval=sampling_interval("sockets"),
+    watch=["network.sockets.tcp.total"],
+)
+def collect_sockets(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {"network.sockets": SOCKETS.collect()}
+
+
+@REGISTRY.register(
+    "network",
+    depends_on=["network.sockets"],
+    inputs=["/proc/net/dev", "/sys/class/net"],
+    available=lambda: "network" in NATIVE_SECTIONS,
+    interval=sampling_interval("network"),
+    watch=["network.stats.lan.rx", "network.stats.lan.tx", "network.stats.wifi.rx", "network.stats.wifi.tx"],
+)
+def collect_network(data: Dict[str, Any]) -> Dict[str, Any]:
+    tcp = get_path(data, "network.sockets.tcp.total") or 0
+    return {"network": build_network_section(NETWORK.collect(), tcp)}
+
+
+@REGISTRY.register(
+    "memory",
+    provides=["memory", "pressure"],
+    inputs=["/proc/meminfo", "/proc/vmstat", "/proc/pressure"],
+    available=lambda: "memory" in NATIVE_SECTIONS,
+    interval=sampling_interval("memory"),
+    watch=["memory.percent"],
+)
+def collect_memory(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {"memory": MEMORY.collect(), "pressure": MEMORY.read_pressure()}
+
+
+@REGISTRY.register(
+    "diskio",
+    provides=["disk.io"],
+    inputs=["/proc/diskstats", "/sys/class/block"],
+    available=DISKSTATS.available,
+    interval=sampling_interval("diskio"),
+    watch=["disk.io.total.read_bytes_per_s", "disk.io.total.write_bytes_per_s"],
+)
+def collect_diskio(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {"disk.io": DISKSTATS.collect()}
+
+
+@REGISTRY.register(
+    "cpu.burst",
+    inputs=["/proc/stat", "/proc/pressure/cpu"],
+    available=CPU_SAMPLER.available,
+)
+def collect_cpu_burst(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Distribution of the sub-second CPU ticks since the previous full sample;
+    projected requests (?fields=cpu) see the same ticks without consuming them.
+    """
+    CPU_SAMPLER.start()
+    burst = CPU_SAMPLER.summary(advance=FULL_SAMPLE)
+    return {"cpu.burst": burst} if burst else {}
+
+
+@REGISTRY.register(
+    "power",
+    inputs=["/sys/class/powercap/intel-rapl:*/energy_uj"],
+    interval=sampling_interval("power"),
+    watch=["power.package_w"],
+)
+def collect_power(data: Dict[str, Any]) -> Dict[str, Any]:
+    """RAPL power per domain, or the reason it is unavailable (VMs, WSL)."""
+    return {"power": RAPL.collect()}
+
+
+@REGISTRY.register(
+    "process_usage",
+    inputs=["/proc/<pid>/stat"],
+    available=PROCESS_USAGE.available,
+    interval=sampling_interval("process_usage"),
+)
+def collect_process_usage(data: Dict[str, Any]) -> Dict[str, Any]:
+    """CPU seconds and RSS per command since the previous scan (backend leaderboard)."""
+    return {"process_usage": PROCESS_USAGE.collect()}
+
+
+# A governor stretch of the gpu group also stretches nvidia-smi's -lms loop
+GPU_INTERVAL = sampling_interval("gpu")
+
+
+@REGISTRY.register(
+    "gpu",
+    inputs=["nvidia-smi -lms"],
+    available=GPU_STREAM.available,
+    interval=GPU_INTERVAL,
+    watch=["gpu.utilization"],
+)
+def collect_gpu(data: Dict[str, Any]) -> Dict[str, Any]:
+    gpu = GPU_STREAM.collect()
+    # Until the first lines arrive the section keeps its defaults
+    return {"gpu": gpu} if gpu else {}
+
+
+@REGISTRY.register(
+    "smart",
+    provides=["smart", "system.smart_status", "system.smart_health"],
+    cost=PROCESS,
+    inputs=["/sys/block", "smartctl -j -H -A"],
+    available=SMART.available,
+)
+def collect_smart(data: Dict[str, Any]) -> Dict[str, Any]:
+    smart = SMART.collect()
+    return {
+        "smart": {"devices": smart["devices"], "age_seconds": smart["age_seconds"]},
+        "system.smart_status": smart["status"],
+        "system.smart_health": smart["health"],
+    }
+
+
+@REGISTRY.register(
+    "cgroups",
+    inputs=["/sys/fs/cgroup"],
+    available=CGROUPS.available,
+    interval=sampling_interval("cgroups"),
+)
+def collect_cgroups(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {"cgroups": CGROUPS.collect()}
+
+
+@REGISTRY.register("alerts", depends_on=["memory", "disk"])
+def evaluate_alerts(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Threshold alerts, evaluated once memory and disk are collected."""
+    alerts = []
+    mem_usage = int(float(get_path(data, "memory.percent") or 0))
+    if mem_usage > MEMORY_ALERT_PERCENT:
+        alerts.append(f"High Memory Usage: {mem_usage}%")
+    disk_usage = int(float(get_path(data, "disk.percent") or 0))
+    if disk_usage > DISK_ALERT_PERCENT:
+        alerts.append(f"High Disk Usage: {disk_usage}%")
+    for alert in alerts:
+        logger.warning(alert)
+    return {"alerts": "; ".join(alerts) if alerts else "No alerts."}
+
+
+@app.on_event("startup")
+def startup_event():
+    """
+    Reload the warm-start checkpoint, start periodic checkpointing, the
+    high-frequency CPU sampler and the long-lived script and nvidia-smi
+    streams.
+
+    The checkpoint is only accepted if it was written during the current
+    kernel boot; see state.py.
+    """
+    STATE_STORE.load()
+    CPU_SAMPLER.start()
+    if STREAM_MODE:
+        SCRIPT_STREAM.start()
+    GPU_STREAM.start()
+    thread = threading.Thread(
+        target=STATE_STORE.checkpoint_loop,
+        args=(settings.CHECKPOINT_INTERVAL_SECONDS,),
+        daemon=True,
+    )
+    thread.start()
+    logger.info(f"Checkpointing state every {settings.CHECKPOINT_INTERVAL_SECONDS}s to {settings.STATE_FILE}")
+
+
+@app.on_event("shutdown")
+def shutdown_event():
+    """Stop the samplers and write a final checkpoint so the next start is warm."""
+    CPU_SAMPLER.stop()
+    SCRIPT_STREAM.stop()
+    GPU_STREAM.stop()
+    STATE_STORE.save()
+
 
 @app.get("/")
 def root():
@@ -62,12 +624,50 @@ def root():
 
 
 @app.get("/api/metrics/current")
-def current_metrics() -> Dict[str, Any]:
+def current_metrics(live: bool = False, fields: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Collect metrics once.
+
+    Args:
+        live: A dashboard is being watched; sample every group at its
+            minimum interval instead of backing off
+        fields: Optional projection, e.g. "cpu.usage,memory.percent,network.stats".
+            Only the collectors providing these paths run and only these
+            paths are returned.
+
+    Returns:
+        Same structure as collect_once()
+    """
+    global LATEST
+    paths = None
+    if fields is not None:
+        try:
+            paths = parse_fields(fields)
+            REGISTRY.names_for(paths)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    result = collect_once(live=live, paths=paths)
+    if result.get("trace"):
+        result["trace"]["responded"] = trace_stamp()
+    # Only complete snapshots count as the latest one
+    if result.get("data") is not None and paths is None:
+        LATEST = result
+    return result
+
+
+def collect_once(live: bool = False, paths: Optional[tuple] = None) -> Dict[str, Any]:
     """
-    Execute the unified bash monitoring script once and return parsed metrics.
+    Run one sample over all registered collectors and return parsed metrics.
+    
+    Independent collectors run concurrently (see registry.py); the bash
+    collectors run as separate collect_metrics.sh invocations, each limited
+    to its own collectors via SCRIPT_COLLECTORS. Collector groups that are
+    not due yet under adaptive sampling contribute their previous values.
     
-    This endpoint runs collect_metrics.sh wrapper script which sources
-    system_monitor.sh and outputs JSON with all system metrics.
+    Args:
+        live: Sample every group at its minimum interval
+        paths: Parsed field projection (parse_fields); only the collectors
+            providing these paths run and "data" holds only these paths
     
     Returns:
         Dictionary with structure:
@@ -81,9 +681,20 @@ def current_metrics() -> Dict[str, Any]:
                 "network": {...},
                 "system": {...},
                 "top_processes": [...],
-                "alerts": "..."
+                "alerts": "...",
+                "incident": id of the running incident capture or null,
+                "collectors": {name: {"ms", "cpu_ms", "error", "interval_s", "target_s", "cached"}},
+                "overhead": host API + children CPU, RSS and forks since the
+                            previous sample, and the budget governor's state,
+                "sampling": {"live": bool, "next_due_s": seconds or null},
+                "error": set when no script collector could run (the
+                         native sections are still filled)
             },
-            "error": null or error message
+            "error": null or error message,
+            "trace": {"host_seq", "requested", "collect_start", "collect_end"
+                      (each {"wall", "mono"}), "sections": {name: {"start_ms",
+                      "end_ms"}}, "cached": [...]}; current_metrics adds
+                      "responded"
         }
     """
     # Ensure script exists
@@ -105,71 +716,63 @@ def current_metrics() -> Dict[str, Any]:
             "error": error_msg,
         }
     
+    global FULL_SAMPLE
+    requested = trace_stamp()
     try:
-        # Execute the wrapper script
-        # This script sources system_monitor.sh and outputs JSON
-        # Prepare command based on OS
-        import platform
-        if platform.system() == "Windows":
-            # On Windows, run via WSL
-            # Use relative path since we set cwd
-            # wsl.exe will inherit the cwd 
-            cmd = ["wsl", "bash", COLLECT_SCRIPT.name]
-        else:
-            # On Linux/WSL internal, run directly
-            cmd = ["/bin/bash", str(COLLECT_SCRIPT)]
-
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            encoding='utf-8', # Force UTF-8 for WSL output
-            timeout=180,  # 180 second timeout
-            cwd=str(SCRIPT_DIR),  # Run from script directory
-        )
-        
-        if result.returncode != 0:
-            error_msg = f"Script failed with return code {result.returncode}: {result.stderr}"
-            logger.error(error_msg)
-            logger.debug(f"Script stdout: {result.stdout[:500]}")
-            return {
-                "timestamp": datetime.utcnow().isoformat() + "Z",
-                "data": None,
-                "error": error_msg,
-            }
-        
-        # Parse JSON output from stdout
-        if not result.stdout.strip():
-            logger.warning("Script returned empty output")
-            return {
-                "timestamp": datetime.utcnow().isoformat() + "Z",
-                "data": None,
-                "error": "Script returned empty output",
-            }
-        
-        # Parse the JSON output
-        try:
-            data = parse_stdout(result.stdout)
+        with SAMPLE_LOCK:
+            FULL_SAMPLE = paths is None
+            collect_start = trace_stamp()
+            names = None if paths is None else REGISTRY.names_for(paths)
+            # A running incident capture holds every group at its minimum interval
+            live = live or INCIDENTS.active
+            data, sample = REGISTRY.run(copy.deepcopy(SECTION_DEFAULTS), names=names, live=live)
+            collect_end = trace_stamp()
+            overhead = OVERHEAD.sample()
+            governor = GOVERNOR.observe(overhead, sample, REGISTRY.collectors())
+            if STREAM_MODE and STREAM_INTERVAL is not None:
+                # The child ticks as often as script.stream is read
+                SCRIPT_STREAM.set_interval(STREAM_INTERVAL.current)
+            if GPU_INTERVAL is not None:
+                GPU_STREAM.set_interval_ms(round(settings.GPU_STREAM_INTERVAL_MS * GPU_INTERVAL.stretch))
+        trace = {
+            "host_seq": next(TRACE_SEQ),
+            "requested": requested,
+            "collect_start": collect_start,
+            "collect_end": collect_end,
+            "sections": sample.sections(),
+            "cached": sample.cached,
+        }
+
+        script_errors = [
+            sample.errors[c.name] for c in REGISTRY.collectors()
+            if c.name.startswith("script.") and c.name in sample.errors
+        ]
+        script_runs = [c for c in REGISTRY.collectors() if c.name.startswith("script.") and c.name in sample.timings]
+        if script_runs and len(script_errors) == len(script_runs):
+            # The script could not run at all; the native sections are
+            # still valid, the script sections keep their defaults
+            logger.error(script_errors[0])
+            data["error"] = script_errors[0]
+
+        if paths is not None:
             return {
                 "timestamp": datetime.utcnow().isoformat() + "Z",
-                "data": data,
+                "data": project(data, paths),
                 "error": None,
+                "trace": trace,
             }
-        except (json.JSONDecodeError, ValueError) as e:
-            logger.error(f"Failed to parse script output: {e}")
-            logger.debug(f"Raw output (first 500 chars): {result.stdout[:500]}")
-            return {
-                "timestamp": datetime.utcnow().isoformat() + "Z",
-                "data": None,
-                "error": f"Failed to parse script output: {str(e)}",
-            }
-            
-    except subprocess.TimeoutExpired:
-        error_msg = "Script execution timed out after 180 seconds"
-        logger.error(error_msg)
+        data["incident"] = INCIDENTS.check(data)
+        data["collectors"] = sample.report()
+        data["overhead"] = {**overhead, "governor": governor}
+        data["sampling"] = {
+            "live": live,
+            "next_due_s": None if sample.next_due is None else round(sample.next_due, 3),
+        }
         return {
             "timestamp": datetime.utcnow().isoformat() + "Z",
-            "data": None,
-            "error": error_msg,
+            "data": data,
+            "error": None,
+            "trace": trace,
         }
     except Exception as e:
         error_msg = f"Unexpected error executing script: {str(e)}"
@@ -181,6 +784,30 @@ def current_metrics() -> Dict[str, Any]:
         }
 
 
+@app.get("/api/incidents")
+def list_incidents() -> List[Dict[str, Any]]:
+    """Stored incident captures (and the running one), newest first."""
+    return INCIDENTS.list()
+
+
+@app.get("/api/incidents/{incident_id}")
+def get_incident(incident_id: str) -> Dict[str, Any]:
+    """
+    One incident capture: the triggering snapshot, 250 ms CPU/memory/network
+    series (column arrays) and per-second top process tables.
+    """
+    record = INCIDENTS.get(incident_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Unknown incident {incident_id}")
+    return record
+
+
+@app.get("/api/collectors")
+def list_collectors() -> List[Dict[str, Any]]:
+    """Registered collectors with their inputs, cost class and dependencies."""
+    return REGISTRY.describe()
+
+
 @app.get("/api/health")
 def health_check():
     """
@@ -192,6 +819,7 @@ def health_check():
     return {
         "status": "healthy" if scripts_exist else "degraded",
         "scripts_available": scripts_exist,
+        "last_metrics_timestamp": LATEST.get("timestamp") if LATEST else None,
         "collect_script": str(COLLECT_SCRIPT),
         "monitor_script": str(MONITOR_SCRIPT),
     }
@@ -0,0 +1,321 @@
+"""
+Self-overhead accounting and the monitoring cost budget governor.
+
+The monitor is itself a load on small laptops and busy build boxes: every
+poll may spawn bash, python3 gravity_bridge.py, powershell.exe, ps and df.
+OverheadMeter measures, per sample, what the host API costs:
+
+    self        CPU time of this process, all threads (RUSAGE_SELF)
+    children    CPU time of reaped children and everything they reaped
+                (RUSAGE_CHILDREN), plus the running CPU time of children
+                that are still alive (the script stream, nvidia-smi), read
+                from /proc/<pid>/stat via /proc/self/task/*/children
+    rss_bytes   resident memory of this process
+    forks       children spawned since the previous sample (subprocess.Popen
+                audit events; grandchildren started by the scripts are not
+                counted, but their CPU time is)
+    long-lived  children CPU per collector owning a long-lived child
+                (track(): the script stream, nvidia-smi), from that pid's
+                /proc stat, including the jobs it reaped
+
+BudgetGovernor keeps an exponentially weighted average of self + children
+CPU (percent of one core) and compares it with OVERHEAD_BUDGET_PERCENT.
+While over budget it stretches the floor of the adaptive interval of the
+collector with the highest estimated cost per second (CPU per run / its
+interval), one collector and one doubling at a time, waiting
+OVERHEAD_HOLD_SECONDS between changes so the average can settle. Once the
+average drops below half the budget, the last stretch is undone. Per-run
+cost is the collector's own thread CPU time plus a share of the children
+CPU of the sample, split across the external-command collectors that ran
+by their wall time. A collector owning a long-lived child is charged that
+child's CPU per second on top; its child follows the stretched interval
+(the stream's tick interval, nvidia-smi's -lms), so stretching it lowers
+that cost. Children CPU that none of this explains (children that exited
+between samples) is reported as unattributed. Collectors without an
+adaptive interval cannot be stretched; if nothing is left to stretch the
+report says the budget is exhausted.
+"""
+import logging
+import math
+import os
+import resource
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from collectors.processes import CSTIME, CLOCK_TICKS, CUTIME, PAGE_SIZE, STIME, UTIME
+from registry import PROCESS, Collector, SampleResult
+
+logger = logging.getLogger(__name__)
+
+PROC_SELF = Path("/proc/self")
+
+# Below this fraction of the budget the last stretch is undone
+RELAX_RATIO = 0.5
+
+
+class OverheadMeter:
+    """
+    CPU, memory and fork counts of this process and its children.
+
+    Args:
+        proc_self: Path of /proc/self
+    """
+
+    def __init__(self, proc_self: Path = PROC_SELF):
+        self.proc_self = Path(proc_self)
+        self._lock = threading.Lock()
+        self._forks = 0
+        self._prev_forks = 0
+        self._prev_time: Optional[float] = None
+        self._prev_self: Optional[float] = None
+        self._prev_children: Optional[float] = None
+        # Collector name -> pid of its long-lived child, and the (pid, CPU
+        # seconds) seen at the previous sample
+        self._owners: Dict[str, Callable[[], Optional[int]]] = {}
+        self._prev_owned: Dict[str, Tuple[int, float]] = {}
+        sys.addaudithook(self._audit)
+
+    def track(self, name: str, pid: Callable[[], Optional[int]]) -> None:
+        """Charge the CPU of the long-lived child `pid()` returns to collector `name`."""
+        self._owners[name] = pid
+
+    def _audit(self, event: str, args: Any) -> None:
+        if event == "subprocess.Popen":
+            with self._lock:
+                self._forks += 1
+
+    def _live_children_seconds(self) -> Dict[int, float]:
+        """CPU seconds (own and reaped) of each child that is still running."""
+        pids = set()
+        try:
+            for task in os.scandir(self.proc_self / "task"):
+                try:
+                    with open(f"{task.path}/children", "rb") as f:
+                        pids.update(f.read().split())
+                except OSError:
+                    continue
+        except OSError:
+            return {}
+        seconds = {}
+        for pid in pids:
+            try:
+                with open(f"/proc/{pid.decode()}/stat", "rb") as f:
+                    raw = f.read()
+            except OSError:
+                # Exited (and reaped) since the listing: now in RUSAGE_CHILDREN
+                continue
+            fields = raw[raw.rfind(b")") + 2:].split()
+            if len(fields) > CSTIME:
+                seconds[int(pid)] = sum(int(fields[i]) for i in (UTIME, STIME, CUTIME, CSTIME)) / CLOCK_TICKS
+        return seconds
+
+    def _owned_deltas(self, live: Dict[int, float]) -> Dict[str, float]:
+        """CPU seconds each tracked child used since the previous sample."""
+        deltas = {}
+        for name, owner in self._owners.items():
+            pid = owner()
+            if pid is None or pid not in live:
+                self._prev_owned.pop(name, None)
+                continue
+            prev = self._prev_owned.get(name)
+            # A new child is charged everything it used so far
+            used = live[pid] - prev[1] if prev is not None and prev[0] == pid else live[pid]
+            self._prev_owned[name] = (pid, live[pid])
+            deltas[name] = max(used, 0.0)
+        return deltas
+
+    def _rss_bytes(self) -> Optional[int]:
+        try:
+            with open(self.proc_self / "statm", "rb") as f:
+                return int(f.read().split()[1]) * PAGE_SIZE
+        except (OSError, IndexError, ValueError):
+            return None
+
+    def sample(self) -> Dict[str, Any]:
+        """
+        Overhead since the previous call.
+
+        Returns:
+            {"interval_s", "cpu_percent", "self_cpu_percent",
+            "children_cpu_percent", "self_cpu_s", "children_cpu_s" (totals
+            since start), "children_cpu_delta_s", "long_lived_cpu_s"
+            ({collector: CPU seconds of its tracked child}), "rss_bytes",
+            "threads", "forks", "forks_total"}; percents are of one core and
+            None on the first call
+        """
+        now = time.monotonic()
+        own = resource.getrusage(resource.RUSAGE_SELF)
+        reaped = resource.getrusage(resource.RUSAGE_CHILDREN)
+        self_s = own.ru_utime + own.ru_stime
+        # A child that exits moves its time from "live" to RUSAGE_CHILDREN,
+        # so the total stays continuous
+        live = self._live_children_seconds()
+        children_s = reaped.ru_utime + reaped.ru_stime + sum(live.values())
+        owned = self._owned_deltas(live)
+        with self._lock:
+            forks = self._forks
+
+        self_pct = children_pct = None
+        children_delta = 0.0
+        if self._prev_time is not None and now > self._prev_time:
+            elapsed = now - self._prev_time
+            self_pct = max(self_s - self._prev_self, 0.0) / elapsed * 100
+            children_delta = max(children_s - self._prev_children, 0.0)
+            children_pct = children_delta / elapsed * 100
+        interval = None if self._prev_time is None else now - self._prev_time
+        new_forks = forks - self._prev_forks
+        self._prev_time, self._prev_self, self._prev_children, self._prev_forks = now, self_s, children_s, forks
+
+        try:
+            threads = len(os.listdir(self.proc_self / "task"))
+        except OSError:
+            threads = threading.active_count()
+        return {
+            "interval_s": None if interval is None else round(interval, 3),
+            "cpu_percent": None if self_pct is None else round(self_pct + children_pct, 3),
+            "self_cpu_percent": None if self_pct is None else round(self_pct, 3),
+            "children_cpu_percent": None if children_pct is None else round(children_pct, 3),
+            "self_cpu_s": round(self_s, 3),
+            "children_cpu_s": round(children_s, 3),
+            "children_cpu_delta_s": round(children_delta, 4),
+            "long_lived_cpu_s": {name: round(seconds, 4) for name, seconds in owned.items()},
+            "rss_bytes": self._rss_bytes(),
+            "threads": threads,
+            "forks": new_forks,
+            "forks_total": forks,
+        }
+
+
+class BudgetGovernor:
+    """
+    Stretches the costliest adaptive intervals while overhead is over budget.
+
+    Args:
+        budget_percent: Average CPU allowed, percent of one core (0 only
+            measures)
+        window_seconds: Time constant of the average
+        hold_seconds: Minimum time between two interval changes
+    """
+
+    def __init__(self, budget_percent: float, window_seconds: float = 300.0, hold_seconds: float = 60.0):
+        self.budget_percent = budget_percent
+        self.window_seconds = window_seconds
+        self.hold_seconds = hold_seconds
+        self.average: Optional[float] = None
+        # Estimated CPU seconds per run of each collector
+        self.costs: Dict[str, float] = {}
+        # CPU seconds per second of the long-lived child of a collector
+        self.child_rates: Dict[str, float] = {}
+        # Collector names in the order they were stretched
+        self._stretched: List[str] = []
+        self._changed_at = time.monotonic()
+        self._exhausted = False
+
+    def _update_costs(self, sample: SampleResult, collectors: Dict[str, Collector], children_s: float) -> float:
+        """Update per-run costs; returns children CPU seconds no collector accounts for."""
+        ran = [name for name in sample.timings if name not in sample.cached]
+        external = [name for name in ran if collectors[name].cost == PROCESS]
+        wall = sum(sample.timings[name] for name in external)
+        for name in ran:
+            cost = sample.cpu.get(name, 0.0)
+            if name in external and wall > 0:
+                cost += children_s * sample.timings[name] / wall
+            prev = self.costs.get(name)
+            self.costs[name] = cost if prev is None else prev + 0.3 * (cost - prev)
+        # Children that exited between samples
+        return 0.0 if wall > 0 else children_s
+
+    def _update_child_rates(self, long_lived: Dict[str, float], interval: Optional[float]) -> None:
+        if not interval:
+            return
+        for name, seconds in long_lived.items():
+            rate = seconds / interval
+            prev = self.child_rates.get(name)
+            self.child_rates[name] = rate if prev is None else prev + 0.3 * (rate - prev)
+
+    def _rate(self, c: Collector) -> float:
+        """Estimated CPU seconds per second of a collector at its current interval."""
+        runs = self.costs.get(c.name, 0.0) / max(c.interval.current, c.interval.floor, 1e-3)
+        return runs + self.child_rates.get(c.name, 0.0)
+
+    def observe(self, overhead: Dict[str, Any], sample: SampleResult, collectors: List[Collector]) -> Dict[str, Any]:
+        """
+        Account one sample and adjust intervals if due.
+
+        Returns:
+            {"budget_percent", "average_cpu_percent", "over_budget",
+            "degraded", "exhausted", "stretched": {name: floor seconds},
+            "cost_ms": {name: CPU ms per run}, "child_cpu_percent": {name:
+            CPU of its long-lived child}, "unattributed_cpu_percent"}
+        """
+        by_name = {c.name: c for c in collectors}
+        long_lived = overhead.get("long_lived_cpu_s") or {}
+        self._update_child_rates(long_lived, overhead.get("interval_s"))
+        # Children CPU left for the external commands of this sample
+        children_s = max((overhead.get("children_cpu_delta_s") or 0.0) - sum(long_lived.values()), 0.0)
+        unattributed = self._update_costs(sample, by_name, children_s)
+        if overhead.get("cpu_percent") is not None and overhead.get("interval_s"):
+            weight = 1 - math.exp(-overhead["interval_s"] / self.window_seconds)
+            if self.average is None:
+                self.average = overhead["cpu_percent"]
+            else:
+                self.average += weight * (overhead["cpu_percent"] - self.average)
+
+        over = bool(self.budget_percent > 0 and self.average is not None and self.average > self.budget_percent)
+        now = time.monotonic()
+        if self.budget_percent > 0 and self.average is not None and now - self._changed_at >= self.hold_seconds:
+            if over:
+                self._stretch(by_name, now)
+            elif self._stretched and self.average < self.budget_percent * RELAX_RATIO:
+                self._relax(by_name, now)
+
+        return {
+            "budget_percent": self.budget_percent,
+            "average_cpu_percent": None if self.average is None else round(self.average, 3),
+            "over_budget": over,
+            "degraded": bool(self._stretched),
+            "exhausted": over and self._exhausted,
+            "stretched": {
+                name: by_name[name].interval.floor for name in self._stretched if name in by_name
+            },
+            "cost_ms": {name: round(cost * 1000, 2) for name, cost in sorted(self.costs.items())},
+            "child_cpu_percent": {name: round(rate * 100, 3) for name, rate in sorted(self.child_rates.items())},
+            # Children CPU of this sample that no run or tracked child explains
+            "unattributed_cpu_percent": (
+                round(unattributed / overhead["interval_s"] * 100, 3) if overhead.get("interval_s") else None
+            ),
+        }
+
+    def _stretch(self, collectors: Dict[str, Collector], now: float) -> None:
+        candidates = [
+            c for c in collectors.values()
+            if c.interval is not None and c.interval.floor < c.interval.max_seconds and self._rate(c) > 0
+        ]
+        self._exhausted = not candidates
+        if not candidates:
+            return
+        c = max(candidates, key=self._rate)
+        c.interval.set_stretch(c.interval.stretch * 2)
+        if c.name not in self._stretched:
+            self._stretched.append(c.name)
+        self._changed_at = now
+        logger.warning(
+            f"Monitoring overhead {self.average:.2f}% of a core is over the "
+            f"{self.budget_percent:g}% budget: {c.name} now runs at most every {c.interval.floor:g}s"
+        )
+
+    def _relax(self, collectors: Dict[str, Collector], now: float) -> None:
+        name = self._stretched[-1]
+        c = collectors.get(name)
+        if c is None or c.interval is None:
+            self._stretched.pop()
+            return
+        c.interval.set_stretch(c.interval.stretch / 2)
+        if c.interval.stretch <= 1.0:
+            self._stretched.pop()
+        self._changed_at = now
+        self._exhausted = False
+        logger.info(f"Monitoring overhead back under budget: {name} floor relaxed to {c.interval.floor:g}s")
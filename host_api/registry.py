@@ -0,0 +1,560 @@
+"""
+Collector registry and dependency-aware sampler.
+
+Every source of snapshot data is registered once as a Collector that
+declares:
+
+    provides    snapshot sections it fills ("cpu", "system.uptime", ...)
+    depends_on  sections that must be filled before it runs
+    cost        FILE_READ (cheap /proc or /sys reads, run inline) or
+                PROCESS (external commands, run on a thread pool)
+    inputs      files or commands it reads, for documentation and the
+                per-sample report
+
+A sample starts every collector whose dependencies are satisfied: PROCESS
+collectors are submitted to the pool first so their latency overlaps, then
+ready FILE_READ collectors run inline on the sampling thread. Whenever a
+collector finishes its sections are merged into the snapshot and any
+dependants that became ready are started. A sample therefore costs roughly
+the slowest chain of external commands instead of their sum.
+
+Collectors may be given an AdaptiveInterval. A collector that is not due
+yet is not run; its previous values are merged instead. After each run the
+interval backs off while the watched values are stable and nobody is
+watching live, and drops to its minimum when they change quickly, when an
+alert rule is close to its threshold or when a live viewer is present. The
+report of every sample records, per collector, the interval actually used
+since its previous run, whether the values were reused and the CPU time the
+collect call used on its thread (external commands are not included; see
+overhead.py).
+
+An overhead governor may stretch an interval: its floor becomes
+min_seconds x stretch (at most max_seconds), which also applies to live
+viewers.
+
+A sample can be limited to a field projection: names_for() maps the
+requested section paths to the collectors providing them (plus the
+providers of their dependencies), so collectors nobody asked for are not
+run at all.
+
+collect() receives the snapshot built so far (with every section it
+depends on) and returns a mapping of section path to value. Dotted paths
+set nested keys; a dict merged into an existing dict keeps keys it does not
+override, so two collectors can fill different keys of "system".
+"""
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FILE_READ = "file_read"
+PROCESS = "process"
+
+# Relative change of watched values (|new - old| / max(|old|, 1)) below
+# which a collector counts as stable, and above which it counts as volatile
+STABLE_CHANGE = 0.05
+FAST_CHANGE = 0.25
+BACKOFF_FACTOR = 2.0
+
+
+class AdaptiveInterval:
+    """
+    Sampling interval of one collector, kept within [min_seconds, max_seconds].
+
+    Starts at the minimum; doubles after stable samples without live
+    viewers and returns to the floor (the minimum unless stretched) on fast
+    changes, near-threshold values or live viewers.
+    """
+
+    def __init__(self, min_seconds: float, max_seconds: float):
+        self.min_seconds = min_seconds
+        self.max_seconds = max(max_seconds, min_seconds)
+        self.current = min_seconds
+        # Set by the overhead governor (see overhead.py)
+        self.stretch = 1.0
+
+    @property
+    def floor(self) -> float:
+        """Shortest interval currently allowed."""
+        return min(self.min_seconds * self.stretch, self.max_seconds)
+
+    def set_stretch(self, stretch: float) -> None:
+        self.stretch = max(stretch, 1.0)
+        self.current = max(self.current, self.floor)
+
+    def update(self, change: Optional[float], urgent: bool) -> float:
+        """
+        Adjust after a run.
+
+        Args:
+            change: Relative change of the watched values, None if the
+                collector watches nothing (demand-driven only)
+            urgent: A live viewer is present or an alert is near its threshold
+        """
+        if urgent or (change is not None and change >= FAST_CHANGE):
+            self.current = self.floor
+        elif change is None or change <= STABLE_CHANGE:
+            self.current = min(self.current * BACKOFF_FACTOR, self.max_seconds)
+        return self.current
+
+
+def _as_number(value: Any) -> Optional[float]:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    try:
+        return float(str(value).strip().rstrip("%"))
+    except (TypeError, ValueError):
+        return None
+
+
+class Collector:
+    """
+    A registered source of snapshot sections.
+
+    Args:
+        name: Unique collector name
+        collect: Callable taking the snapshot so far and returning
+            {section_path: value}
+        provides: Section paths this collector fills
+        depends_on: Section paths that must be ready before it runs
+        cost: FILE_READ or PROCESS
+        inputs: Files/commands read, informational
+        available: Callable deciding whether the collector runs on this host
+        interval: Adaptive sampling interval; None runs it on every sample
+        watch: Numeric section paths whose volatility drives the interval
+    """
+
+    def __init__(
+        self,
+        name: str,
+        collect: Callable[[Dict[str, Any]], Dict[str, Any]],
+        provides: Iterable[str],
+        depends_on: Iterable[str] = (),
+        cost: str = FILE_READ,
+        inputs: Iterable[str] = (),
+        available: Optional[Callable[[], bool]] = None,
+        interval: Optional[AdaptiveInterval] = None,
+        watch: Iterable[str] = (),
+    ):
+        if cost not in (FILE_READ, PROCESS):
+            raise ValueError(f"Unknown cost class {cost!r} for collector {name}")
+        self.name = name
+        self.collect = collect
+        self.provides = tuple(provides)
+        self.depends_on = tuple(depends_on)
+        self.cost = cost
+        self.inputs = tuple(inputs)
+        self._available = available
+        self.interval = interval
+        self.watch = tuple(watch)
+
+        # Values and monotonic time of the last run, reused while not due
+        self.last_values: Optional[Dict[str, Any]] = None
+        self.last_run: Optional[float] = None
+
+    def due(self, now: float) -> bool:
+        """True if the collector must run in a sample taken at `now`."""
+        if self.interval is None or self.last_values is None or self.last_run is None:
+            return True
+        return now - self.last_run >= self.interval.current
+
+    def watched(self, values: Optional[Dict[str, Any]]) -> Dict[str, float]:
+        """Numeric values of the watched paths in a result."""
+        found: Dict[str, float] = {}
+        if not values:
+            return found
+        for path in self.watch:
+            value = _lookup(values, path)
+            number = _as_number(value)
+            if number is not None:
+                found[path] = number
+        return found
+
+    def available(self) -> bool:
+        if self._available is None:
+            return True
+        try:
+            return bool(self._available())
+        except Exception:
+            return False
+
+
+def set_path(data: Dict[str, Any], path: str, value: Any) -> None:
+    """Set a dotted section path, merging dicts into existing dicts."""
+    keys = path.split(".")
+    target = data
+    for key in keys[:-1]:
+        if not isinstance(target.get(key), dict):
+            target[key] = {}
+        target = target[key]
+    last = keys[-1]
+    existing = target.get(last)
+    if isinstance(existing, dict) and isinstance(value, dict):
+        target[last] = {**existing, **value}
+    else:
+        target[last] = value
+
+
+def _lookup(values: Dict[str, Any], path: str) -> Any:
+    """Find a dotted path in {section_path: value} results."""
+    if path in values:
+        return values[path]
+    for prefix, value in values.items():
+        if path.startswith(prefix + "."):
+            return get_path(value, path[len(prefix) + 1:])
+    return None
+
+
+def get_path(data: Dict[str, Any], path: str) -> Any:
+    """Read a dotted section path, or None if any part is missing."""
+    value: Any = data
+    for key in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _overlaps(a: str, b: str) -> bool:
+    """True if one dotted path equals or contains the other."""
+    return a == b or a.startswith(b + ".") or b.startswith(a + ".")
+
+
+@lru_cache(maxsize=256)
+def parse_fields(fields: str) -> Tuple[str, ...]:
+    """
+    Parse a ?fields= projection ("cpu.usage,memory.percent,network.stats").
+
+    Paths covered by a shorter requested path are dropped. Cached, so a
+    repeated projection costs one dictionary lookup.
+
+    Raises:
+        ValueError: If no path is given or a path is malformed
+    """
+    paths = sorted({part.strip() for part in fields.split(",") if part.strip()})
+    if not paths:
+        raise ValueError("fields must name at least one section path")
+    for path in paths:
+        if any(not key for key in path.split(".")):
+            raise ValueError(f"Malformed field path {path!r}")
+    return tuple(p for p in paths if not any(p != q and p.startswith(q + ".") for q in paths))
+
+
+def project(data: Dict[str, Any], paths: Iterable[str]) -> Dict[str, Any]:
+    """Copy only the given dotted paths of a snapshot (missing paths are left out)."""
+    result: Dict[str, Any] = {}
+    for path in paths:
+        value = get_path(data, path)
+        if value is not None:
+            set_path(result, path, value)
+    return result
+
+
+def _timed(collect: Callable[[Dict[str, Any]], Dict[str, Any]], data: Dict[str, Any]) -> Tuple[Dict[str, Any], float]:
+    """Run a collect call on a pool thread, returning its values and thread CPU seconds."""
+    cpu_start = time.thread_time()
+    return collect(data), time.thread_time() - cpu_start
+
+
+class SampleResult:
+    """Outcome of one sample: per-collector durations and errors."""
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        # CPU seconds of each collect call on its own thread
+        self.cpu: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self.skipped: List[str] = []
+        # Seconds since the collector's previous run (None on its first run)
+        self.intervals: Dict[str, Optional[float]] = {}
+        # Adaptive target interval after this sample
+        self.targets: Dict[str, float] = {}
+        # Collectors whose previous values were reused
+        self.cached: List[str] = []
+        # Seconds until the next collector is due
+        self.next_due: Optional[float] = None
+        # perf_counter() at the start of the sample, and each collector's
+        # (start, end) offset from it in seconds
+        self.started = time.perf_counter()
+        self.spans: Dict[str, Tuple[float, float]] = {}
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Per-collector {"ms", "cpu_ms", "error", "interval_s", "target_s",
+        "cached"} for inclusion in the snapshot.
+        """
+        report = {}
+        for name, seconds in self.timings.items():
+            interval = self.intervals.get(name)
+            target = self.targets.get(name)
+            cpu = self.cpu.get(name)
+            report[name] = {
+                "ms": round(seconds * 1000, 1),
+                "cpu_ms": None if cpu is None else round(cpu * 1000, 2),
+                "error": self.errors.get(name),
+                "interval_s": None if interval is None else round(interval, 3),
+                "target_s": None if target is None else round(target, 3),
+                "cached": name in self.cached,
+            }
+        return report
+
+    def sections(self) -> Dict[str, Dict[str, float]]:
+        """Per-collector {"start_ms", "end_ms"} from the sample start (collectors that ran)."""
+        return {
+            name: {"start_ms": round(start * 1000, 2), "end_ms": round(end * 1000, 2)}
+            for name, (start, end) in self.spans.items()
+        }
+
+
+class CollectorRegistry:
+    """
+    Holds the registered collectors and runs samples over them.
+
+    Args:
+        max_workers: Thread pool size for PROCESS collectors
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self._collectors: Dict[str, Collector] = {}
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="collector")
+        # Alert rules as {section path: threshold}; values within `margin`
+        # of a threshold keep their collector at its minimum interval
+        self.alert_rules: Dict[str, float] = {}
+        self.alert_margin = 0.0
+        # Collector names needed per parsed projection; bounded like
+        # parse_fields, since any path below a known section is accepted
+        self._projections = lru_cache(maxsize=256)(self._resolve)
+
+    def set_alert_rules(self, rules: Dict[str, float], margin: float) -> None:
+        self.alert_rules = dict(rules)
+        self.alert_margin = margin
+
+    def _near_threshold(self, watched: Dict[str, float]) -> bool:
+        return any(
+            path in self.alert_rules and value >= self.alert_rules[path] - self.alert_margin
+            for path, value in watched.items()
+        )
+
+    def _adapt(self, c: Collector, values: Optional[Dict[str, Any]], live: bool) -> None:
+        if c.interval is None:
+            return
+        new = c.watched(values)
+        old = c.watched(c.last_values)
+        change = None
+        if new:
+            change = max(
+                (abs(value - old[path]) / max(abs(old[path]), 1.0) if path in old else FAST_CHANGE)
+                for path, value in new.items()
+            )
+        c.interval.update(change, live or self._near_threshold(new))
+
+    def add(self, collector: Collector) -> Collector:
+        if collector.name in self._collectors:
+            raise ValueError(f"Collector {collector.name} is already registered")
+        self._collectors[collector.name] = collector
+        return collector
+
+    def register(self, name: str, provides: Optional[Iterable[str]] = None, **options) -> Callable:
+        """
+        Decorator registering a collect function.
+
+            @REGISTRY.register("cgroups", inputs=("/sys/fs/cgroup",))
+            def collect_cgroups(data):
+                return {"cgroups": CGROUPS.collect()}
+        """
+        def decorator(func: Callable[[Dict[str, Any]], Dict[str, Any]]):
+            self.add(Collector(name, func, provides if provides is not None else (name,), **options))
+            return func
+        return decorator
+
+    def get(self, name: str) -> Optional[Collector]:
+        return self._collectors.get(name)
+
+    def collectors(self) -> List[Collector]:
+        return list(self._collectors.values())
+
+    def describe(self) -> List[Dict[str, Any]]:
+        """Registered collectors and their declarations."""
+        return [
+            {
+                "name": c.name,
+                "provides": list(c.provides),
+                "depends_on": list(c.depends_on),
+                "cost": c.cost,
+                "inputs": list(c.inputs),
+                "available": c.available(),
+                "interval": None if c.interval is None else {
+                    "min_s": c.interval.min_seconds,
+                    "max_s": c.interval.max_seconds,
+                    "current_s": c.interval.current,
+                    "stretch": c.interval.stretch,
+                },
+                "watch": list(c.watch),
+            }
+            for c in self._collectors.values()
+        ]
+
+    def names_for(self, paths: Tuple[str, ...]) -> List[str]:
+        """
+        Collectors needed to fill the given section paths (from parse_fields),
+        including the providers of their dependencies. Memoized per projection.
+
+        Raises:
+            ValueError: If no collector provides one of the paths
+        """
+        return self._projections(paths)
+
+    def _resolve(self, paths: Tuple[str, ...]) -> List[str]:
+        for path in paths:
+            if not any(_overlaps(path, section) for c in self._collectors.values() for section in c.provides):
+                raise ValueError(f"Unknown field {path!r}")
+
+        needed = set()
+        wanted = list(paths)
+        while wanted:
+            path = wanted.pop()
+            for c in self._collectors.values():
+                if c.name not in needed and any(_overlaps(path, section) for section in c.provides):
+                    needed.add(c.name)
+                    wanted.extend(c.depends_on)
+        return [c.name for c in self._collectors.values() if c.name in needed]
+
+    def _plan(self, names: Optional[Iterable[str]]) -> List[Collector]:
+        wanted = set(names) if names is not None else None
+        return [
+            c for c in self._collectors.values()
+            if (wanted is None or c.name in wanted) and c.available()
+        ]
+
+    def run(
+        self,
+        data: Optional[Dict[str, Any]] = None,
+        names: Optional[Iterable[str]] = None,
+        live: bool = False,
+    ) -> Tuple[Dict[str, Any], SampleResult]:
+        """
+        Run one sample.
+
+        Args:
+            data: Snapshot to fill (e.g. pre-seeded with section defaults)
+            names: Restrict the sample to these collectors
+            live: A dashboard is watching; run everything at minimum intervals
+
+        Returns:
+            (snapshot, SampleResult)
+        """
+        data = data if data is not None else {}
+        result = SampleResult()
+        pending = self._plan(names)
+
+        # A dependency only blocks if some collector in this sample provides it
+        providers: Dict[str, List[str]] = {}
+        for c in pending:
+            for section in c.provides:
+                providers.setdefault(section, []).append(c.name)
+
+        finished: set = set()
+        running: Dict[Future, Tuple[Collector, float]] = {}
+
+        def ready(c: Collector) -> bool:
+            return all(
+                p in finished or p == c.name
+                for section in c.depends_on
+                for p in providers.get(section, ())
+            )
+
+        now = time.monotonic()
+
+        def merge(
+            c: Collector,
+            values: Optional[Dict[str, Any]],
+            started: float,
+            error: Optional[BaseException],
+            cpu: Optional[float],
+        ) -> None:
+            ended = time.perf_counter()
+            result.timings[c.name] = ended - started
+            if cpu is not None:
+                result.cpu[c.name] = cpu
+            result.spans[c.name] = (started - result.started, ended - result.started)
+            result.intervals[c.name] = None if c.last_run is None else now - c.last_run
+            if error is not None:
+                result.errors[c.name] = str(error) or type(error).__name__
+                logger.warning(f"Collector {c.name} failed: {error}")
+            else:
+                if values:
+                    for path, value in values.items():
+                        set_path(data, path, value)
+                self._adapt(c, values, live)
+                c.last_values = values or {}
+                c.last_run = now
+            if c.interval is not None:
+                result.targets[c.name] = c.interval.current
+            finished.add(c.name)
+
+        # Collectors that are not due contribute their previous values
+        for c in list(pending):
+            if live and c.interval is not None:
+                c.interval.current = c.interval.floor
+            if not c.due(now):
+                pending.remove(c)
+                for path, value in c.last_values.items():
+                    set_path(data, path, value)
+                result.timings[c.name] = 0.0
+                result.intervals[c.name] = now - c.last_run
+                result.targets[c.name] = c.interval.current
+                result.cached.append(c.name)
+                finished.add(c.name)
+
+        while pending or running:
+            batch = [c for c in pending if ready(c)]
+            for c in batch:
+                pending.remove(c)
+
+            # Start external commands first so they overlap the inline reads
+            for c in batch:
+                if c.cost == PROCESS:
+                    started = time.perf_counter()
+                    running[self._pool.submit(_timed, c.collect, dict(data))] = (c, started)
+            for c in batch:
+                if c.cost == FILE_READ:
+                    started = time.perf_counter()
+                    cpu_start = time.thread_time()
+                    try:
+                        values = c.collect(data)
+                    except Exception as e:
+                        merge(c, None, started, e, time.thread_time() - cpu_start)
+                    else:
+                        merge(c, values, started, None, time.thread_time() - cpu_start)
+
+            if batch and any(c.cost == FILE_READ for c in batch):
+                # Inline work may have unblocked more collectors
+                continue
+
+            if running:
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    c, started = running.pop(future)
+                    error = future.exception()
+                    values, cpu = (None, None) if error else future.result()
+                    merge(c, values, started, error, cpu)
+            elif pending:
+                # Nothing running and nothing ready: dependency cycle
+                for c in pending:
+                    result.skipped.append(c.name)
+                    logger.error(f"Collector {c.name} skipped: unresolved dependencies {c.depends_on}")
+                pending = []
+
+        waits = [
+            c.last_run + c.interval.current - time.monotonic()
+            for c in self._plan(names)
+            if c.interval is not None and c.last_run is not None
+        ]
+        result.next_due = max(min(waits), 0.0) if waits else None
+        return data, result
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False)
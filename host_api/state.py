@@ -0,0 +1,199 @@
+"""
+Warm-start state persistence for the host API.
+
+Counter state and rollups are checkpointed to a single JSON file so that a
+restarted host API can compute real rates on its very first request instead
+of reporting zeros while it warms up.
+
+Every checkpoint is tagged with the kernel boot id. A checkpoint written
+before the host rebooted is discarded on load, because the cumulative
+counters it holds (/proc/stat, /proc/net/dev, ...) were reset by the reboot.
+Components that own counters validate them again on restore: if a current
+reading is lower than the saved one, the counter has wrapped or been reset
+and the saved value must not be used for a delta.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BOOT_ID_PATH = Path("/proc/sys/kernel/random/boot_id")
+PROC_STAT_PATH = Path("/proc/stat")
+
+# Bump when the checkpoint layout changes incompatibly
+STATE_VERSION = 1
+
+
+def read_boot_id() -> Optional[str]:
+    """
+    Identify the current kernel boot.
+
+    Uses /proc/sys/kernel/random/boot_id and falls back to the boot time
+    (btime) from /proc/stat on kernels that do not expose a boot id.
+
+    Returns:
+        Boot identifier string, or None if neither source is readable
+    """
+    try:
+        return BOOT_ID_PATH.read_text().strip()
+    except OSError:
+        pass
+
+    try:
+        with open(PROC_STAT_PATH, "r") as f:
+            for line in f:
+                if line.startswith("btime "):
+                    return f"btime:{line.split()[1]}"
+    except OSError:
+        pass
+
+    return None
+
+
+def counters_monotonic(saved: Mapping[str, float], current: Mapping[str, float]) -> bool:
+    """
+    Check that cumulative counters only moved forward since they were saved.
+
+    Keys missing from either side are ignored (interfaces come and go).
+
+    Args:
+        saved: Counter values restored from a checkpoint
+        current: Counter values read now
+
+    Returns:
+        True if no current value is lower than its saved value
+    """
+    for key, value in saved.items():
+        now = current.get(key)
+        if now is not None and now < value:
+            return False
+    return True
+
+
+def atomic_write_json(path: Path, payload: Any) -> None:
+    """
+    Write JSON to path so readers only ever see the old or the new file.
+
+    The data is written to a temporary file in the same directory, fsynced
+    and then renamed over the target.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class StateStore:
+    """
+    Checkpoint file shared by every component that keeps state across polls.
+
+    Components register a named section with an export callable (returns
+    JSON-serialisable state) and a restore callable (receives that state
+    back after a validated load).
+    """
+
+    def __init__(self, path: Path, max_age_seconds: int):
+        self.path = Path(path)
+        self.max_age_seconds = max_age_seconds
+        self._sections: Dict[str, Tuple[Callable[[], Any], Callable[[Any], None]]] = {}
+        self._lock = threading.Lock()
+
+    def register(
+        self,
+        name: str,
+        export: Callable[[], Any],
+        restore: Callable[[Any], None],
+    ) -> None:
+        """Register a named state section."""
+        self._sections[name] = (export, restore)
+
+    def save(self) -> bool:
+        """
+        Checkpoint all registered sections atomically.
+
+        Returns:
+            True if the checkpoint was written
+        """
+        sections: Dict[str, Any] = {}
+        for name, (export, _) in list(self._sections.items()):
+            try:
+                sections[name] = export()
+            except Exception as e:
+                logger.warning(f"Failed to export state section '{name}': {e}")
+
+        record = {
+            "version": STATE_VERSION,
+            "boot_id": read_boot_id(),
+            "saved_at": time.time(),
+            "sections": sections,
+        }
+
+        with self._lock:
+            try:
+                atomic_write_json(self.path, record)
+                logger.debug(f"Checkpointed {len(sections)} state sections to {self.path}")
+                return True
+            except (OSError, TypeError, ValueError) as e:
+                logger.error(f"Failed to write checkpoint {self.path}: {e}")
+                return False
+
+    def load(self) -> bool:
+        """
+        Restore registered sections from the checkpoint if it is still valid.
+
+        A checkpoint is discarded when it was written during a different
+        boot, is older than max_age_seconds, or cannot be parsed.
+
+        Returns:
+            True if the checkpoint was accepted and restored
+        """
+        if not self.path.exists():
+            logger.info("No warm-start checkpoint found, starting cold")
+            return False
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable checkpoint {self.path}: {e}")
+            return False
+
+        if not isinstance(record, dict) or record.get("version") != STATE_VERSION:
+            logger.warning("Ignoring checkpoint with unknown version")
+            return False
+
+        boot_id = read_boot_id()
+        if boot_id is None or record.get("boot_id") != boot_id:
+            logger.info("Host rebooted since last checkpoint, discarding saved state")
+            return False
+
+        age = time.time() - float(record.get("saved_at", 0))
+        if age < 0 or age > self.max_age_seconds:
+            logger.info(f"Checkpoint is {age:.0f}s old, discarding saved state")
+            return False
+
+        sections = record.get("sections") or {}
+        for name, (_, restore) in self._sections.items():
+            if name not in sections:
+                continue
+            try:
+                restore(sections[name])
+            except Exception as e:
+                logger.warning(f"Failed to restore state section '{name}': {e}")
+
+        logger.info(f"Warm-started from checkpoint written {age:.0f}s ago")
+        return True
+
+    def checkpoint_loop(self, interval_seconds: int) -> None:
+        """Background loop that checkpoints every interval_seconds."""
+        while True:
+            time.sleep(interval_seconds)
+            self.save()
@@ -56,6 +56,12 @@ is_wsl() {
     return 1
 }
 
+# Sections the host API collects natively (NATIVE_COLLECTORS, a
+# space-separated list such as "memory network gpu") are skipped
+is_native() {
+    [[ " ${NATIVE_COLLECTORS} " == *" $1 "* ]]
+}
+
 log_warn() { log_message "WARNING: $1"; }
 log_error() { log_message "ERROR: $1"; }
 
@@ -252,6 +258,17 @@ collect_disk_metrics() {
     local display_str="Disks: "
     local seen_sizes=""
 
+    # Exact sizes by mount point from `df -kP` (1024-byte blocks; -B1 is
+    # GNU only), so trends are not fitted to the rounded -h strings
+    local -A kb_size=() kb_used=() kb_avail=()
+    local k_fs k_size k_used k_avail k_pcent k_path
+    while read -r k_fs k_size k_used k_avail k_pcent k_path; do
+        [[ "$k_size" =~ ^[0-9]+$ ]] || continue
+        kb_size["$k_path"]=$k_size
+        kb_used["$k_path"]=$k_used
+        kb_avail["$k_path"]=$k_avail
+    done < <(df -kP 2>/dev/null)
+
     # Parsing `df -hP`
     # Format: Filesystem Size Used Avail Use% Mounted on
     while read -r line; do
@@ -275,8 +292,8 @@ collect_disk_metrics() {
         fi
 
         # Add to Raw Data (for JSON parsing)
-        # Format: path|size|used|avail|pcent;
-        disk_raw="${disk_raw}${path}|${size}|${used}|${avail}|${pcent};"
+        # Format: path|size|used|avail|pcent|size_kb|used_kb|avail_kb;
+        disk_raw="${disk_raw}${path}|${size}|${used}|${avail}|${pcent}|${kb_size[$path]}|${kb_used[$path]}|${kb_avail[$path]};"
 
         # Add to Display String (Clean format)
         # Format: [C: 50G/100G (50%)]
@@ -861,11 +878,17 @@ check_alerts() {
 # Reporting
 ################################################################################
 
+# Quote a CSV field (RFC 4180): model names may contain commas and quotes
+csv_field() {
+    local value="${1//\"/\"\"}"
+    printf '"%s"' "$value"
+}
+
 export_csv() {
     if [ ! -f "$CSV_FILE" ]; then
         echo "Timestamp,CPU_Model,CPU_Cores,CPU_Usage,Mem_Total,Mem_Used,Mem_Percent,Disk_Percent,Temp,GPU_Name" > "$CSV_FILE"
     fi
-    echo "${TIMESTAMP},${METRICS[CPU_MODEL]},${METRICS[CPU_CORES]},${METRICS[CPU_USAGE]},${METRICS[MEM_TOTAL]},${METRICS[MEM_USED]},${METRICS[MEM_PERCENT]},${METRICS[DISK_PERCENT]},${METRICS[TEMP]},${METRICS[GPU_NAME]}" >> "$CSV_FILE"
+    echo "${TIMESTAMP},$(csv_field "${METRICS[CPU_MODEL]}"),${METRICS[CPU_CORES]},${METRICS[CPU_USAGE]},${METRICS[MEM_TOTAL]},${METRICS[MEM_USED]},${METRICS[MEM_PERCENT]},${METRICS[DISK_PERCENT]},$(csv_field "${METRICS[TEMP]}"),$(csv_field "${METRICS[GPU_NAME]}")" >> "$CSV_FILE"
 }
 
 generate_html() {
@@ -931,6 +954,142 @@ display_summary() {
     echo ""
 }
 
+################################################################################
+# JSON Output
+################################################################################
+
+# Escape JSON strings properly
+escape_json() {
+    echo "$1" | sed 's/\\/\\\\/g' | sed 's/"/\\"/g' | sed ':a;N;$!ba;s/\n/\\n/g' | sed 's/\r/\\r/g'
+}
+
+# Parse top processes
+parse_top_processes() {
+    local procs="${METRICS[TOP_PROCS]}"
+    echo "["
+    if [ -n "$procs" ]; then
+        IFS=';' read -ra PROC_ARRAY <<< "$procs"
+        local first=1
+        for proc in "${PROC_ARRAY[@]}"; do
+            [ -z "$proc" ] && continue
+            [ "$first" -eq 1 ] && first=0 || echo ","
+            
+            # Parse: "PID USER MEM% CMD"
+            local pid=$(echo "$proc" | awk '{print $1}')
+            local user=$(echo "$proc" | awk '{print $2}')
+            local mem=$(echo "$proc" | awk '{print $3}')
+            local cmd=$(echo "$proc" | cut -d' ' -f4-)
+            
+            echo -n "  {"
+            echo -n "\"pid\": \"$(escape_json "$pid")\","
+            echo -n "\"user\": \"$(escape_json "$user")\","
+            echo -n "\"memory_percent\": \"$(escape_json "$mem")\","
+            echo -n "\"command\": \"$(escape_json "$cmd")\""
+            echo -n "}"
+        done
+    fi
+    echo ""
+    echo "]"
+}
+
+# Parse disk partitions from raw string
+parse_disk_partitions() {
+    local raw="${METRICS[DISK_RAW]}"
+    echo "["
+    if [ -n "$raw" ]; then
+        IFS=';' read -ra DISK_ARRAY <<< "$raw"
+        local first=1
+        for disk in "${DISK_ARRAY[@]}"; do
+            [ -z "$disk" ] && continue
+            [ "$first" -eq 1 ] && first=0 || echo ","
+            
+            # Format: path|size|used|avail|pcent|size_kb|used_kb|avail_kb
+            local path size used avail pcent size_kb used_kb avail_kb
+            IFS='|' read -r path size used avail pcent size_kb used_kb avail_kb <<< "$disk"
+            
+            echo -n "  {"
+            echo -n "\"path\": \"$(escape_json "$path")\","
+            echo -n "\"size\": \"$(escape_json "$size")\","
+            echo -n "\"used\": \"$(escape_json "$used")\","
+            echo -n "\"avail\": \"$(escape_json "$avail")\","
+            if [[ "$size_kb" =~ ^[0-9]+$ && "$used_kb" =~ ^[0-9]+$ && "$avail_kb" =~ ^[0-9]+$ ]]; then
+                echo -n "\"size_bytes\": $((size_kb * 1024)),"
+                echo -n "\"used_bytes\": $((used_kb * 1024)),"
+                echo -n "\"avail_bytes\": $((avail_kb * 1024)),"
+            fi
+            echo -n "\"percent\": ${pcent:-0}"
+            echo -n "}"
+        done
+    fi
+    echo ""
+    echo "]"
+}
+
+# Parse raw network metrics
+parse_network_raw() {
+    local raw="${METRICS[NET_RAW]}"
+    # Format: lan_rx|lan_tx|wifi_rx|wifi_tx|tcp
+    if [ -n "$raw" ]; then
+        local lan_rx=$(echo "$raw" | cut -d'|' -f1)
+        local lan_tx=$(echo "$raw" | cut -d'|' -f2)
+        local wifi_rx=$(echo "$raw" | cut -d'|' -f3)
+        local wifi_tx=$(echo "$raw" | cut -d'|' -f4)
+        local tcp=$(echo "$raw" | cut -d'|' -f5)
+        
+        echo "{"
+        echo "    \"lan\": { \"rx\": ${lan_rx:-0}, \"tx\": ${lan_tx:-0} },"
+        echo "    \"wifi\": { \"rx\": ${wifi_rx:-0}, \"tx\": ${wifi_tx:-0} },"
+        echo "    \"tcp\": ${tcp:-0}"
+        echo "}"
+    else
+        echo "null"
+    fi
+}
+
+# Print METRICS as the JSON document served by the host API
+print_metrics_json() {
+    echo "{"
+    echo "  \"timestamp\": \"$(date -u +"%Y-%m-%dT%H:%M:%SZ" 2>/dev/null || date +"%Y-%m-%dT%H:%M:%S%z")\","
+    echo "  \"cpu\": {"
+    echo "    \"model\": \"$(escape_json "${METRICS[CPU_MODEL]:-Unknown}")\","
+    echo "    \"cores\": ${METRICS[CPU_CORES]:-0},"
+    echo "    \"usage\": ${METRICS[CPU_USAGE]:-0},"
+    echo "    \"load_avg\": \"$(escape_json "${METRICS[LOAD_AVG]:-N/A}")\","
+    echo "    \"temperature\": \"$(escape_json "${METRICS[TEMP]:-N/A}")\""
+    echo "  },"
+    echo "  \"memory\": {"
+    echo "    \"total_gb\": ${METRICS[MEM_TOTAL]:-0},"
+    echo "    \"used_gb\": ${METRICS[MEM_USED]:-0},"
+    echo "    \"free_gb\": ${METRICS[MEM_FREE]:-0},"
+    echo "    \"percent\": ${METRICS[MEM_PERCENT]:-0}"
+    echo "  },"
+    echo "  \"disk\": {"
+    echo "    \"display\": \"$(escape_json "${METRICS[DISK_DISPLAY]:-N/A}")\","
+    echo "    \"percent\": ${METRICS[DISK_PERCENT]:-0},"
+    echo "    \"partitions\": $(parse_disk_partitions)"
+    echo "  },"
+    echo "  \"network\": {"
+    echo "    \"data\": \"$(escape_json "${METRICS[NET_DATA]:-N/A}")\","
+    echo "    \"stats\": $(parse_network_raw)"
+    echo "  },"
+    echo "  \"gpu\": {"
+    echo "    \"name\": \"$(escape_json "${METRICS[GPU_NAME]:-N/A}")\","
+    echo "    \"memory\": \"$(escape_json "${METRICS[GPU_MEM]:-N/A}")\","
+    echo "    \"temperature\": \"$(escape_json "${METRICS[GPU_TEMP]:-N/A}")\","
+    echo "    \"utilization\": \"$(escape_json "${METRICS[GPU_UTIL]:-N/A}")\""
+    echo "  },"
+    echo "  \"system\": {"
+    echo "    \"uptime\": \"$(escape_json "${METRICS[UPTIME]:-N/A}")\","
+    echo "    \"process_count\": ${METRICS[PROC_COUNT]:-0},"
+    echo "    \"smart_status\": \"$(escape_json "${METRICS[SMART_STATUS]:-N/A}")\","
+    echo "    \"smart_health\": \"$(escape_json "${METRICS[SMART_HEALTH]:-N/A}")\","
+    echo "    \"rom_info\": \"$(escape_json "${METRICS[ROM_INFO]:-N/A}")\""
+    echo "  },"
+    echo "  \"top_processes\": $(parse_top_processes),"
+    echo "  \"alerts\": \"$(escape_json "${METRICS[ALERTS]:-No alerts.}")\""
+    echo "}"
+}
+
 ################################################################################
 # Main
 ################################################################################
@@ -988,18 +1147,36 @@ get_gpu_output() {
 wrapper_smart() {
     collect_smart_status
     echo "${METRICS[SMART_HEALTH]}" 
+    echo "${METRICS[SMART_STATUS]}"
 }
 wrapper_disk() {
     collect_disk_metrics
     echo "${METRICS[DISK_PERCENT]}"
     echo "${METRICS[DISK_DISPLAY]}"
+    echo "${METRICS[DISK_RAW]}"
 }
 wrapper_gpu() {
     collect_gpu_metrics
     echo "${METRICS[GPU_NAME]}|${METRICS[GPU_MEM]}|${METRICS[GPU_TEMP]}|${METRICS[GPU_UTIL]}"
 }
 
+# Usage: main [--json-stream]
+#
+# Without arguments main() renders the terminal summary every second. With
+# --json-stream it prints one JSON object per tick (the document of
+# print_metrics_json on a single line) to stdout instead and keeps all delta
+# state in memory; the host API runs it as one long-lived child. The tick
+# interval is STREAM_INTERVAL_SECONDS (default 1), replaced before every
+# sleep by the number in STREAM_INTERVAL_FILE when that file exists (read
+# with a builtin, no fork); SIGUSR1 cuts the current sleep short so a
+# shorter interval applies at once. Sections listed in NATIVE_COLLECTORS
+# are skipped.
 main() {
+    local json_stream=0
+    [ "$1" = "--json-stream" ] && json_stream=1
+    local interval=1
+    [ "$json_stream" -eq 1 ] && interval="${STREAM_INTERVAL_SECONDS:-1}"
+
     setup_directories
     display_header
     
@@ -1008,18 +1185,30 @@ main() {
     # Initial Collections (Static Data)
     collect_rom_metrics         # [NEW] ROM/BIOS
     
-    # Define temp files
-    local smart_file="/tmp/sysmon_smart.data"
-    local disk_file="/tmp/sysmon_disk.data"
-    local gpu_file="/tmp/sysmon_gpu.data"
+    # Define temp files (private to this process when streaming, so a
+    # stream never reads results of another monitor's jobs)
+    local tmp_prefix="/tmp/sysmon"
+    [ "$json_stream" -eq 1 ] && tmp_prefix="/tmp/sysmon_stream_$$"
+    local smart_file="${tmp_prefix}_smart.data"
+    local disk_file="${tmp_prefix}_disk.data"
+    local gpu_file="${tmp_prefix}_gpu.data"
+    
+    local sleep_pid=""
+    if [ "$json_stream" -eq 1 ]; then
+        trap 'rm -f "${tmp_prefix}"_*; exit 0' INT TERM
+        trap '[ -n "$sleep_pid" ] && kill "$sleep_pid" 2>/dev/null' USR1
+    else
+        # Write the CSV row and HTML report once, for the last sample, on exit
+        trap 'export_csv; generate_html; exit 0' INT TERM
+    fi
     
     while true; do
         TIMESTAMP=$(date +%Y%m%d_%H%M%S)
         
         # --- FAST METRICS ---
         collect_cpu_metrics
-        collect_memory_metrics
-        collect_network_metrics
+        is_native memory || collect_memory_metrics
+        is_native network || collect_network_metrics
         collect_load_metrics    
         collect_top_processes
         
@@ -1027,7 +1216,7 @@ main() {
         # Trigger background jobs
         
         # GPU (Every 5s) - Using wrapper to dump data to file
-        if [ $((tick % 5)) -eq 0 ]; then
+        if ! is_native gpu && [ $((tick % 5)) -eq 0 ]; then
              run_async "wrapper_gpu" "$gpu_file"
         fi
         
@@ -1037,7 +1226,7 @@ main() {
         fi
         
         # SMART (Every 30s)
-        if [ $((tick % 30)) -eq 0 ]; then
+        if ! is_native smart && [ $((tick % 30)) -eq 0 ]; then
              run_async "wrapper_smart" "$smart_file"
         fi
 
@@ -1056,19 +1245,26 @@ main() {
         fi
         
         if [ -f "$disk_file" ]; then
-             # Read multiple lines: 1st=Percent, 2nd=Display
+             # Read multiple lines: 1st=Percent, 2nd=Display, 3rd=Raw partitions
              {
                  read -r d_pct
                  read -r d_disp
+                 read -r d_raw
              } < "$disk_file"
              METRICS[DISK_PERCENT]="$d_pct"
              METRICS[DISK_DISPLAY]="$d_disp"
+             METRICS[DISK_RAW]="$d_raw"
         else
              METRICS[DISK_DISPLAY]="Loading..."
         fi
         
         if [ -f "$smart_file" ]; then
-             METRICS[SMART_HEALTH]=$(cat "$smart_file")
+             {
+                 read -r s_health
+                 read -r s_status
+             } < "$smart_file"
+             METRICS[SMART_HEALTH]="$s_health"
+             METRICS[SMART_STATUS]="$s_status"
         else
              METRICS[SMART_HEALTH]="Loading..."
         fi
@@ -1078,17 +1274,37 @@ main() {
             check_alerts
         fi
         
-        export_csv
-        generate_html
-        
-        display_summary
+        # Reports are no longer rewritten every tick: the backend renders
+        # them on request from history (/api/reports/html, /api/reports/csv),
+        # and this standalone loop writes one final report when it exits
+        if [ "$json_stream" -eq 1 ]; then
+            # One object per line (strings are escaped, so only the
+            # layout newlines are removed)
+            local json
+            json=$(print_metrics_json)
+            printf '%s\n' "${json//$'\n'/}"
+        else
+            display_summary
+        fi
         
-        sleep 1
+        if [ "$json_stream" -eq 1 ]; then
+            if [ -n "$STREAM_INTERVAL_FILE" ] && [ -f "$STREAM_INTERVAL_FILE" ]; then
+                local next_interval=""
+                read -r next_interval < "$STREAM_INTERVAL_FILE"
+                [[ "$next_interval" =~ ^[0-9]+(\.[0-9]+)?$ ]] && interval="$next_interval"
+            fi
+            # In the background so SIGUSR1 can interrupt the wait
+            sleep "$interval" &
+            sleep_pid=$!
+            wait "$sleep_pid"
+            sleep_pid=""
+        else
+            sleep "$interval"
+        fi
         ((tick++))
     done
 }
 
 if [[ "${BASH_SOURCE[0]}" == "${0}" ]]; then
-    main
+    main "$@"
 fi
-```
\ No newline at end of file